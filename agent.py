@@ -1,47 +1,42 @@
 import time
+import json
 import random
 import argparse
-import json
-from pathlib import Path
+import tempfile
 from datetime import datetime
-from browser import BrowserManager
+from functools import partial
+from browser import BrowserManager, dom_recorder, dom_snapshot_dir
 from form_filler import FormFiller
+from storage import scratch_store
+from job_index import JobIndex
+from job_filters import JobFilter
+from form_plan import build_answer_plan, log_unknowns, has_required_unknown, option_rejected
+from job_flow import (
+    ModalRun, new_stats, log_application, outcome_recorder, reached_run_limit, triage_card, start_job,
+    finish_job, record_write, save_run_metrics, save_run_stats, print_session_summary
+)
+from page_probes import (
+    JOB_CARD_SELECTOR, NAV_BUTTON_SELECTORS, harvest_job_cards, job_card_locator, snapshot_form,
+    field_locator, read_modal_state, apply_plan
+)
+from waits import (
+    wait_for, card_list_signature, modal_step_changed, detail_pane_ready,
+    discard_prompt, card_list_changed, card_count_above, pacing_delay, set_pacing, DISCARD_CONFIRM_SELECTOR
+)
+from tracing import tracer, start_tracing, finish_tracing, install_playwright_call_counter
+from page_watchdog import PageWatchdog
 from config import (
-    build_search_url, MAX_APPLICATIONS_PER_RUN, MAX_JOBS_TO_PROCESS,
-    ENABLE_PAGINATION, MAX_PAGES, MIN_DELAY_SECONDS, MAX_DELAY_SECONDS,
-    APPLICATION_LOG_PATH, PREFERRED_EMAIL
+    build_search_url, search_page_url, ENABLE_PAGINATION, MAX_PAGES, MIN_DELAY_SECONDS, MAX_DELAY_SECONDS,
+    CARD_SCROLL_TIMEOUT_MS, BATCH_FIELD_WRITES, REPLAY_RESULTS_PATH, BLOCK_RESOURCES
 )
 from playwright.sync_api import TimeoutError
 
-
 def random_sleep(min_sec=None, max_sec=None):
     min_sec = min_sec or MIN_DELAY_SECONDS
     max_sec = max_sec or MAX_DELAY_SECONDS
     time.sleep(random.uniform(min_sec, max_sec))
 
 
-def log_application(job_title, company, status, resume_type):
-    """Log application to JSON file for tracking."""
-    log_path = Path(APPLICATION_LOG_PATH)
-    
-    if log_path.exists():
-        with open(log_path, "r") as f:
-            log = json.load(f)
-    else:
-        log = []
-    
-    log.append({
-        "timestamp": datetime.now().isoformat(),
-        "job_title": job_title,
-        "company": company,
-        "status": status,
-        "resume_type": resume_type
-    })
-    
-    with open(log_path, "w") as f:
-        json.dump(log, f, indent=2)
-
-
 def check_already_applied(page):
     """Check if we've already applied to this job."""
     applied_badge = page.locator("span.artdeco-inline-feedback__message:has-text('Applied')")
@@ -192,329 +187,112 @@ def select_resume_in_dropdown(page, resume_dropdown_name):
         return False
 
 
-def detect_and_fill_fields(page, form_filler, job_title="", company=""):
-    """Detect form fields and attempt to fill them."""
-    all_filled = True
-    unknown_count = 0
-    
-    IGNORED_FIELDS = [
-        "search by title",
-        "search by skill", 
-        "search by company",
-        "search",
-        "city, state, or zip code",
-        "location"
-    ]
+def apply_action(page, action):
+    """Write one planned answer through its tagged locator. Returns True on success."""
+    try:
+        field = field_locator(page, action["key"])
+        if action["action"] == "fill":
+            field.fill(action["answer"])
+        elif action["action"] == "select":
+            try:
+                field.select_option(label=action["answer"])
+            except:
+                field.select_option(value=action["answer"])
+        else:
+            field.click()
+        return True
+    except:
+        return False
 
+
+def detect_and_fill_fields(page, form_filler, job_title="", company="", snapshot=None, job_id=None):
+    """
+    Detect form fields and attempt to fill them.
+    Reads the whole step with one snapshot, resolves answers in Python and
+    only goes back to the browser to write values.
+    Returns the unknown fields. If a required one is among them nothing is
+    written, since the step cannot be submitted anyway.
+    """
     # Uncheck "Follow company" if present
     uncheck_follow_company(page)
-    
-    # Handle email dropdowns specifically
-    email_selects = page.locator("select:visible")
-    for i in range(email_selects.count()):
-        try:
-            field = email_selects.nth(i)
-            field_id = field.get_attribute("id") or ""
-            label = page.locator(f"label[for='{field_id}']")
-            
-            if label.count() > 0:
-                label_text = label.first.inner_text().strip().lower()
-            else:
-                label_text = field.get_attribute("aria-label") or ""
-                label_text = label_text.lower()
-            
-            if "email" in label_text and PREFERRED_EMAIL:
-                try:
-                    field.select_option(label=PREFERRED_EMAIL)
-                    print(f"   [Fill] Email dropdown -> '{PREFERRED_EMAIL}'")
-                except:
-                    try:
-                        field.select_option(value=PREFERRED_EMAIL)
-                        print(f"   [Fill] Email dropdown -> '{PREFERRED_EMAIL}'")
-                    except:
-                        pass
-        except:
-            continue
-
-    # Text inputs
-    text_inputs = page.locator("input[type='text']:visible, input:not([type]):visible")
-    for i in range(text_inputs.count()):
-        try:
-            field = text_inputs.nth(i)
-            if not field.is_visible():
-                continue
-
-            field_id = field.get_attribute("id") or ""
-            label = page.locator(f"label[for='{field_id}']")
-            
-            if label.count() > 0:
-                question = label.first.inner_text().strip()
-            else:
-                question = field.get_attribute("placeholder") or field.get_attribute("aria-label") or "Unknown field"
-
-            if any(ignored in question.lower() for ignored in IGNORED_FIELDS):
-                continue
 
-            current_value = field.input_value()
-            if current_value:
-                continue
-
-            answer, source = form_filler.get_answer(question, "text")
-
-            if answer:
-                field.fill(answer)
-                print(f"   [Fill] '{question[:30]}...' -> '{answer[:20]}...' ({source})")
-            else:
-                form_filler.log_unknown_field(question, "text", job_title, company)
-                all_filled = False
-                unknown_count += 1
-        except:
-            continue
-
-    # Select dropdowns
-    selects = page.locator("select:visible")
-    for i in range(selects.count()):
-        try:
-            field = selects.nth(i)
-            if not field.is_visible():
-                continue
-
-            field_id = field.get_attribute("id") or ""
-            label = page.locator(f"label[for='{field_id}']")
-            
-            if label.count() > 0:
-                question = label.first.inner_text().strip()
-            else:
-                question = field.get_attribute("aria-label") or "Unknown dropdown"
-
-            if any(ignored in question.lower() for ignored in IGNORED_FIELDS):
-                continue
-            
-            # Skip if it's the email dropdown (already handled)
-            if "email" in question.lower():
-                continue
-
-            current = field.input_value()
-            if current and current != "Select an option" and current != "":
-                continue
+    if snapshot is None:
+        snapshot = snapshot_form(page)
+    with tracer.span("resolve", fields=sum(map(len, snapshot.values()))):
+        actions, unknowns = build_answer_plan(snapshot, form_filler)
+    if has_required_unknown(unknowns):
+        log_unknowns(form_filler, unknowns, job_title, company, job_id)
+        return unknowns
 
-            answer, source = form_filler.get_answer(question, "select")
-
-            if answer:
-                try:
-                    field.select_option(label=answer)
-                    print(f"   [Fill] '{question[:30]}...' -> '{answer}' ({source})")
-                except:
-                    try:
-                        field.select_option(value=answer)
-                    except:
-                        options = []
-                        try:
-                            option_els = field.locator("option")
-                            for j in range(option_els.count()):
-                                opt_text = option_els.nth(j).inner_text().strip()
-                                if opt_text and opt_text != "Select an option":
-                                    options.append(opt_text)
-                        except:
-                            pass
-                        form_filler.log_unknown_field(question, "select", job_title, company, options)
-                        all_filled = False
-                        unknown_count += 1
-            else:
-                options = []
-                try:
-                    option_els = field.locator("option")
-                    for j in range(option_els.count()):
-                        opt_text = option_els.nth(j).inner_text().strip()
-                        if opt_text and opt_text != "Select an option":
-                            options.append(opt_text)
-                except:
-                    pass
-                form_filler.log_unknown_field(question, "select", job_title, company, options)
-                all_filled = False
-                unknown_count += 1
-        except:
-            continue
-
-    # Radio buttons
-    fieldsets = page.locator("fieldset:visible")
-    for i in range(fieldsets.count()):
-        try:
-            fieldset = fieldsets.nth(i)
-            if not fieldset.is_visible():
-                continue
-
-            legend = fieldset.locator("legend")
-            if legend.count() == 0:
-                continue
-
-            question = legend.first.inner_text().strip()
-            
-            lines = question.split('\n')
-            if len(lines) > 1 and lines[0].strip() == lines[1].strip():
-                question = lines[0].strip()
-            
-            if any(ignored in question.lower() for ignored in IGNORED_FIELDS):
-                continue
-            
-            checked = fieldset.locator("input[type='radio']:checked")
-            if checked.count() > 0:
-                continue
+    # One evaluate for the whole step; anything it couldn't set goes through its locator
+    with tracer.span("write", actions=len(actions)):
+        results = (apply_plan(page, actions) if BATCH_FIELD_WRITES else None) or [None] * len(actions)
+        for action, result in zip(actions, results):
+            ok = (result and result["ok"]) or (not option_rejected(result) and apply_action(page, action))
+            record_write(action, ok, unknowns)
 
-            answer, source = form_filler.get_answer(question, "radio")
+    log_unknowns(form_filler, unknowns, job_title, company, job_id)
+    return unknowns
 
-            options = []
-            radio_labels = fieldset.locator("label")
-            for j in range(radio_labels.count()):
-                opt_text = radio_labels.nth(j).inner_text().strip()
-                if opt_text and opt_text.lower() not in ['required', '']:
-                    options.append(opt_text)
-            
-            if not options:
-                fieldset_text = fieldset.inner_text().lower()
-                if 'yes' in fieldset_text and 'no' in fieldset_text:
-                    options = ['Yes', 'No']
-
-            if answer:
-                matched = False
-                for j in range(radio_labels.count()):
-                    label_text = radio_labels.nth(j).inner_text().strip().lower()
-                    if answer.lower() in label_text or label_text in answer.lower():
-                        radio_labels.nth(j).click()
-                        print(f"   [Fill] '{question[:30]}...' -> '{answer}' ({source})")
-                        matched = True
-                        break
-                if not matched:
-                    form_filler.log_unknown_field(question, "radio", job_title, company, options)
-                    all_filled = False
-                    unknown_count += 1
-            else:
-                form_filler.log_unknown_field(question, "radio", job_title, company, options)
-                all_filled = False
-                unknown_count += 1
 
-        except:
-            continue
-
-    # Textareas
-    textareas = page.locator("textarea:visible")
-    for i in range(textareas.count()):
-        try:
-            field = textareas.nth(i)
-            if not field.is_visible():
-                continue
-
-            field_id = field.get_attribute("id") or ""
-            label = page.locator(f"label[for='{field_id}']")
-            
-            if label.count() > 0:
-                question = label.first.inner_text().strip()
-            else:
-                question = field.get_attribute("placeholder") or "Unknown textarea"
-
-            current_value = field.input_value()
-            if current_value:
-                continue
-
-            answer, source = form_filler.get_answer(question, "textarea")
-
-            if answer:
-                field.fill(answer)
-                print(f"   [Fill] '{question[:30]}...' -> '{answer[:30]}...' ({source})")
-            else:
-                form_filler.log_unknown_field(question, "textarea", job_title, company)
-                all_filled = False
-                unknown_count += 1
-        except:
-            continue
-
-    return all_filled, unknown_count
-
-
-def handle_application_modal(page, form_filler, job_title="", company="", resume_dropdown_name=""):
-    """Navigate through Easy Apply modal with form filling."""
+def handle_application_modal(page, form_filler, job_title="", company="", resume_dropdown_name="", job_id=None):
+    """
+    Navigate through Easy Apply modal with form filling.
+    Each step is driven by one read_modal_state() probe: fill the step,
+    then submit, go to the next step, or stop on errors.
+    Aborts early when a step repeats without progress or a required field
+    has no answer. Returns (submitted, skip_reason).
+    """
     print("   [Form] Attempting to navigate form...")
-    max_steps = 10
-    resume_selected = False
+    run = ModalRun(resume_dropdown_name)
+    state = read_modal_state(page)
 
-    for step in range(max_steps):
-        random_sleep(1, 2)
-
-        # Try to select resume on first 3 steps if not already done
-        if step < 3 and resume_dropdown_name and not resume_selected:
-            resume_radios = page.locator("input[type='radio'][id^='jobsDocumentCardToggle']:visible")
-            resume_header = page.locator("h3:has-text('Resume'):visible")
-            upload_btn = page.locator("button:has-text('Upload resume'):visible")
-            
-            radio_count = resume_radios.count()
-            header_count = resume_header.count()
-            upload_count = upload_btn.count()
-            
-            print(f"   [Debug] Step {step+1} resume check: radios={radio_count}, header={header_count}, upload={upload_count}")
-            
-            if radio_count > 0 or header_count > 0 or upload_count > 0:
-                print(f"   [Resume] Resume section detected on step {step + 1}")
-                resume_selected = select_resume_in_dropdown(page, resume_dropdown_name)
-
-        # Fill fields on current step
-        detect_and_fill_fields(page, form_filler, job_title, company)
-
-        # Check for "Submit application" button
-        submit_btn = page.locator("button[aria-label='Submit application']")
-        if submit_btn.count() > 0 and submit_btn.first.is_visible():
-            error_msg = page.locator("div.artdeco-inline-feedback--error")
-            if error_msg.count() > 0 and error_msg.first.is_visible():
-                print("   [Form] Validation error on submit page. Skipping.")
+    for step in range(run.max_steps):
+        with tracer.span("modal_step", step=step + 1):
+            if not run.step_open(step, state):
                 break
-            
-            print("   [Form] Clicking SUBMIT!")
-            submit_btn.first.click()
-            random_sleep(3, 5)
+            dom_recorder.capture(page, f"modal-step-{step + 1}")
 
-            close_btn = page.locator("button[aria-label='Dismiss']")
-            if close_btn.count() > 0 and close_btn.first.is_visible():
-                close_btn.first.click()
-            return True
+            if run.wants_resume(step, state):
+                with tracer.span("resume_select"):
+                    run.resume_selected = select_resume_in_dropdown(page, resume_dropdown_name)
 
-        # Check for "Next" or "Review" buttons
-        next_btn = page.locator("button[aria-label='Continue to next step']")
-        review_btn = page.locator("button[aria-label='Review your application']")
+            with tracer.span("snapshot"):
+                snapshot = snapshot_form(page)
+            if run.is_stuck(step, snapshot, state):
+                break
 
-        if next_btn.count() > 0 and next_btn.first.is_visible():
-            error_msg = page.locator("div.artdeco-inline-feedback--error")
-            if error_msg.count() > 0 and error_msg.first.is_visible():
-                print(f"   [Form] Step {step+1}: Validation error. Cannot proceed.")
+            # Fill fields on current step, then decide from the filled state
+            unknowns = detect_and_fill_fields(page, form_filler, job_title, company, snapshot, job_id)
+            if run.is_blocked(step, unknowns, form_filler.metrics):
                 break
-            
-            print(f"   [Form] Step {step+1}: Clicking Next...")
-            next_btn.first.click()
-            random_sleep(1, 2)
 
-        elif review_btn.count() > 0 and review_btn.first.is_visible():
-            error_msg = page.locator("div.artdeco-inline-feedback--error")
-            if error_msg.count() > 0 and error_msg.first.is_visible():
-                print(f"   [Form] Step {step+1}: Validation error. Cannot proceed.")
+            state = read_modal_state(page)
+            action = run.next_move(step, state)
+            if action is None:
                 break
-                
-            print(f"   [Form] Step {step+1}: Clicking Review...")
-            review_btn.first.click()
-            random_sleep(1, 2)
-        else:
-            print(f"   [Form] Step {step+1}: No navigation button found.")
-            break
+
+            page.locator(NAV_BUTTON_SELECTORS[action]).first.click()
+            wait_for(page, modal_step_changed(state.signature))
+            if action == "submit":
+                close_btn = page.locator("button[aria-label='Dismiss']")
+                if close_btn.count() > 0 and close_btn.first.is_visible():
+                    close_btn.first.click()
+                return True, None
+            state = read_modal_state(page)
 
     # Dismiss modal
     print("   [Form] Dismissing application...")
     dismiss_btn = page.locator("button[aria-label='Dismiss']")
     if dismiss_btn.count() > 0 and dismiss_btn.first.is_visible():
         dismiss_btn.first.click()
-        random_sleep(1, 2)
+        wait_for(page, discard_prompt())
 
-        discard_confirm = page.locator("button[data-control-name='discard_application_confirm_btn']")
+        discard_confirm = page.locator(DISCARD_CONFIRM_SELECTOR)
         if discard_confirm.count() > 0 and discard_confirm.first.is_visible():
             discard_confirm.first.click()
 
-    return False
+    return False, run.reason
 
 
 def go_to_next_page(page):
@@ -529,8 +307,9 @@ def go_to_next_page(page):
         
         next_page_btn = page.locator(f"button[aria-label='Page {next_num}']")
         if next_page_btn.count() > 0:
+            previous = card_list_signature(page)
             next_page_btn.first.click()
-            random_sleep(3, 5)
+            wait_for(page, card_list_changed(previous))
             return True
         
         return False
@@ -538,47 +317,81 @@ def go_to_next_page(page):
         return False
 
 
-def process_jobs_on_page(page, form_filler, stats):
-    """Process all jobs on current page."""
-    card_selector = "div.job-card-container"
-    
+def load_all_job_cards(page, max_rounds=15):
+    """Scroll the results list until the number of rendered cards stops growing."""
     job_list = page.locator("div.job-card-list")
     if job_list.count() > 0:
         job_list.first.hover()
-    
-    for _ in range(3):
+
+    last_count = -1
+    stable_rounds = 0
+    for _ in range(max_rounds):
+        count = page.locator(JOB_CARD_SELECTOR).count()
+        if count == last_count:
+            stable_rounds += 1
+            if stable_rounds >= 2:
+                break
+        else:
+            stable_rounds = 0
+        last_count = count
         page.mouse.wheel(0, 1500)
-        random_sleep(1, 2)
+        wait_for(page, card_count_above(count), CARD_SCROLL_TIMEOUT_MS, quiet=True)
 
-    count = page.locator(card_selector).count()
-    print(f"[ApplyPilot] Found {count} job cards on this page.")
+    return last_count
 
-    for idx in range(count):
-        if stats["applied"] >= MAX_APPLICATIONS_PER_RUN:
-            print(f"\n[ApplyPilot] Reached max applications ({MAX_APPLICATIONS_PER_RUN}). Stopping.")
-            return stats, True
-        
-        if stats["processed"] >= MAX_JOBS_TO_PROCESS:
-            print(f"\n[ApplyPilot] Reached max jobs to process ({MAX_JOBS_TO_PROCESS}). Stopping.")
+
+def process_jobs_on_page(page, form_filler, stats, job_index, job_filter, watchdog=None, seen_on_page=None):
+    """
+    Process all jobs on current page. Returns early (not stopping) when the
+    watchdog asks for a page recycle; seen_on_page carries the job ids
+    already handled so the fresh page resumes after them.
+    """
+    with tracer.span("harvest"):
+        load_all_job_cards(page)
+        cards = harvest_job_cards(page)
+    print(f"[ApplyPilot] Found {len(cards)} job cards on this page.")
+
+    record = outcome_recorder(job_index, partial(log_application, form_filler.store))
+    seen_on_page = set() if seen_on_page is None else seen_on_page
+    for card in cards:
+        if reached_run_limit(stats):
             return stats, True
 
-        stats["processed"] += 1
-        print(f"\n[ApplyPilot] Processing Job #{stats['processed']}...")
+        if watchdog and watchdog.due(stats["processed"]):
+            with tracer.span("memory_sample"):
+                if watchdog.sample(page, stats["processed"]):
+                    return stats, False
 
-        current_job = page.locator(card_selector).nth(idx)
+        # Skip jobs we've already handled before paying for a detail-pane load
+        if not triage_card(card, stats, job_index, job_filter, seen_on_page, record):
+            continue
 
-        try:
-            current_job.scroll_into_view_if_needed()
-            random_sleep(0.5, 1)
-        except:
-            pass
+        job_id = card["job_id"]
+        current_job = job_card_locator(page, card)
+
+        # Pacing between applications is a deliberate pause, not a page wait
+        if stats["processed"] > 0:
+            time.sleep(pacing_delay())
+
+        start_job(stats)
 
-        current_job.click()
-        random_sleep(2, 3)
+        with tracer.span("card_open", job_id=job_id):
+            try:
+                current_job.scroll_into_view_if_needed()
+            except:
+                pass
+
+            try:
+                current_job.click(timeout=10000)
+            except Exception as e:
+                print(f"   [Skip] Could not open card {job_id or card['index']}: {e}")
+                continue
+            wait_for(page, detail_pane_ready(job_id, card["title"]))
+        dom_recorder.capture(page, f"job-{job_id or card['index']}")
 
-        # Extract job info
-        job_title = ""
-        company = ""
+        # Extract job info (card values are the fallback)
+        job_title = card["title"]
+        company = card["company"]
         try:
             title_el = page.locator("h1.t-24, h2.t-24")
             if title_el.count() > 0:
@@ -591,11 +404,16 @@ def process_jobs_on_page(page, form_filler, stats):
 
         print(f"   [Job] {job_title} at {company}" if job_title else "   [Job] Unknown position")
 
-        if check_already_applied(page):
-            print("   [Skip] Already applied to this job.")
-            stats["already_applied"] += 1
+        with tracer.span("check_applied"):
+            already_applied = check_already_applied(page)
+        if already_applied:
+            finish_job(stats, record, job_title, company, "already_applied", None, job_id)
             continue
 
+        # Pick up answers saved by learn_fields.py since the last job
+        with tracer.span("sync_memory"):
+            form_filler.sync_memory()
+
         # Select appropriate resume
         resume_type = form_filler.set_job_context(job_title)
         resume_dropdown_name = form_filler.get_resume_dropdown_name()
@@ -608,75 +426,153 @@ def process_jobs_on_page(page, form_filler, stats):
 
             if "easy apply" in btn_text:
                 print("   [Apply] 'Easy Apply' button found. Clicking...")
+                started = time.monotonic()
                 apply_btn.first.click()
-                random_sleep(2, 3)
+                wait_for(page, modal_step_changed("closed"))
 
-                success = handle_application_modal(
-                    page, form_filler, job_title, company, resume_dropdown_name
+                success, reason = handle_application_modal(
+                    page, form_filler, job_title, company, resume_dropdown_name, job_id
                 )
-                if success:
-                    print("   [Apply] SUCCESS: Application submitted.")
-                    stats["applied"] += 1
-                    log_application(job_title, company, "submitted", resume_type)
-                else:
-                    print("   [Apply] SKIPPED: Could not complete form.")
-                    stats["skipped"] += 1
-                    log_application(job_title, company, "skipped", resume_type)
+                finish_job(stats, record, job_title, company, "submitted" if success else "skipped",
+                           resume_type, job_id, reason, started)
             else:
-                print("   [Skip] External application.")
-                stats["external"] += 1
+                finish_job(stats, record, job_title, company, "external", resume_type, job_id)
         else:
-            print("   [Skip] No apply button found.")
-            stats["no_button"] += 1
+            finish_job(stats, record, job_title, company, "no_button", resume_type, job_id)
+
+        # Persist anything learned or logged during this job
+        with tracer.span("flush"):
+            form_filler.flush()
 
     return stats, False
 
 
+def recycle_search_page(browser, watchdog, search_url, current_page, processed):
+    """Reopen the current results page in a fresh tab. Returns the page to continue on."""
+    print(f"\n[Watchdog] {watchdog.recycle_reason}: reopening search page {current_page} in a fresh tab.")
+    try:
+        with tracer.span("page_recycle"):
+            page = browser.replace_page(search_page_url(search_url, current_page))
+            page.wait_for_selector(JOB_CARD_SELECTOR, timeout=20000)
+        watchdog.record_recycle(processed, current_page)
+    except Exception as e:
+        print(f"[Watchdog] Recycle failed ({e}); continuing on the current page.")
+        watchdog.record_recycle(processed, current_page, ok=False)
+    return browser.page
+
+
+def prepare_replay():
+    """
+    Settings for an offline HAR replay: no pacing pauses, a fixed random
+    seed and Playwright call counting. Returns a scratch directory for state,
+    so replayed jobs never reach the real field memory or history.
+    """
+    set_pacing(0, 0)
+    random.seed(0)
+    install_playwright_call_counter()
+    return tempfile.TemporaryDirectory(prefix="applypilot-replay-state-")
+
+
+def report_replay(stats, elapsed, calls, browser, har_path):
+    """Print the replay's throughput and append it to REPLAY_RESULTS_PATH."""
+    result = {
+        "timestamp": datetime.now().isoformat(),
+        "har": str(har_path),
+        "jobs": stats["processed"],
+        "applied": stats["applied"],
+        "seconds": round(elapsed, 2),
+        "jobs_per_minute": round(stats["processed"] * 60 / elapsed, 2) if elapsed else 0.0,
+        "playwright_calls": calls,
+        "responses": browser.traffic.responses,
+        "bytes": browser.traffic.bytes,
+        "submits_blocked": browser.traffic.submits_blocked,
+        "requests_blocked": sum(browser.traffic.blocked.values()),
+    }
+    print(f"\n[Replay] {result['jobs']} jobs in {result['seconds']}s = {result['jobs_per_minute']} jobs/min")
+    print(f"[Replay] Playwright calls: {calls} | responses: {result['responses']} "
+          f"({result['bytes'] / 1e6:.1f} MB by Content-Length) | submits blocked: {result['submits_blocked']}")
+    with open(REPLAY_RESULTS_PATH, "a") as f:
+        f.write(json.dumps(result) + "\n")
+    print(f"[Replay] Result appended to {REPLAY_RESULTS_PATH}")
+
+
 def main():
     parser = argparse.ArgumentParser(description="ApplyPilot Agent - LinkedIn Easy Apply Automation")
     parser.add_argument("--keywords", type=str, help="Search keywords (e.g., 'frontend engineer')")
     parser.add_argument("--limit", type=int, help="Max applications to submit")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Run the asyncio agent loop (overlaps disk writes with browser waits)")
+    parser.add_argument("--trace", action="store_true",
+                        help="Time each phase, print p50/p95 and write a Chrome trace to traces/")
+    parser.add_argument("--record-har", metavar="PATH",
+                        help="Save the session's network traffic to a HAR file, plus DOM snapshots")
+    parser.add_argument("--replay-har", metavar="PATH",
+                        help="Rerun offline from a recorded HAR (no network, submits blocked) and report throughput")
+    parser.add_argument("--no-block", action="store_true",
+                        help="Load images, fonts and trackers too (compare card_open latency with --trace)")
     args = parser.parse_args()
+    if args.record_har and args.replay_har:
+        parser.error("--record-har and --replay-har can't be combined")
+
+    if args.trace:
+        start_tracing()
+
+    if args.use_async:
+        import asyncio
+        from agent_async import run_async
+        asyncio.run(run_async(args))
+        finish_tracing()
+        return
 
     search_url = build_search_url(keywords=args.keywords)
-    
-    browser = BrowserManager()
-    form_filler = FormFiller()
+    replay_state = prepare_replay() if args.replay_har else None
+
+    browser = BrowserManager(record_har=args.record_har, replay_har=args.replay_har,
+                             block_resources=BLOCK_RESOURCES and not args.no_block)
+    form_filler = FormFiller(store=scratch_store(replay_state.name) if replay_state else None)
+    job_index = JobIndex(form_filler.store)
+    job_filter = JobFilter(job_index)
+    print(f"[ApplyPilot] {len(job_index)} previously seen jobs indexed.")
 
     page = browser.launch()
-    print("[ApplyPilot] Browser launched. Please ensure you are logged in.")
+    print("[ApplyPilot] Please ensure you are logged in.")
+    if args.record_har:
+        print(f"[Record] Saving traffic to {args.record_har} (written on exit), DOM snapshots to {dom_snapshot_dir(args.record_har)}/")
+    if args.replay_har:
+        print(f"[Replay] Serving every request from {args.replay_har}; nothing goes to the network.")
 
+    started, calls = time.monotonic(), tracer.calls
     page.goto(search_url, timeout=60000)
     print(f"[ApplyPilot] Search loaded: {args.keywords or 'default keywords'}")
+    dom_recorder.capture(page, "search-page-1")
 
-    stats = {
-        "processed": 0,
-        "applied": 0,
-        "skipped": 0,
-        "already_applied": 0,
-        "external": 0,
-        "no_button": 0
-    }
+    stats = new_stats()
+    watchdog = PageWatchdog()
 
     try:
-        card_selector = "div.job-card-container"
-        page.wait_for_selector(card_selector, timeout=20000)
+        page.wait_for_selector(JOB_CARD_SELECTOR, timeout=20000)
         print("[ApplyPilot] Job cards detected.")
 
         current_page = 1
         should_stop = False
+        seen_on_page = set()
 
         while not should_stop and current_page <= MAX_PAGES:
             print(f"\n{'='*50}")
             print(f"[ApplyPilot] Processing Page {current_page}")
             print(f"{'='*50}")
 
-            stats, should_stop = process_jobs_on_page(page, form_filler, stats)
+            stats, should_stop = process_jobs_on_page(page, form_filler, stats, job_index, job_filter,
+                                                      watchdog, seen_on_page)
+            if watchdog.recycle_reason and not should_stop:
+                page = recycle_search_page(browser, watchdog, search_url, current_page, stats["processed"])
+                continue
 
             if not should_stop and ENABLE_PAGINATION and current_page < MAX_PAGES:
                 if go_to_next_page(page):
                     current_page += 1
-                    random_sleep(2, 3)
+                    seen_on_page = set()
+                    dom_recorder.capture(page, f"search-page-{current_page}")
                 else:
                     print("[ApplyPilot] No more pages available.")
                     break
@@ -688,23 +584,19 @@ def main():
     except Exception as e:
         print(f"[ApplyPilot] Error: {e}")
 
-    print(f"\n{'='*50}")
-    print("[ApplyPilot] Session Complete")
-    print(f"{'='*50}")
-    print(f"   Jobs Processed:   {stats['processed']}")
-    print(f"   Applied:          {stats['applied']}")
-    print(f"   Skipped (fields): {stats['skipped']}")
-    print(f"   Already Applied:  {stats['already_applied']}")
-    print(f"   External Links:   {stats['external']}")
-    print(f"   No Button:        {stats['no_button']}")
-
-    unknowns = form_filler.get_unknown_fields()
-    if unknowns:
-        print(f"\n[ApplyPilot] {len(unknowns)} unknown fields logged.")
-        print("   Run 'python learn_fields.py' to fill them in.")
+    print_session_summary(stats, form_filler, job_filter, save_run_metrics(form_filler))
+    watchdog.print_summary()
+    browser.traffic.print_summary()
+    save_run_stats(stats, watchdog)
+    if args.replay_har:
+        report_replay(stats, time.monotonic() - started, tracer.calls - calls, browser, args.replay_har)
+    finish_tracing()
 
+    form_filler.flush()
     browser.close()
+    if replay_state:
+        replay_state.cleanup()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,633 @@
+"""
+asyncio version of the agent loop, built on playwright.async_api.
+
+The browser steps are the same as agent.py and use the same pacing limits;
+every decision between them comes from job_flow, as in the sync loop.
+Disk writes (history records, unknown fields, memory flushes) go to a
+background writer thread, so they run while the browser is waiting.
+Run with:
+    python agent.py --async
+"""
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from browser import AsyncBrowserManager, dom_recorder, dom_snapshot_dir
+from form_filler import FormFiller
+from storage import open_store, scratch_store
+from job_index import JobIndex
+from job_filters import JobFilter
+from form_plan import build_answer_plan, log_unknowns, has_required_unknown, option_rejected
+from job_flow import (
+    ModalRun, new_stats, log_application, outcome_recorder, reached_run_limit, triage_card, start_job,
+    finish_job, record_write, save_run_metrics, save_run_stats, print_session_summary
+)
+from page_probes import (
+    JOB_CARD_SELECTOR, MODAL_ROOT_SELECTOR, FIELD_KEY_ATTR, ERROR_SELECTOR, NAV_BUTTON_SELECTORS,
+    SNAPSHOT_FORM_JS, HARVEST_CARDS_JS, MODAL_STATE_JS, APPLY_PLAN_JS, ModalState, empty_snapshot,
+    job_card_locator, field_locator, apply_plan_args
+)
+from waits import (
+    CARD_LIST_SIGNATURE_JS, DISCARD_CONFIRM_SELECTOR, modal_step_changed,
+    detail_pane_ready, discard_prompt, card_list_changed, card_count_above, pacing_delay
+)
+from agent import prepare_replay, report_replay
+from page_watchdog import PageWatchdog
+from tracing import tracer
+from config import (
+    build_search_url, search_page_url, ENABLE_PAGINATION, MAX_PAGES, MIN_DELAY_SECONDS, MAX_DELAY_SECONDS,
+    MEMORY_FLUSH_INTERVAL_SECONDS, WAIT_TIMEOUT_MS, CARD_SCROLL_TIMEOUT_MS, BATCH_FIELD_WRITES, BLOCK_RESOURCES
+)
+from playwright.async_api import TimeoutError
+
+
+async def random_sleep(min_sec=None, max_sec=None):
+    min_sec = min_sec or MIN_DELAY_SECONDS
+    max_sec = max_sec or MAX_DELAY_SECONDS
+    await asyncio.sleep(random.uniform(min_sec, max_sec))
+
+
+async def wait_for(page, condition, timeout_ms=WAIT_TIMEOUT_MS, quiet=False):
+    """Async waits.wait_for."""
+    label, js, arg = condition
+    try:
+        await page.wait_for_function(js, arg=arg, timeout=timeout_ms)
+        return True
+    except TimeoutError:
+        if not quiet:
+            print(f"   [Wait] No {label} after {timeout_ms / 1000:.0f}s; continuing.")
+    except Exception as e:
+        print(f"   [Wait] {label} wait failed: {e}")
+    return False
+
+
+async def read_modal_state(page, root_selector=MODAL_ROOT_SELECTOR):
+    """Async page_probes.read_modal_state."""
+    try:
+        data = await page.evaluate(MODAL_STATE_JS, [root_selector, ERROR_SELECTOR, list(NAV_BUTTON_SELECTORS.items())])
+    except Exception as e:
+        print(f"   [Form] Modal probe error: {e}")
+        return ModalState()
+    return ModalState.from_probe(data)
+
+
+async def card_list_signature(page):
+    try:
+        return await page.evaluate(CARD_LIST_SIGNATURE_JS, JOB_CARD_SELECTOR)
+    except Exception:
+        return ""
+
+
+class BackgroundWriter:
+    """
+    Runs blocking store calls on one worker thread, in submission order.
+    The event loop only schedules them; drain() waits for all of them.
+    """
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="applypilot-writer")
+        self.pending = set()
+
+    def submit(self, func, *args):
+        future = asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        self.pending.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        self.pending.discard(future)
+        if not future.cancelled() and future.exception():
+            print(f"[Writer] Background write failed: {future.exception()}")
+
+    async def drain(self):
+        if self.pending:
+            await asyncio.gather(*list(self.pending), return_exceptions=True)
+
+    async def close(self):
+        await self.drain()
+        self.executor.shutdown(wait=True)
+
+
+async def flush_periodically(writer, form_filler, interval=MEMORY_FLUSH_INTERVAL_SECONDS):
+    """Write-behind for field memory while the agent runs."""
+    while True:
+        await asyncio.sleep(interval)
+        writer.submit(tracer.wrap("flush", form_filler.flush))
+
+
+async def check_already_applied(page):
+    """Check if we've already applied to this job."""
+    applied_badge = page.locator("span.artdeco-inline-feedback__message:has-text('Applied')")
+    applied_badge2 = page.locator("li-icon[type='success-pebble-icon']")
+    applied_text = page.locator(".jobs-s-apply__application-link")
+
+    if await applied_badge.count() > 0 or await applied_badge2.count() > 0 or await applied_text.count() > 0:
+        return True
+
+    apply_btn = page.locator("button.jobs-apply-button")
+    if await apply_btn.count() > 0:
+        btn_text = (await apply_btn.first.inner_text()).strip().lower()
+        if "applied" in btn_text:
+            return True
+
+    return False
+
+
+async def uncheck_follow_company(page):
+    """Uncheck the 'Follow company' checkbox if present."""
+    try:
+        checkbox = page.locator("#follow-company-checkbox")
+        if await checkbox.count() > 0 and await checkbox.first.is_visible():
+            if await checkbox.first.is_checked():
+                await checkbox.first.evaluate("el => el.click()")
+                print("   [Form] Unchecked 'Follow company'")
+                return True
+    except Exception as e:
+        print(f"   [Form] Follow checkbox error: {e}")
+    return False
+
+
+async def select_resume_in_dropdown(page, resume_dropdown_name):
+    """
+    Select the correct resume from LinkedIn's resume list.
+    Same steps as agent.select_resume_in_dropdown.
+    """
+    try:
+        print(f"   [Resume] Looking for: {resume_dropdown_name}")
+
+        expand_btn = page.locator("button:has-text('more resumes')")
+        if await expand_btn.count() > 0 and await expand_btn.first.is_visible():
+            await expand_btn.first.click(force=True)
+            print("   [Resume] Expanded resume list")
+            await random_sleep(1, 2)
+
+        download_btns = page.locator("button[aria-label*='Download resume']")
+        btn_count = await download_btns.count()
+        print(f"   [Resume] Found {btn_count} resume download buttons")
+
+        if btn_count == 0:
+            print("   [Resume] No resume buttons found")
+            return False
+
+        target_index = -1
+        for i in range(btn_count):
+            aria_label = await download_btns.nth(i).get_attribute("aria-label") or ""
+            print(f"   [Resume] [{i}] {aria_label}")
+            if resume_dropdown_name.lower() in aria_label.lower():
+                target_index = i
+
+        if target_index == -1:
+            print(f"   [Resume] [X] Could not find: {resume_dropdown_name}")
+            return False
+
+        print(f"   [Resume] Target found at index {target_index}")
+
+        radios = page.locator("input[type='radio'][id^='jobsDocumentCardToggle']:visible")
+        radio_count = await radios.count()
+        if target_index >= radio_count:
+            print(f"   [Resume] [X] Radio index {target_index} out of range (found {radio_count} radios)")
+            return False
+
+        radio = radios.nth(target_index)
+
+        # Check before clicking so an already-selected resume isn't toggled off
+        if await radio.is_checked():
+            print(f"   [Resume] [OK] Already selected: {resume_dropdown_name}")
+            return True
+
+        print(f"   [Resume] Not currently selected, attempting to select...")
+        target_btn = download_btns.nth(target_index)
+
+        # STEP 1: Click the card/row
+        try:
+            card = target_btn.locator("xpath=ancestor::div[contains(@class, 'jobs-document-upload-redesign-card') or contains(@class, 'document-upload')][1]")
+            if await card.count() > 0:
+                await card.first.click(force=True)
+                print("   [Resume] [OK] Clicked card container")
+                await random_sleep(0.3, 0.5)
+                if await radio.is_checked():
+                    print(f"   [Resume] [OK] Successfully selected via card click: {resume_dropdown_name}")
+                    return True
+        except Exception as e:
+            print(f"   [Resume] Card click error: {e}")
+
+        # STEP 2: Click the radio directly
+        try:
+            await radio.click(force=True)
+            await random_sleep(0.3, 0.5)
+            print("   [Resume] [OK] Clicked radio button")
+            if await radio.is_checked():
+                print(f"   [Resume] [OK] Successfully selected via radio click: {resume_dropdown_name}")
+                return True
+        except Exception as e:
+            print(f"   [Resume] Radio click error: {e}")
+
+        # STEP 3: Force with JavaScript
+        try:
+            await radio.evaluate("""el => {
+                el.checked = true;
+                el.click();
+                el.dispatchEvent(new Event('change', { bubbles: true }));
+            }""")
+            await random_sleep(0.3, 0.5)
+            print("   [Resume] [OK] Forced radio via JS")
+            if await radio.is_checked():
+                print(f"   [Resume] [OK] Successfully selected via JS: {resume_dropdown_name}")
+                return True
+        except Exception as e:
+            print(f"   [Resume] JS force error: {e}")
+
+        print(f"   [Resume] [WARN] Could not confirm selection, but continuing...")
+        return True
+
+    except Exception as e:
+        print(f"   [Resume] Error: {e}")
+        return False
+
+
+async def snapshot_form(page, root_selector=MODAL_ROOT_SELECTOR):
+    """Async page_probes.snapshot_form."""
+    try:
+        snapshot = await page.evaluate(SNAPSHOT_FORM_JS, [root_selector, FIELD_KEY_ATTR])
+    except Exception as e:
+        print(f"   [Form] Snapshot error: {e}")
+        return empty_snapshot()
+    return snapshot or empty_snapshot()
+
+
+async def harvest_job_cards(page, card_selector=JOB_CARD_SELECTOR):
+    """Async page_probes.harvest_job_cards."""
+    try:
+        return await page.evaluate(HARVEST_CARDS_JS, card_selector) or []
+    except Exception as e:
+        print(f"[ApplyPilot] Card harvest error: {e}")
+        return []
+
+
+async def apply_plan(page, actions):
+    """Async page_probes.apply_plan."""
+    if not actions:
+        return []
+    try:
+        return await page.evaluate(APPLY_PLAN_JS, apply_plan_args(actions))
+    except Exception as e:
+        print(f"   [Form] Batch write error: {e}")
+        return None
+
+
+async def apply_action(page, action):
+    """Write one planned answer through its tagged locator. Returns True on success."""
+    try:
+        field = field_locator(page, action["key"])
+        if action["action"] == "fill":
+            await field.fill(action["answer"])
+        elif action["action"] == "select":
+            try:
+                await field.select_option(label=action["answer"])
+            except:
+                await field.select_option(value=action["answer"])
+        else:
+            await field.click()
+        return True
+    except:
+        return False
+
+
+async def detect_and_fill_fields(page, form_filler, writer, job_title="", company="", snapshot=None, job_id=None):
+    """
+    Snapshot the step, resolve answers, write them. Unknown fields are
+    logged by the background writer. Returns the unknown fields; nothing
+    is written if a required one is among them.
+    """
+    await uncheck_follow_company(page)
+
+    if snapshot is None:
+        snapshot = await snapshot_form(page)
+    with tracer.span("resolve", fields=sum(map(len, snapshot.values()))):
+        actions, unknowns = build_answer_plan(snapshot, form_filler)
+    if has_required_unknown(unknowns):
+        writer.submit(log_unknowns, form_filler, unknowns, job_title, company, job_id)
+        return unknowns
+
+    with tracer.span("write", actions=len(actions)):
+        results = (await apply_plan(page, actions) if BATCH_FIELD_WRITES else None) or [None] * len(actions)
+        for action, result in zip(actions, results):
+            ok = (result and result["ok"]) or (not option_rejected(result) and await apply_action(page, action))
+            record_write(action, ok, unknowns)
+
+    if unknowns:
+        writer.submit(log_unknowns, form_filler, unknowns, job_title, company, job_id)
+    return unknowns
+
+
+async def is_shown(locator):
+    return await locator.count() > 0 and await locator.first.is_visible()
+
+
+async def handle_application_modal(page, form_filler, writer, job_title="", company="", resume_dropdown_name="",
+                                   job_id=None):
+    """
+    Navigate through Easy Apply modal with form filling (see agent.handle_application_modal).
+    Returns (submitted, skip_reason).
+    """
+    print("   [Form] Attempting to navigate form...")
+    run = ModalRun(resume_dropdown_name)
+    state = await read_modal_state(page)
+
+    for step in range(run.max_steps):
+        with tracer.span("modal_step", step=step + 1):
+            if not run.step_open(step, state):
+                break
+            await dom_recorder.capture_async(page, f"modal-step-{step + 1}")
+
+            if run.wants_resume(step, state):
+                with tracer.span("resume_select"):
+                    run.resume_selected = await select_resume_in_dropdown(page, resume_dropdown_name)
+
+            with tracer.span("snapshot"):
+                snapshot = await snapshot_form(page)
+            if run.is_stuck(step, snapshot, state):
+                break
+
+            unknowns = await detect_and_fill_fields(page, form_filler, writer, job_title, company, snapshot, job_id)
+            if run.is_blocked(step, unknowns, form_filler.metrics):
+                break
+
+            state = await read_modal_state(page)
+            action = run.next_move(step, state)
+            if action is None:
+                break
+
+            await page.locator(NAV_BUTTON_SELECTORS[action]).first.click()
+            await wait_for(page, modal_step_changed(state.signature))
+            if action == "submit":
+                close_btn = page.locator("button[aria-label='Dismiss']")
+                if await is_shown(close_btn):
+                    await close_btn.first.click()
+                return True, None
+            state = await read_modal_state(page)
+
+    print("   [Form] Dismissing application...")
+    dismiss_btn = page.locator("button[aria-label='Dismiss']")
+    if await is_shown(dismiss_btn):
+        await dismiss_btn.first.click()
+        await wait_for(page, discard_prompt())
+
+        discard_confirm = page.locator(DISCARD_CONFIRM_SELECTOR)
+        if await is_shown(discard_confirm):
+            await discard_confirm.first.click()
+
+    return False, run.reason
+
+
+async def go_to_next_page(page):
+    """Navigate to the next page of results."""
+    try:
+        current_page = page.locator("button[aria-current='true']")
+        if await current_page.count() == 0:
+            return False
+
+        next_num = int((await current_page.first.inner_text()).strip()) + 1
+        next_page_btn = page.locator(f"button[aria-label='Page {next_num}']")
+        if await next_page_btn.count() > 0:
+            previous = await card_list_signature(page)
+            await next_page_btn.first.click()
+            await wait_for(page, card_list_changed(previous))
+            return True
+
+        return False
+    except:
+        return False
+
+
+async def load_all_job_cards(page, max_rounds=15):
+    """Scroll the results list until the number of rendered cards stops growing."""
+    job_list = page.locator("div.job-card-list")
+    if await job_list.count() > 0:
+        await job_list.first.hover()
+
+    last_count = -1
+    stable_rounds = 0
+    for _ in range(max_rounds):
+        count = await page.locator(JOB_CARD_SELECTOR).count()
+        if count == last_count:
+            stable_rounds += 1
+            if stable_rounds >= 2:
+                break
+        else:
+            stable_rounds = 0
+        last_count = count
+        await page.mouse.wheel(0, 1500)
+        await wait_for(page, card_count_above(count), CARD_SCROLL_TIMEOUT_MS, quiet=True)
+
+    return last_count
+
+
+async def process_jobs_on_page(page, form_filler, writer, stats, job_index, job_filter, watchdog=None,
+                               seen_on_page=None):
+    """Process all jobs on current page (see agent.process_jobs_on_page for the watchdog)."""
+    with tracer.span("harvest"):
+        await load_all_job_cards(page)
+        cards = await harvest_job_cards(page)
+    print(f"[ApplyPilot] Found {len(cards)} job cards on this page.")
+
+    # History records go to the background writer; the job index is updated at once
+    record = outcome_recorder(job_index, partial(writer.submit, log_application, form_filler.store))
+    seen_on_page = set() if seen_on_page is None else seen_on_page
+    for card in cards:
+        if reached_run_limit(stats):
+            return stats, True
+
+        if watchdog and watchdog.due(stats["processed"]):
+            with tracer.span("memory_sample"):
+                if await watchdog.sample_async(page, stats["processed"]):
+                    return stats, False
+
+        if not triage_card(card, stats, job_index, job_filter, seen_on_page, record):
+            continue
+
+        job_id = card["job_id"]
+        current_job = job_card_locator(page, card)
+
+        # Pacing between applications is a deliberate pause, not a page wait
+        if stats["processed"] > 0:
+            await asyncio.sleep(pacing_delay())
+
+        start_job(stats)
+
+        with tracer.span("card_open", job_id=job_id):
+            try:
+                await current_job.scroll_into_view_if_needed()
+            except:
+                pass
+
+            try:
+                await current_job.click(timeout=10000)
+            except Exception as e:
+                print(f"   [Skip] Could not open card {job_id or card['index']}: {e}")
+                continue
+            await wait_for(page, detail_pane_ready(job_id, card["title"]))
+        await dom_recorder.capture_async(page, f"job-{job_id or card['index']}")
+
+        job_title = card["title"]
+        company = card["company"]
+        try:
+            title_el = page.locator("h1.t-24, h2.t-24")
+            if await title_el.count() > 0:
+                job_title = (await title_el.first.inner_text()).strip()
+            company_el = page.locator("div.job-details-jobs-unified-top-card__company-name a")
+            if await company_el.count() > 0:
+                company = (await company_el.first.inner_text()).strip()
+        except:
+            pass
+
+        print(f"   [Job] {job_title} at {company}" if job_title else "   [Job] Unknown position")
+
+        with tracer.span("check_applied"):
+            already_applied = await check_already_applied(page)
+        if already_applied:
+            finish_job(stats, record, job_title, company, "already_applied", None, job_id)
+            continue
+
+        # Pick up answers saved by learn_fields.py since the last job
+        with tracer.span("sync_memory"):
+            form_filler.sync_memory()
+
+        resume_type = form_filler.set_job_context(job_title)
+        resume_dropdown_name = form_filler.get_resume_dropdown_name()
+        print(f"   [Resume] Type: {resume_type} | Dropdown: {resume_dropdown_name}")
+
+        apply_btn = page.locator("button.jobs-apply-button")
+
+        if await apply_btn.count() > 0:
+            btn_text = (await apply_btn.first.inner_text()).strip().lower()
+
+            if "easy apply" in btn_text:
+                print("   [Apply] 'Easy Apply' button found. Clicking...")
+                started = time.monotonic()
+                await apply_btn.first.click()
+                await wait_for(page, modal_step_changed("closed"))
+
+                success, reason = await handle_application_modal(
+                    page, form_filler, writer, job_title, company, resume_dropdown_name, job_id
+                )
+                finish_job(stats, record, job_title, company, "submitted" if success else "skipped",
+                           resume_type, job_id, reason, started)
+            else:
+                finish_job(stats, record, job_title, company, "external", resume_type, job_id)
+        else:
+            finish_job(stats, record, job_title, company, "no_button", resume_type, job_id)
+
+    return stats, False
+
+
+async def recycle_search_page(browser, watchdog, search_url, current_page, processed):
+    """Reopen the current results page in a fresh tab. Returns the page to continue on."""
+    print(f"\n[Watchdog] {watchdog.recycle_reason}: reopening search page {current_page} in a fresh tab.")
+    try:
+        with tracer.span("page_recycle"):
+            page = await browser.replace_page(search_page_url(search_url, current_page))
+            await page.wait_for_selector(JOB_CARD_SELECTOR, timeout=20000)
+        watchdog.record_recycle(processed, current_page)
+    except Exception as e:
+        print(f"[Watchdog] Recycle failed ({e}); continuing on the current page.")
+        watchdog.record_recycle(processed, current_page, ok=False)
+    return browser.page
+
+
+def load_agent_state(scratch_dir=None):
+    """
+    Build the store, form filler (matcher index) and job index. Runs in a thread.
+    scratch_dir: use a throwaway copy of field memory there (HAR replay).
+    """
+    # Flushing is driven by flush_periodically(), not by writes on the loop thread
+    if scratch_dir:
+        store = scratch_store(scratch_dir, flush_interval=float("inf"))
+    else:
+        store = open_store(flush_interval=float("inf"))
+    form_filler = FormFiller(store=store)
+    job_index = JobIndex(form_filler.store)
+    return form_filler, job_index
+
+
+async def run_async(args):
+    search_url = build_search_url(keywords=args.keywords)
+    replay_state = prepare_replay() if args.replay_har else None
+
+    browser = AsyncBrowserManager(record_har=args.record_har, replay_har=args.replay_har,
+                                  block_resources=BLOCK_RESOURCES and not args.no_block)
+    writer = BackgroundWriter()
+
+    # Load memory and history while the browser starts
+    state_task = asyncio.create_task(
+        asyncio.to_thread(load_agent_state, replay_state.name if replay_state else None)
+    )
+    page = await browser.launch()
+    print("[ApplyPilot] Please ensure you are logged in.")
+    if args.record_har:
+        print(f"[Record] Saving traffic to {args.record_har} (written on exit), DOM snapshots to {dom_snapshot_dir(args.record_har)}/")
+    if args.replay_har:
+        print(f"[Replay] Serving every request from {args.replay_har}; nothing goes to the network.")
+    form_filler, job_index = await state_task
+    job_filter = JobFilter(job_index)
+    print(f"[ApplyPilot] {len(job_index)} previously seen jobs indexed.")
+
+    flusher = asyncio.create_task(flush_periodically(writer, form_filler))
+
+    started, calls = time.monotonic(), tracer.calls
+    await page.goto(search_url, timeout=60000)
+    print(f"[ApplyPilot] Search loaded: {args.keywords or 'default keywords'}")
+    await dom_recorder.capture_async(page, "search-page-1")
+
+    stats = new_stats()
+    watchdog = PageWatchdog()
+
+    try:
+        await page.wait_for_selector(JOB_CARD_SELECTOR, timeout=20000)
+        print("[ApplyPilot] Job cards detected.")
+
+        current_page = 1
+        should_stop = False
+        seen_on_page = set()
+
+        while not should_stop and current_page <= MAX_PAGES:
+            print(f"\n{'='*50}")
+            print(f"[ApplyPilot] Processing Page {current_page}")
+            print(f"{'='*50}")
+
+            stats, should_stop = await process_jobs_on_page(page, form_filler, writer, stats, job_index, job_filter,
+                                                            watchdog, seen_on_page)
+            if watchdog.recycle_reason and not should_stop:
+                page = await recycle_search_page(browser, watchdog, search_url, current_page, stats["processed"])
+                continue
+
+            if not should_stop and ENABLE_PAGINATION and current_page < MAX_PAGES:
+                if await go_to_next_page(page):
+                    current_page += 1
+                    seen_on_page = set()
+                    await dom_recorder.capture_async(page, f"search-page-{current_page}")
+                else:
+                    print("[ApplyPilot] No more pages available.")
+                    break
+            else:
+                break
+
+    except TimeoutError:
+        print("[ApplyPilot] Timeout waiting for elements.")
+    except Exception as e:
+        print(f"[ApplyPilot] Error: {e}")
+
+    flusher.cancel()
+    writer.submit(tracer.wrap("flush", form_filler.flush))
+    await writer.close()
+
+    print_session_summary(stats, form_filler, job_filter, save_run_metrics(form_filler))
+    watchdog.print_summary()
+    browser.traffic.print_summary()
+    save_run_stats(stats, watchdog)
+    if args.replay_har:
+        report_replay(stats, time.monotonic() - started, tracer.calls - calls, browser, args.replay_har)
+    await browser.close()
+    if replay_state:
+        replay_state.cleanup()
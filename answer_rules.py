@@ -0,0 +1,104 @@
+"""
+Compiled keyword rules for answering form questions from resume data.
+All rules are folded into one regex, so a question is scanned once and
+the highest-priority matching rule wins regardless of where it matches.
+"""
+import json
+import re
+from pathlib import Path
+
+
+def resolve_path(data, dotted_path):
+    """Look up 'a.b.c' in nested dicts; returns None if any key is missing."""
+    value = data
+    for key in dotted_path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def load_rules(path):
+    """Load extra rules from a JSON list, or return [] if the file is absent."""
+    path = Path(path)
+    if not path.exists():
+        return []
+    try:
+        with open(path, "r") as f:
+            rules = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[Warning] Could not load answer rules from {path}: {e}")
+        return []
+    if not isinstance(rules, list):
+        print(f"[Warning] {path} must contain a JSON list of rules. Ignoring it.")
+        return []
+    return rules
+
+
+class AnswerRules:
+    """
+    Keyword -> resume answer rules compiled into a single regex.
+
+    Each rule becomes one named alternative, in priority order, inside a
+    lookahead. Scanning with finditer therefore reports every position at
+    which any rule matches, and the lowest rule index among them wins.
+    Answers are resolved from the resume once, at construction time.
+    """
+
+    def __init__(self, resume, rules):
+        self.rules = []
+        self.answers = []
+        alternatives = []
+
+        for rule in rules:
+            pattern = self._rule_pattern(rule)
+            if pattern is None:
+                print(f"[Warning] Answer rule {rule.get('name', '?')} has no keywords or pattern. Skipping.")
+                continue
+            idx = len(self.rules)
+            alternatives.append(f"(?P<r{idx}>{pattern})")
+            self.rules.append(rule)
+            self.answers.append(self._rule_answer(rule, resume))
+
+        self._regex = re.compile(f"(?=(?:{'|'.join(alternatives)}))") if alternatives else None
+
+    @staticmethod
+    def _rule_pattern(rule):
+        if rule.get("pattern"):
+            return f"(?:{rule['pattern']})"
+        keywords = rule.get("keywords") or []
+        if not keywords:
+            return None
+        escaped = "|".join(re.escape(kw.lower()) for kw in keywords)
+        plural = "s?" if rule.get("plural", True) else ""
+        return rf"\b(?:{escaped}){plural}\b"
+
+    @staticmethod
+    def _rule_answer(rule, resume):
+        if "value" in rule:
+            value = rule["value"]
+        else:
+            value = resolve_path(resume, rule.get("answer", ""))
+        if isinstance(value, bool):
+            return "Yes" if value else "No"
+        return value
+
+    def match(self, question):
+        """
+        Return (answer, rule_name) for the highest-priority rule matching
+        the question, or (None, None).
+        """
+        if self._regex is None:
+            return None, None
+
+        best = None
+        for m in self._regex.finditer(question.lower()):
+            idx = int(m.lastgroup[1:])
+            if best is None or idx < best:
+                best = idx
+                if best == 0:
+                    break
+
+        if best is None:
+            return None, None
+        return self.answers[best], self.rules[best].get("name", f"rule_{best}")
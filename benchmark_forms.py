@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""
+Benchmark form filling against offline Easy Apply fixtures.
+
+Generates fixture pages (fixture_forms.py) with 5 to 200 questions and runs
+the real agent functions on them in headless Chromium: click Easy Apply,
+then handle_application_modal() through every step to Submit. Field memory
+is a temporary copy of field_memory.json, so nothing real is changed.
+
+Reports per form size: modal steps per second, Playwright calls per field,
+answer resolution time and how many fields the page received.
+
+Usage:
+    python benchmark_forms.py
+    python benchmark_forms.py --sizes 20 200 --runs 5 --latency-ms 300
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import tempfile
+import time
+
+from playwright.sync_api import sync_playwright
+
+from fixture_forms import generate_form, write_fixture, RESUMES
+from form_filler import FormFiller
+from storage import scratch_store
+from tracing import tracer, install_playwright_call_counter
+from waits import wait_for, modal_step_changed
+from agent import handle_application_modal
+
+
+def temp_form_filler(workdir):
+    """FormFiller on a throwaway copy of field memory."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return FormFiller(store=scratch_store(workdir))
+
+
+def run_form(page, url, form_filler, resume_name, verbose=False):
+    """Open the fixture, apply, and return the run's measurements."""
+    page.goto(url)
+    tracer.spans = []
+    calls = tracer.calls
+    start = time.perf_counter()
+    with contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO()):
+        page.locator("button.jobs-apply-button").first.click()
+        wait_for(page, modal_step_changed("closed"))
+        submitted, reason = handle_application_modal(page, form_filler, "Synthetic Software Engineer",
+                                                     "Fixture Co", resume_name)
+    elapsed = time.perf_counter() - start
+
+    fixture = page.evaluate("window.fixtureState")
+    spans = tracer.spans
+    return {
+        "elapsed": elapsed,
+        "calls": tracer.calls - calls,
+        "steps": sum(1 for s in spans if s["name"] == "modal_step"),
+        "resolve": sum(s["duration"] for s in spans if s["name"] == "resolve"),
+        "write": sum(s["duration"] for s in spans if s["name"] == "write"),
+        "filled": len(fixture["values"]),
+        "result": "submitted" if submitted else reason,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark form filling on offline Easy Apply fixtures")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 20, 50, 100, 200], help="Questions per form")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per size (median is reported)")
+    parser.add_argument("--per-step", type=int, default=8, help="Questions per modal step")
+    parser.add_argument("--unknown-ratio", type=float, default=0.1)
+    parser.add_argument("--latency-ms", type=int, default=0, help="Fixture delay before each step renders")
+    parser.add_argument("--warm", action="store_true", help="Keep the answer-plan cache between runs")
+    parser.add_argument("--switch-resume", action="store_true",
+                        help="Pick a resume that isn't preselected (exercises the card click path)")
+    parser.add_argument("--verbose", action="store_true", help="Show the agent's own output")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    tracer.enabled = True
+    if not install_playwright_call_counter():
+        print("[Bench] Playwright call counting unavailable; calls column will read 0.")
+
+    resume_name = RESUMES[1 if args.switch_resume else 0]
+
+    with tempfile.TemporaryDirectory(prefix="applypilot-bench-") as workdir, sync_playwright() as p:
+        form_filler = temp_form_filler(workdir)
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+
+        print(f"{'fields':>6} {'steps':>6} {'result':<17} {'total ms':>9} {'steps/s':>8} "
+              f"{'calls':>6} {'calls/fld':>9} {'resolve ms':>10} {'write ms':>9} {'filled':>7}")
+        print("-" * 96)
+
+        for size in args.sizes:
+            spec = generate_form(size, args.seed, args.per_step, args.unknown_ratio, latency_ms=args.latency_ms)
+            url = write_fixture(spec, workdir).resolve().as_uri()
+
+            runs = []
+            for _ in range(args.runs):
+                if not args.warm:
+                    form_filler.plan_cache.invalidate()
+                runs.append(run_form(page, url, form_filler, resume_name, args.verbose))
+
+            median = {key: statistics.median(run[key] for run in runs)
+                      for key in ("elapsed", "calls", "steps", "resolve", "write", "filled")}
+            results = sorted({run["result"] for run in runs})
+            print(f"{size:>6} {median['steps']:>6.0f} {'/'.join(results):<17} {median['elapsed'] * 1000:>9.1f} "
+                  f"{median['steps'] / median['elapsed']:>8.1f} {median['calls']:>6.0f} "
+                  f"{median['calls'] / size:>9.2f} {median['resolve'] * 1000:>10.2f} "
+                  f"{median['write'] * 1000:>9.2f} {median['filled']:>4.0f}/{size}")
+
+        browser.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Benchmark fuzzy question matching backends.
+Compares the original linear difflib scan with the n-gram index and the
+NumPy TF-IDF matcher at 100, 1k and 10k known fields.
+
+Usage:
+    python benchmark_matcher.py
+    python benchmark_matcher.py --sizes 100 1000 --queries 50
+"""
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+
+from matcher import LinearMatcher, FuzzyIndex, TfidfMatcher, np
+
+FILLER_WORDS = [
+    "are", "you", "willing", "to", "work", "in", "the", "office", "with", "years",
+    "experience", "python", "java", "react", "authorized", "sponsorship", "salary",
+    "start", "date", "relocate", "degree", "gpa", "hybrid", "onsite", "remote",
+    "employed", "by", "previously", "have", "do", "how", "many", "what", "is", "your",
+]
+
+
+def load_seed_questions(memory_path="field_memory.json"):
+    path = Path(memory_path)
+    if not path.exists():
+        return []
+    with open(path, "r") as f:
+        return list(json.load(f).get("known_fields", {}))
+
+
+def synthetic_questions(count, seed_questions, rng):
+    """Real questions from memory padded out with generated ones."""
+    questions = list(dict.fromkeys(seed_questions))[:count]
+    while len(questions) < count:
+        words = [rng.choice(FILLER_WORDS) for _ in range(rng.randint(4, 14))]
+        questions.append(" ".join(words).capitalize() + "?")
+    return questions
+
+
+def perturb(question, rng):
+    """A realistic near-miss: dropped punctuation, case change or an extra word."""
+    variants = [
+        question.rstrip("?"),
+        question.lower(),
+        question.replace("you", "you currently", 1),
+        f"{question}\nRequired",
+    ]
+    return rng.choice(variants)
+
+
+def time_queries(matcher, queries, batched=False):
+    start = time.perf_counter()
+    if batched:
+        matcher.top_k_batch(queries, k=1, threshold=matcher.default_threshold)
+    else:
+        for query in queries:
+            matcher.best_match(query)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark question matching backends")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--queries", type=int, default=30, help="Questions per size (one form step ~ 15)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    seed_questions = load_seed_questions()
+
+    backends = [("difflib", LinearMatcher), ("index", FuzzyIndex)]
+    if np is not None:
+        backends.append(("tfidf", TfidfMatcher))
+    else:
+        print("[Bench] numpy not installed; skipping tfidf backend.")
+
+    print(f"{'fields':>7} {'backend':<14} {'build ms':>10} {'ms/query':>10} {'total ms':>10}")
+    print("-" * 55)
+
+    for size in args.sizes:
+        known = synthetic_questions(size, seed_questions, rng)
+        queries = [perturb(rng.choice(known), rng) for _ in range(args.queries)]
+
+        for name, matcher_cls in backends:
+            start = time.perf_counter()
+            matcher = matcher_cls(known)
+            build_ms = (time.perf_counter() - start) * 1000
+
+            runs = [(name, False)]
+            if name == "tfidf":
+                runs.append(("tfidf (batch)", True))
+
+            for label, batched in runs:
+                total_ms = time_queries(matcher, queries, batched) * 1000
+                print(f"{size:>7} {label:<14} {build_ms:>10.1f} {total_ms / len(queries):>10.3f} {total_ms:>10.1f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
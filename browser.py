@@ -1,43 +1,598 @@
-from playwright.sync_api import sync_playwright
+import argparse
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import urllib.request
+from collections import Counter
+from datetime import datetime
+from playwright.sync_api import sync_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import async_playwright
 from pathlib import Path
+from config import (
+    BLOCK_RESOURCES, BLOCKED_RESOURCE_TYPES, BLOCKED_URL_PATTERNS, ALLOWED_URL_PATTERNS,
+    BROWSER_DAEMON_PORT, BROWSER_DAEMON_ENDPOINT, BROWSER_DAEMON_STATUS_PATH, BROWSER_DAEMON_HEALTH_SECONDS
+)
+from storage import atomic_write_json
+
+try:
+    import psutil
+except ImportError:  # Daemon process memory is reported only if psutil is installed
+    psutil = None
+
+SLOW_MO_MS = 100   # Slight delay on every action to mimic human interaction
+
+# Easy Apply submission requests. Blocked during HAR replay even if the HAR has them.
+SUBMIT_URL_PATTERN = re.compile(r"submitApplication|easyApply|OnsiteApplyApplication", re.IGNORECASE)
+
+
+def dom_snapshot_dir(har_path):
+    """Where DOM snapshots of a recording go: next to the HAR, e.g. run.har -> run_dom/."""
+    har_path = Path(har_path)
+    return har_path.with_name(har_path.stem + "_dom")
+
+
+class DomRecorder:
+    """
+    Saves the page HTML at agent checkpoints (search page, job opened, each
+    modal step) while a session is being recorded. A no-op otherwise.
+    """
+
+    def __init__(self):
+        self.directory = None
+        self.count = 0
+
+    def start(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.count = 0
+
+    def _path(self, label):
+        self.count += 1
+        safe = re.sub(r"[^A-Za-z0-9_-]+", "-", label)[:60]
+        return self.directory / f"{self.count:04d}-{safe}.html"
+
+    def capture(self, page, label):
+        if self.directory is None:
+            return
+        try:
+            self._path(label).write_text(page.content())
+        except Exception as e:
+            print(f"[Record] DOM snapshot '{label}' failed: {e}")
+
+    async def capture_async(self, page, label):
+        if self.directory is None:
+            return
+        try:
+            self._path(label).write_text(await page.content())
+        except Exception as e:
+            print(f"[Record] DOM snapshot '{label}' failed: {e}")
+
+
+dom_recorder = DomRecorder()
+
+# Typical response sizes, for estimating what blocked requests would have cost
+# when this run saw no response of that type
+TYPICAL_RESPONSE_BYTES = {"image": 20_000, "media": 400_000, "font": 40_000}
+DEFAULT_RESPONSE_BYTES = 2_000
+
+
+class TrafficStats:
+    """
+    Responses and bytes seen by the browser context, requests blocked by the
+    ResourcePolicy (by reason), and submits blocked in replay.
+    """
+
+    def __init__(self):
+        self.responses = 0
+        self.bytes = 0
+        self.submits_blocked = 0
+        self.blocked = Counter()           # reason (resource type or "tracking") -> requests
+        self.blocked_types = Counter()     # resource type -> requests
+        self.type_bytes = Counter()        # resource type -> bytes of responses seen
+        self.type_responses = Counter()
+
+    def on_response(self, response):
+        # Content-Length from the response headers (no extra Playwright call); 0 if absent
+        self.responses += 1
+        try:
+            size = int(response.headers.get("content-length") or 0)
+        except ValueError:
+            size = 0
+        self.bytes += size
+        if size:
+            resource_type = response.request.resource_type
+            self.type_bytes[resource_type] += size
+            self.type_responses[resource_type] += 1
+
+    def record_blocked(self, reason, resource_type):
+        self.blocked[reason] += 1
+        self.blocked_types[resource_type] += 1
+
+    def bytes_saved(self):
+        """Estimate: blocked requests x average size of that type (seen this run, else typical)."""
+        total = 0
+        for resource_type, count in self.blocked_types.items():
+            if self.type_responses[resource_type]:
+                average = self.type_bytes[resource_type] / self.type_responses[resource_type]
+            else:
+                average = TYPICAL_RESPONSE_BYTES.get(resource_type, DEFAULT_RESPONSE_BYTES)
+            total += count * average
+        return int(total)
+
+    def print_summary(self):
+        if not self.responses and not self.blocked:
+            return
+        print(f"   Network:          {self.responses} responses, {self.bytes / 1e6:.1f} MB (by Content-Length)")
+        if self.blocked:
+            reasons = ", ".join(f"{reason} {count}" for reason, count in self.blocked.most_common())
+            print(f"   Blocked requests: {sum(self.blocked.values())} ({reasons}), "
+                  f"~{self.bytes_saved() / 1e6:.1f} MB saved (estimated)")
+
+    def block_submit(self, route):
+        """Route handler: answer application submits locally so nothing is sent."""
+        if route.request.method != "POST":
+            return route.fallback()
+        self.submits_blocked += 1
+        print(f"[Replay] Blocked application submit: {route.request.url[:80]}")
+        return route.fulfill(status=200, json={})
+
+
+class ResourcePolicy:
+    """
+    context.route handler that aborts requests the agent never uses: by
+    resource type (images, media, fonts) and by URL (tracking beacons).
+    URLs matching an allow pattern always go through.
+    """
+
+    def __init__(self, traffic, resource_types=BLOCKED_RESOURCE_TYPES,
+                 url_patterns=BLOCKED_URL_PATTERNS, allow_patterns=ALLOWED_URL_PATTERNS):
+        self.traffic = traffic
+        self.resource_types = set(resource_types)
+        self.url_pattern = re.compile("|".join(url_patterns)) if url_patterns else None
+        self.allow_pattern = re.compile("|".join(allow_patterns)) if allow_patterns else None
+
+    def block_reason(self, request):
+        """Why a request should be blocked, or None to let it through."""
+        url = request.url
+        if self.allow_pattern and self.allow_pattern.search(url):
+            return None
+        if request.resource_type in self.resource_types:
+            return request.resource_type
+        if self.url_pattern and self.url_pattern.search(url):
+            return "tracking"
+        return None
+
+    def handle(self, route):
+        reason = self.block_reason(route.request)
+        if reason is None:
+            return route.fallback()
+        self.traffic.record_blocked(reason, route.request.resource_type)
+        return route.abort("blockedbyclient")
+
+
+def launch_options(profile_path, record_har=None, replay_har=None):
+    """
+    launch_persistent_context() arguments. Recording adds the HAR options;
+    replay runs headless, without slow_mo, on the profile given (a throwaway
+    one), since every response comes from the HAR.
+    """
+    options = {
+        "user_data_dir": profile_path,
+        "headless": False,  # IMPORTANT: keep this false to avoid detection
+        "slow_mo": SLOW_MO_MS,
+        "args": [
+            "--start-maximized",
+            "--disable-blink-features=AutomationControlled"
+        ],
+    }
+    if record_har:
+        options["record_har_path"] = record_har
+        options["record_har_mode"] = "full"
+    if replay_har:
+        options["headless"] = True
+        options["slow_mo"] = 0
+    return options
+
+
+def browser_version(endpoint, timeout=0.5):
+    """The /json/version record of the browser on a CDP endpoint, or None if nothing answers."""
+    if not endpoint:
+        return None
+    try:
+        with urllib.request.urlopen(f"{endpoint}/json/version", timeout=timeout) as response:
+            return json.load(response)
+    except (OSError, ValueError):
+        return None
+
+
+def daemon_alive(endpoint=BROWSER_DAEMON_ENDPOINT, timeout=0.5):
+    """True if any browser answers on the CDP endpoint."""
+    return browser_version(endpoint, timeout) is not None
+
+
+def is_our_daemon(endpoint=BROWSER_DAEMON_ENDPOINT, status_path=BROWSER_DAEMON_STATUS_PATH):
+    """
+    True only if the browser on the endpoint is the one `browser.py serve`
+    started: its browser websocket URL (unique per launch) must match the
+    one in the daemon's status file. Other debugging sessions are left alone.
+    """
+    version = browser_version(endpoint)
+    if version is None:
+        return False
+    try:
+        with open(status_path) as f:
+            status = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return bool(status.get("browser_ws")) and status["browser_ws"] == version.get("webSocketDebuggerUrl")
+
+
+def memory_from_metrics(metrics):
+    """JS heap (MB) and DOM node count from Performance.getMetrics. Nodes includes detached ones."""
+    values = {m["name"]: m["value"] for m in metrics["metrics"]}
+    return {"js_heap_mb": round(values.get("JSHeapUsedSize", 0) / 1e6, 1),
+            "dom_nodes": int(values.get("Nodes", 0))}
+
+
+def page_memory(page):
+    """JS heap and DOM node count of a page, from CDP Performance.getMetrics."""
+    session = page.context.new_cdp_session(page)
+    try:
+        session.send("Performance.enable")
+        return memory_from_metrics(session.send("Performance.getMetrics"))
+    finally:
+        session.detach()
+
+
+async def page_memory_async(page):
+    session = await page.context.new_cdp_session(page)
+    try:
+        await session.send("Performance.enable")
+        return memory_from_metrics(await session.send("Performance.getMetrics"))
+    finally:
+        await session.detach()
+
+
+def chromium_rss_mb(port):
+    """Resident memory of the Chromium serving this debugging port and its children; None without psutil."""
+    if psutil is None:
+        return None
+    flag = f"--remote-debugging-port={port}"
+    total = 0
+    try:
+        for proc in psutil.process_iter(["cmdline"]):
+            if flag in (proc.info["cmdline"] or []):
+                total += proc.memory_info().rss
+                total += sum(child.memory_info().rss for child in proc.children(recursive=True))
+    except psutil.Error:
+        pass
+    return round(total / 1e6, 1)
+
+
+class BrowserDaemon:
+    """
+    Long-lived Chromium on the persistent profile, reachable over CDP.
+
+    Started with `python browser.py serve`. While it runs, BrowserManager
+    attaches to it with connect_over_cdp instead of launching Chromium, so
+    a run skips the browser launch and starts on a warm profile. Every
+    health interval it samples its pages' memory and writes a status file.
+    """
+
+    def __init__(self, profile_dir: str = "browser_profile", port=BROWSER_DAEMON_PORT,
+                 status_path=BROWSER_DAEMON_STATUS_PATH):
+        self.profile_path = Path(profile_dir)
+        self.port = port
+        self.status_path = Path(status_path)
+        self.started_at = None
+        self.browser_ws = None    # Identifies this launch (see is_our_daemon)
+
+    def health(self, context):
+        """Status record: pages open, summed JS heap and DOM nodes, process memory."""
+        heap, nodes = 0.0, 0
+        for page in context.pages:
+            try:
+                memory = page_memory(page)
+            except PlaywrightError:
+                continue  # Closed while sampling
+            heap += memory["js_heap_mb"]
+            nodes += memory["dom_nodes"]
+        return {
+            "pid": os.getpid(),
+            "endpoint": f"http://127.0.0.1:{self.port}",
+            "browser_ws": self.browser_ws,
+            "profile": str(self.profile_path),
+            "started_at": self.started_at.isoformat(),
+            "checked_at": datetime.now().isoformat(),
+            "uptime_s": round((datetime.now() - self.started_at).total_seconds()),
+            "pages": len(context.pages),
+            "js_heap_mb": round(heap, 1),
+            "dom_nodes": nodes,
+            "rss_mb": chromium_rss_mb(self.port),
+        }
+
+    def report(self, context):
+        status = self.health(context)
+        atomic_write_json(self.status_path, status)
+        rss = f", process {status['rss_mb']} MB" if status["rss_mb"] is not None else ""
+        print(f"[Daemon] {datetime.now():%H:%M:%S} up {status['uptime_s']}s | {status['pages']} pages | "
+              f"JS heap {status['js_heap_mb']} MB | {status['dom_nodes']} DOM nodes{rss}")
+
+    def serve(self, interval=BROWSER_DAEMON_HEALTH_SECONDS):
+        """Run Chromium until its window is closed, `browser.py stop`, or Ctrl+C."""
+        if daemon_alive(f"http://127.0.0.1:{self.port}"):
+            print(f"[Daemon] Port {self.port} is already serving a browser.")
+            return
+        options = launch_options(self.profile_path)
+        options["args"] = options["args"] + [
+            f"--remote-debugging-port={self.port}",
+            "--remote-debugging-address=127.0.0.1",
+        ]
+        with sync_playwright() as playwright:
+            context = playwright.chromium.launch_persistent_context(**options)
+            self.started_at = datetime.now()
+            version = browser_version(f"http://127.0.0.1:{self.port}", timeout=5)
+            if version is None:
+                context.close()
+                raise RuntimeError(f"Chromium did not open its debugging port {self.port}.")
+            self.browser_ws = version.get("webSocketDebuggerUrl")
+            # The first tab stays open so Chromium doesn't exit when a run closes its page
+            print(f"[Daemon] Browser ready on http://127.0.0.1:{self.port} (profile {self.profile_path}).")
+            print("[Daemon] Agent runs will attach to it. Ctrl+C or `python browser.py stop` to shut down.")
+            try:
+                self.report(context)
+                while True:
+                    try:
+                        context.wait_for_event("close", timeout=interval * 1000)
+                        break
+                    except PlaywrightTimeoutError:
+                        self.report(context)
+            except KeyboardInterrupt:
+                context.close()
+            finally:
+                self.status_path.unlink(missing_ok=True)
+        print("[Daemon] Browser closed.")
+
+
+def daemon_status(endpoint=BROWSER_DAEMON_ENDPOINT, status_path=BROWSER_DAEMON_STATUS_PATH):
+    """Print whether the daemon answers and its last health record."""
+    version = browser_version(endpoint, timeout=2)
+    if version is None:
+        print(f"[Daemon] Not running at {endpoint}.")
+        return None
+    if not is_our_daemon(endpoint, status_path):
+        print(f"[Daemon] {endpoint} is another browser's debugging port, not the ApplyPilot daemon.")
+        return None
+    print(f"[Daemon] Running at {endpoint}: {version.get('Browser', 'unknown browser')}")
+    path = Path(status_path)
+    if not path.exists():
+        print(f"[Daemon] No health record at {path} yet.")
+        return None
+    with open(path) as f:
+        status = json.load(f)
+    for key, value in status.items():
+        print(f"   {key:<12} {value}")
+    return status
+
+
+def stop_daemon(endpoint=BROWSER_DAEMON_ENDPOINT):
+    """Close the daemon's browser over CDP; the serve loop then exits."""
+    if not is_our_daemon(endpoint):
+        print(f"[Daemon] No ApplyPilot daemon running at {endpoint}.")
+        return False
+    with sync_playwright() as playwright:
+        browser = playwright.chromium.connect_over_cdp(endpoint)
+        try:
+            browser.new_browser_cdp_session().send("Browser.close")
+        except PlaywrightError:
+            pass  # The connection drops as the browser exits
+    print("[Daemon] Browser closed.")
+    return True
 
 
 class BrowserManager:
     """
     Manages a persistent Playwright browser session.
     This allows ApplyPilot Agent to reuse login state across runs.
+
+    record_har: also save all network traffic to this HAR file (written on
+    close) plus DOM snapshots at agent checkpoints (see dom_recorder).
+    replay_har: serve every request from this HAR with no network access,
+    in a throwaway profile; application submits are answered locally.
+    block_resources: abort requests the agent never uses (see ResourcePolicy).
+    daemon_endpoint: attach to the BrowserDaemon serving here, once is_our_daemon
+    confirms it is ours (never when recording or replaying, which need their
+    own browser).
     """
 
-    def __init__(self, profile_dir: str = "browser_profile"):
+    def __init__(self, profile_dir: str = "browser_profile", record_har=None, replay_har=None,
+                 block_resources=BLOCK_RESOURCES, daemon_endpoint=BROWSER_DAEMON_ENDPOINT):
         self.profile_path = Path(profile_dir)
+        self.record_har = Path(record_har) if record_har else None
+        self.replay_har = Path(replay_har) if replay_har else None
+        self.daemon_endpoint = None if record_har or replay_har else daemon_endpoint
+        self.traffic = TrafficStats()
+        self.resource_policy = ResourcePolicy(self.traffic) if block_resources else None
         self.playwright = None
+        self.browser = None          # Set when attached to the daemon
         self.browser_context = None
         self.page = None
 
     def launch(self):
         """
-        Launch a persistent Chromium browser with a saved user profile.
+        Attach to the browser daemon, or launch a persistent Chromium
+        browser with a saved user profile.
         """
+        started = time.perf_counter()
         self.playwright = sync_playwright().start()
 
-        self.browser_context = self.playwright.chromium.launch_persistent_context(
-            user_data_dir=self.profile_path,
-            headless=False,  # IMPORTANT: keep this false to avoid detection
-            slow_mo=100,     # Slight delay to mimic human interaction
-            args=[
-                "--start-maximized",
-                "--disable-blink-features=AutomationControlled"
-            ],
-        )
-
-        self.page = self.browser_context.pages[0]
+        if self.daemon_endpoint and is_our_daemon(self.daemon_endpoint):
+            self.browser = self.playwright.chromium.connect_over_cdp(self.daemon_endpoint, slow_mo=SLOW_MO_MS)
+            self.browser_context = self.browser.contexts[0]
+        else:
+            if self.daemon_endpoint and daemon_alive(self.daemon_endpoint):
+                print(f"[Browser] {self.daemon_endpoint} is not the ApplyPilot daemon; launching a browser instead.")
+            if self.record_har and is_our_daemon():
+                raise RuntimeError("The browser daemon holds the profile; stop it (python browser.py stop) to record.")
+            if self.replay_har:
+                self.profile_path = Path(tempfile.mkdtemp(prefix="applypilot-replay-"))
+            self.browser_context = self.playwright.chromium.launch_persistent_context(
+                **launch_options(self.profile_path, self.record_har, self.replay_har)
+            )
+        # Routes run newest first; unblocked requests fall back to the HAR in replay
+        if self.replay_har:
+            self.browser_context.route_from_har(self.replay_har, not_found="abort")
+        if self.resource_policy:
+            self.browser_context.route("**/*", self.resource_policy.handle)
+        if self.replay_har:
+            self.browser_context.route(SUBMIT_URL_PATTERN, self.traffic.block_submit)
+        if self.record_har:
+            dom_recorder.start(dom_snapshot_dir(self.record_har))
+        self.browser_context.on("response", self.traffic.on_response)
+
+        self.page = self.browser_context.new_page() if self.browser else self.browser_context.pages[0]
+        source = f"Attached to browser daemon at {self.daemon_endpoint}" if self.browser else "Browser launched"
+        print(f"[Browser] {source} in {time.perf_counter() - started:.2f}s")
         return self.page
 
+    def replace_page(self, url):
+        """Open url in a fresh page, then close the current one (see PageWatchdog)."""
+        page = self.browser_context.new_page()
+        try:
+            page.goto(url, timeout=60000)
+        except Exception:
+            page.close()
+            raise
+        self.page.close()
+        self.page = page
+        return page
+
     def close(self):
         """
-        Gracefully close browser and Playwright instance.
+        Gracefully close browser and Playwright instance. Attached to the
+        daemon, only this run's page, routes and connection are closed.
         """
-        if self.browser_context:
+        if self.browser:
+            self.browser_context.remove_listener("response", self.traffic.on_response)
+            self.browser_context.unroute_all(behavior="ignoreErrors")
+            self.page.close()
+            self.browser.close()
+        elif self.browser_context:
             self.browser_context.close()
         if self.playwright:
             self.playwright.stop()
+        if self.replay_har:
+            shutil.rmtree(self.profile_path, ignore_errors=True)
+
+
+class AsyncBrowserManager:
+    """
+    asyncio version of BrowserManager for the async agent loop
+    (see agent_async.py). Uses the same profile, launch settings,
+    record/replay, blocking and daemon options.
+    """
+
+    def __init__(self, profile_dir: str = "browser_profile", record_har=None, replay_har=None,
+                 block_resources=BLOCK_RESOURCES, daemon_endpoint=BROWSER_DAEMON_ENDPOINT):
+        self.profile_path = Path(profile_dir)
+        self.record_har = Path(record_har) if record_har else None
+        self.replay_har = Path(replay_har) if replay_har else None
+        self.daemon_endpoint = None if record_har or replay_har else daemon_endpoint
+        self.traffic = TrafficStats()
+        self.resource_policy = ResourcePolicy(self.traffic) if block_resources else None
+        self.playwright = None
+        self.browser = None
+        self.browser_context = None
+        self.page = None
+
+    async def launch(self):
+        """
+        Attach to the browser daemon, or launch a persistent Chromium
+        browser with a saved user profile.
+        """
+        started = time.perf_counter()
+        self.playwright = await async_playwright().start()
+
+        if self.daemon_endpoint and is_our_daemon(self.daemon_endpoint):
+            self.browser = await self.playwright.chromium.connect_over_cdp(self.daemon_endpoint, slow_mo=SLOW_MO_MS)
+            self.browser_context = self.browser.contexts[0]
+        else:
+            if self.daemon_endpoint and daemon_alive(self.daemon_endpoint):
+                print(f"[Browser] {self.daemon_endpoint} is not the ApplyPilot daemon; launching a browser instead.")
+            if self.record_har and is_our_daemon():
+                raise RuntimeError("The browser daemon holds the profile; stop it (python browser.py stop) to record.")
+            if self.replay_har:
+                self.profile_path = Path(tempfile.mkdtemp(prefix="applypilot-replay-"))
+            self.browser_context = await self.playwright.chromium.launch_persistent_context(
+                **launch_options(self.profile_path, self.record_har, self.replay_har)
+            )
+        if self.replay_har:
+            await self.browser_context.route_from_har(self.replay_har, not_found="abort")
+        if self.resource_policy:
+            await self.browser_context.route("**/*", self.resource_policy.handle)
+        if self.replay_har:
+            await self.browser_context.route(SUBMIT_URL_PATTERN, self.traffic.block_submit)
+        if self.record_har:
+            dom_recorder.start(dom_snapshot_dir(self.record_har))
+        self.browser_context.on("response", self.traffic.on_response)
+
+        self.page = await self.browser_context.new_page() if self.browser else self.browser_context.pages[0]
+        source = f"Attached to browser daemon at {self.daemon_endpoint}" if self.browser else "Browser launched"
+        print(f"[Browser] {source} in {time.perf_counter() - started:.2f}s")
+        return self.page
+
+    async def replace_page(self, url):
+        page = await self.browser_context.new_page()
+        try:
+            await page.goto(url, timeout=60000)
+        except Exception:
+            await page.close()
+            raise
+        await self.page.close()
+        self.page = page
+        return page
+
+    async def close(self):
+        """
+        Gracefully close browser and Playwright instance (see BrowserManager.close).
+        """
+        if self.browser:
+            self.browser_context.remove_listener("response", self.traffic.on_response)
+            await self.browser_context.unroute_all(behavior="ignoreErrors")
+            await self.page.close()
+            await self.browser.close()
+        elif self.browser_context:
+            await self.browser_context.close()
+        if self.playwright:
+            await self.playwright.stop()
+        if self.replay_har:
+            shutil.rmtree(self.profile_path, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ApplyPilot browser daemon")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="Start Chromium on the profile and keep it running for agent runs")
+    serve_parser.add_argument("--port", type=int, default=BROWSER_DAEMON_PORT, help="CDP port (localhost only)")
+    serve_parser.add_argument("--profile", default="browser_profile", help="Profile directory")
+    serve_parser.add_argument("--interval", type=int, default=BROWSER_DAEMON_HEALTH_SECONDS,
+                              help="Seconds between health reports")
+
+    subparsers.add_parser("status", help="Show whether the daemon is up and its last health report")
+    subparsers.add_parser("stop", help="Close the daemon's browser")
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        BrowserDaemon(args.profile, args.port).serve(args.interval)
+    elif args.command == "status":
+        daemon_status()
+    elif args.command == "stop":
+        stop_daemon()
+
+
+if __name__ == "__main__":
+    main()
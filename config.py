@@ -40,15 +40,107 @@ MAX_JOBS_TO_PROCESS = 75           # Max jobs to look at (including skips)
 ENABLE_PAGINATION = True           # Go to next page when current page is done
 MAX_PAGES = 5                      # Max pages to process if pagination enabled
 
+# Jobs whose logged status is in this list are skipped before their card is
+# clicked. Remove "skipped" to retry failed forms after training new answers.
+SKIP_SEEN_STATUSES = ["submitted", "already_applied", "external", "skipped"]
+
+# Pre-click filters, applied to harvested card data before a job is opened
+TITLE_INCLUDE_RESUME_KEYWORDS = True   # Title must contain one of the RESUME_KEYWORDS
+TITLE_INCLUDE_PATTERNS = []            # Extra regexes that also count as a title match
+TITLE_EXCLUDE_PATTERNS = []            # e.g. [r"\bsenior\b", r"\bstaff\b", r"\bmanager\b"]
+COMPANY_BLOCKLIST = [c.strip() for c in os.getenv("COMPANY_BLOCKLIST", "").split(",") if c.strip()]
+COMPANY_COOLDOWN_DAYS = 7              # Skip companies applied to within this many days (0 = off)
+REQUIRE_EASY_APPLY_CARD = True         # Skip cards that show no Easy Apply badge
+
 # Safety settings - longer delays to appear more human
-MIN_DELAY_SECONDS = 3
+MIN_DELAY_SECONDS = 3              # Pause between applications (random in this range)
 MAX_DELAY_SECONDS = 7
+WAIT_TIMEOUT_MS = 8000             # Max wait for a UI transition (detail pane, modal step, next page)
+CARD_SCROLL_TIMEOUT_MS = 1500      # Max wait for more cards after scrolling the results list
 SKIP_IF_UNKNOWN_FIELDS = False     # Skip application if there are unfillable fields
 
+# Fuzzy question matching: "index" (n-gram index + difflib), "tfidf" (needs numpy), "difflib" (linear scan)
+MATCHER_BACKEND = os.getenv("MATCHER_BACKEND", "index")
+
 # Paths
 RESUMES_DIR = "resumes"
 FIELD_MEMORY_PATH = "field_memory.json"
-APPLICATION_LOG_PATH = "application_log.json"
+APPLICATION_LOG_PATH = "application_log.jsonl"   # Append-only; an old application_log.json is migrated on first use
+METRICS_PATH = "resolution_metrics.json"         # Cumulative answer-source metrics (json backend)
+APPLICATION_LOG_FSYNC = True       # fsync after every record (crash-safe, slightly slower)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json")   # "json" (files above) or "sqlite"
+SQLITE_DB_PATH = "applypilot.db"
+MEMORY_FLUSH_INTERVAL_SECONDS = 5   # Field memory is written at most this often (and at job end / exit)
+BATCH_FIELD_WRITES = True          # Write a whole form step in one page.evaluate (per-field fallback on failure)
+PLAN_CACHE_SIZE = 256              # Resolved answer plans kept per run (keyed by a step's questions)
+ANSWER_RULES_PATH = "answer_rules.json"   # Optional extra rules, checked before the defaults
+TRACE_DIR = "traces"               # Chrome trace files from agent.py --trace
+REPLAY_RESULTS_PATH = "replay_results.jsonl"   # One throughput record per agent.py --replay-har run
+
+# Network blocking: requests the agent never looks at are aborted in the browser.
+# Any route disables Chromium's HTTP cache for the context; that mostly costs
+# full page loads (rare in a run), while card clicks stop pulling logos and media.
+BLOCK_RESOURCES = os.getenv("BLOCK_RESOURCES", "true").lower() != "false"
+BLOCKED_RESOURCE_TYPES = ["image", "media", "font"]
+BLOCKED_URL_PATTERNS = [               # Tracking and ad beacons (regexes)
+    r"/li/track", r"/tscp-serving/", r"px\.ads\.linkedin\.com", r"/sensorCollect",
+    r"platform-telemetry", r"doubleclick\.net", r"google-analytics\.com", r"googletagmanager\.com",
+]
+ALLOWED_URL_PATTERNS = [               # Never blocked: LinkedIn API calls and resume documents
+    r"/voyager/api/", r"/dms/document/", r"/dms/prv/document/",
+]
+
+# Browser daemon (python browser.py serve): while it runs, agent runs attach to it
+# over CDP instead of launching Chromium. An empty BROWSER_DAEMON_ENDPOINT never attaches.
+BROWSER_DAEMON_PORT = int(os.getenv("BROWSER_DAEMON_PORT", "9222"))
+BROWSER_DAEMON_ENDPOINT = os.getenv("BROWSER_DAEMON_ENDPOINT", f"http://127.0.0.1:{BROWSER_DAEMON_PORT}")
+BROWSER_DAEMON_STATUS_PATH = "browser_daemon.json"   # Last health report (pages, JS heap, process memory)
+BROWSER_DAEMON_HEALTH_SECONDS = 30
+
+# Page watchdog: every N processed jobs, sample the page's JS heap and DOM node count.
+# Past either limit the current search results page is reopened in a fresh tab and
+# the run resumes with the next job it hasn't handled. 0 turns a setting off.
+WATCHDOG_SAMPLE_EVERY_JOBS = 5
+WATCHDOG_MAX_HEAP_MB = 300
+WATCHDOG_MAX_DOM_NODES = 100000
+RUN_STATS_PATH = "run_stats.jsonl"   # One record per run: session stats and page memory samples
+JOBS_PER_SEARCH_PAGE = 25            # LinkedIn's page size (the &start= offset step)
+
+# Resume-based answer rules, in priority order (first matching rule wins).
+# "keywords" match whole words (an optional plural "s" is allowed unless the
+# rule sets "plural": False), "pattern" is a raw regex, "answer" is a dotted path into get_resume_data()
+# and "value" is a literal answer. Booleans become "Yes"/"No".
+ANSWER_RULES = [
+    # Work authorization first: these questions name places ("... in the United States")
+    {"name": "authorized", "keywords": ["authorized to work", "legally authorized", "work authorization"],
+     "answer": "work_authorization.authorized_us"},
+    {"name": "sponsorship", "keywords": ["sponsorship", "visa sponsorship"],
+     "answer": "work_authorization.sponsorship_required"},
+
+    # Personal info
+    {"name": "first_name", "keywords": ["first name"], "answer": "personal.first_name"},
+    {"name": "last_name", "keywords": ["last name"], "answer": "personal.last_name"},
+    {"name": "email", "keywords": ["email", "e-mail"], "answer": "personal.email"},
+    {"name": "phone", "keywords": ["phone", "telephone", "mobile", "contact number"], "answer": "personal.phone"},
+    {"name": "linkedin", "keywords": ["linkedin"], "answer": "personal.linkedin"},
+    {"name": "github", "keywords": ["github"], "answer": "personal.github"},
+    {"name": "portfolio", "keywords": ["portfolio", "website"], "answer": "personal.portfolio"},
+    {"name": "city", "keywords": ["city"], "answer": "personal.location.city", "plural": False},
+    {"name": "state", "keywords": ["state"], "answer": "personal.location.state", "plural": False},
+    {"name": "zip", "keywords": ["zip", "zipcode", "postal"], "answer": "personal.location.zip", "plural": False},
+
+    # Experience
+    {"name": "years_experience", "pattern": r"\byears?\b.*\bexperience\b|\bexperience\b.*\byears?\b",
+     "answer": "experience.years_of_experience"},
+
+    # Common questions
+    {"name": "relocate", "keywords": ["relocate", "relocation"], "answer": "common_answers.willing_to_relocate"},
+    {"name": "start_date", "keywords": ["start date", "when can you start", "earliest start"],
+     "answer": "common_answers.start_date"},
+    {"name": "salary", "keywords": ["salary", "compensation", "pay"], "answer": "common_answers.salary_expectation"},
+    {"name": "how_did_you_hear", "keywords": ["how did you hear", "how did you find", "where did you hear"],
+     "answer": "common_answers.how_did_you_hear"},
+]
 
 # Preferred email for dropdown selection
 PREFERRED_EMAIL = os.getenv("EMAIL", "")
@@ -73,6 +165,13 @@ def build_search_url(keywords=None, location_id=None):
     return url
 
 
+def search_page_url(search_url, page_number):
+    """URL of a given results page (1-based) of a search."""
+    if page_number <= 1:
+        return search_url
+    return f"{search_url}&start={(page_number - 1) * JOBS_PER_SEARCH_PAGE}"
+
+
 def get_resume_data():
     """Build resume data dict from environment variables."""
     return {
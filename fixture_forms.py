@@ -0,0 +1,343 @@
+#!/usr/bin/env python
+"""
+Offline Easy Apply fixtures.
+
+Generates self-contained HTML pages that reproduce the parts of LinkedIn's
+job page the agent touches: a detail pane with an Easy Apply button, and a
+multi-step modal (jobs-easy-apply-modal) with a progress bar, resume cards
+(jobsDocumentCardToggle radios + Download resume buttons), text inputs,
+selects, radio fieldsets, textareas, required-field validation errors,
+Next / Review / Submit buttons and the discard confirmation.
+
+Questions come from field_memory.json, so most resolve from memory; a share
+are synthetic unknowns. Pages load from file:// and need no network:
+
+    python fixture_forms.py --fields 5 50 200 --out fixtures
+    python benchmark_forms.py            # drives the agent against them
+"""
+import argparse
+import json
+import math
+import random
+from pathlib import Path
+
+from config import FIELD_MEMORY_PATH
+
+DEFAULT_FIELDS_PER_STEP = 8
+MAX_QUESTION_STEPS = 7      # + resume and review steps stays under the agent's 10-step limit
+RESUMES = ["Fullstack_Resume.pdf", "Frontend_Resume.pdf", "Backend_Resume.pdf"]
+FILLER_OPTIONS = ["Other", "Prefer not to say", "Not applicable"]
+
+PAGE_SCRIPT = """
+const SPEC = JSON.parse(document.getElementById('fixture-spec').textContent);
+const state = { step: 0, open: false, submitted: false, discarded: false, advances: 0, errors_shown: 0, values: {} };
+window.fixtureState = state;
+
+const esc = s => String(s).replace(/[&<>"]/g, c => ({ '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;' })[c]);
+const modal = () => document.querySelector('.jobs-easy-apply-modal');
+
+function fieldHtml(f) {
+    const req = f.required ? ' required aria-required="true"' : '';
+    const label = `<label for="${f.id}">${esc(f.question)}</label>`;
+    if (f.type === 'text') {
+        return `<div class="jobs-easy-apply-form-element" data-field="${f.id}">${label}<input type="text" id="${f.id}"${req}></div>`;
+    }
+    if (f.type === 'textarea') {
+        return `<div class="jobs-easy-apply-form-element" data-field="${f.id}">${label}<textarea id="${f.id}"${req}></textarea></div>`;
+    }
+    if (f.type === 'select') {
+        const options = ['Select an option'].concat(f.options)
+            .map(o => `<option value="${esc(o)}">${esc(o)}</option>`).join('');
+        return `<div class="jobs-easy-apply-form-element" data-field="${f.id}">${label}<select id="${f.id}"${req}>${options}</select></div>`;
+    }
+    const radios = f.options.map((o, i) =>
+        `<div class="fb-text-selectable__option"><input type="radio" name="${f.id}" id="${f.id}-${i}" value="${esc(o)}"${req}>` +
+        `<label for="${f.id}-${i}">${esc(o)}</label></div>`).join('');
+    return `<fieldset data-field="${f.id}" id="${f.id}"><legend><span>${esc(f.question)}</span></legend>${radios}</fieldset>`;
+}
+
+function resumeHtml() {
+    return '<div class="jobs-document-upload-redesign-card__container">' + SPEC.resumes.map((name, i) =>
+        `<div class="jobs-document-upload-redesign-card">` +
+        `<input type="radio" name="resume" id="jobsDocumentCardToggle-${i}"${i === 0 ? ' checked' : ''}>` +
+        `<label for="jobsDocumentCardToggle-${i}">${esc(name)}</label>` +
+        `<button type="button" aria-label="Download resume ${esc(name)}">Download</button></div>`).join('') + '</div>';
+}
+
+function footerHtml(index) {
+    const last = SPEC.steps.length - 1;
+    if (index === last) return '<button aria-label="Submit application">Submit application</button>';
+    if (index === last - 1) return '<button aria-label="Review your application">Review</button>';
+    return '<button aria-label="Continue to next step">Next</button>';
+}
+
+function renderStep() {
+    const step = SPEC.steps[state.step];
+    let body = '';
+    if (step.resume) body = resumeHtml();
+    else if (step.review) body = '<input type="checkbox" id="follow-company-checkbox" checked><label for="follow-company-checkbox">Follow</label>';
+    else body = step.fields.map(fieldHtml).join('');
+    const progress = Math.round(state.step * 100 / SPEC.steps.length);
+    modal().querySelector('.fixture-body').innerHTML =
+        `<progress value="${progress}" max="100"></progress><h3>${esc(step.heading)}</h3>` +
+        `<form>${body}</form><footer>${footerHtml(state.step)}</footer>`;
+}
+
+// LinkedIn renders the next step asynchronously; the body is empty meanwhile
+function showStep(index) {
+    state.step = index;
+    if (!SPEC.latency_ms) return renderStep();
+    modal().querySelector('.fixture-body').innerHTML = '';
+    setTimeout(renderStep, SPEC.latency_ms);
+}
+
+function hasValue(f) {
+    if (f.type === 'radio') return !!document.querySelector(`input[name="${f.id}"]:checked`);
+    const el = document.getElementById(f.id);
+    if (!el) return false;
+    return f.type === 'select' ? el.value !== 'Select an option' : !!el.value.trim();
+}
+
+function showError(container, message) {
+    const error = document.createElement('div');
+    error.className = 'artdeco-inline-feedback artdeco-inline-feedback--error';
+    error.innerHTML = `<span class="artdeco-inline-feedback__message">${esc(message)}</span>`;
+    container.appendChild(error);
+    state.errors_shown++;
+}
+
+function validateStep() {
+    const step = SPEC.steps[state.step];
+    modal().querySelectorAll('.artdeco-inline-feedback--error').forEach(el => el.remove());
+    let ok = true;
+    for (const f of step.fields || []) {
+        if (hasValue(f)) {
+            const el = document.getElementById(f.id);
+            state.values[f.id] = f.type === 'radio'
+                ? document.querySelector(`input[name="${f.id}"]:checked`).value : el.value;
+        } else if (f.required) {
+            showError(modal().querySelector(`[data-field="${f.id}"]`), 'Please enter a valid answer');
+            ok = false;
+        }
+    }
+    if (step.error) {
+        showError(modal().querySelector('[data-field]') || modal().querySelector('form'), step.error);
+        ok = false;
+    }
+    return ok;
+}
+
+function openModal() {
+    const root = document.createElement('div');
+    root.className = 'jobs-easy-apply-modal';
+    root.setAttribute('role', 'dialog');
+    root.innerHTML = `<button aria-label="Dismiss" class="fixture-dismiss">x</button>` +
+        `<h2>Apply to ${esc(SPEC.company)}</h2><div class="fixture-body"></div>`;
+    document.body.appendChild(root);
+    state.open = true;
+    showStep(0);
+}
+
+function closeModal() {
+    document.querySelectorAll('.jobs-easy-apply-modal, .fixture-discard').forEach(el => el.remove());
+    state.open = false;
+}
+
+function submitted() {
+    state.submitted = true;
+    modal().querySelector('.fixture-body').innerHTML = '<h3>Your application was sent</h3>';
+    const button = document.querySelector('button.jobs-apply-button');
+    button.textContent = 'Applied';
+}
+
+document.addEventListener('click', event => {
+    const button = event.target.closest('button');
+    if (button) {
+        const label = button.getAttribute('aria-label') || '';
+        if (button.matches('.jobs-apply-button')) {
+            if (button.textContent.trim() === 'Easy Apply') openModal();
+        } else if (label === 'Dismiss') {
+            if (state.submitted || !state.open) return closeModal();
+            const dialog = document.createElement('div');
+            dialog.className = 'artdeco-modal fixture-discard';
+            dialog.setAttribute('role', 'alertdialog');
+            dialog.innerHTML = '<h2>Save this application?</h2>' +
+                '<button data-control-name="discard_application_confirm_btn">Discard</button>';
+            document.body.appendChild(dialog);
+        } else if (button.dataset.controlName === 'discard_application_confirm_btn') {
+            state.discarded = true;
+            closeModal();
+        } else if (label === 'Continue to next step' || label === 'Review your application') {
+            event.preventDefault();
+            if (validateStep()) { state.advances++; showStep(state.step + 1); }
+        } else if (label === 'Submit application') {
+            event.preventDefault();
+            if (validateStep()) submitted();
+        }
+        return;
+    }
+    // Clicking anywhere on a resume card selects it
+    const card = event.target.closest('.jobs-document-upload-redesign-card');
+    if (card) card.querySelector("input[type='radio']").checked = true;
+});
+"""
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>__TITLE__ | Easy Apply fixture</title>
+<style>
+body { font-family: sans-serif; margin: 0; }
+.jobs-search-results-list { float: left; width: 30%; }
+.jobs-details { margin-left: 32%; padding: 16px; }
+.jobs-easy-apply-modal, .fixture-discard { position: fixed; top: 5%; left: 20%; width: 60%; max-height: 90%;
+    overflow: auto; background: #fff; border: 1px solid #888; padding: 16px; }
+.fixture-discard { top: 30%; left: 35%; width: 30%; }
+.jobs-easy-apply-form-element, fieldset { margin: 8px 0; }
+label { display: block; }
+.fb-text-selectable__option label { display: inline; }
+.artdeco-inline-feedback--error { color: #b24020; }
+</style>
+</head>
+<body>
+<ul class="jobs-search-results-list">
+  <li data-occludable-job-id="__JOB_ID__">
+    <div class="job-card-container" data-job-id="__JOB_ID__">
+      <a class="job-card-container__link" href="#/jobs/view/__JOB_ID__/"><strong>__TITLE__</strong></a>
+      <div class="artdeco-entity-lockup__subtitle">__COMPANY__</div>
+      <div class="artdeco-entity-lockup__caption">Remote</div>
+      <ul><li class="job-card-container__apply-method">Easy Apply</li></ul>
+    </div>
+  </li>
+</ul>
+<div class="jobs-details">
+  <h1 class="t-24">__TITLE__</h1>
+  <div class="job-details-jobs-unified-top-card__company-name"><a href="#">__COMPANY__</a></div>
+  <button class="jobs-apply-button">Easy Apply</button>
+</div>
+<script type="application/json" id="fixture-spec">__SPEC__</script>
+<script>__SCRIPT__</script>
+</body>
+</html>
+"""
+
+
+def load_known_fields(memory_path=FIELD_MEMORY_PATH):
+    path = Path(memory_path)
+    if not path.exists():
+        return {}
+    with open(path, "r") as f:
+        return json.load(f).get("known_fields", {})
+
+
+def make_field(index, question, answer, rng, required, other_answers):
+    """A field whose type and options fit the answer (Yes/No -> radio or select, long -> textarea)."""
+    field = {"id": f"fixture-field-{index}", "question": question, "required": required, "options": []}
+    if answer is None:
+        field["type"] = rng.choice(["text", "select", "radio"])
+        if field["type"] != "text":
+            field["options"] = ["Option A", "Option B"]
+    elif answer.strip().lower() in ("yes", "no"):
+        field["type"] = rng.choice(["radio", "select"])
+        field["options"] = ["Yes", "No"]
+    elif len(answer) > 80:
+        field["type"] = "textarea"
+    elif rng.random() < 0.6:
+        field["type"] = "text"
+    else:
+        field["type"] = "select"
+        distractors = [a for a in other_answers if a != answer and len(a) <= 80] or FILLER_OPTIONS
+        field["options"] = rng.sample(distractors, min(2, len(distractors))) + [answer]
+        rng.shuffle(field["options"])
+    return field
+
+
+def generate_form(field_count, seed=0, fields_per_step=DEFAULT_FIELDS_PER_STEP, unknown_ratio=0.1,
+                  required_ratio=0.5, latency_ms=0, error_step=None, memory_path=FIELD_MEMORY_PATH):
+    """
+    Spec for a synthetic Easy Apply form with field_count questions: a resume
+    step, ceil(field_count / fields_per_step) question steps and a review step.
+    Past MAX_QUESTION_STEPS steps, each step gets more questions instead.
+    Unknown questions are never required, so a complete run can submit.
+    error_step (index into the question steps) shows a validation error that no
+    answer clears, for exercising the abort path.
+    """
+    rng = random.Random(seed)
+    pool = [(q, a) for q, a in load_known_fields(memory_path).items() if a]
+    rng.shuffle(pool)
+    answers = [a for _, a in pool]
+
+    fields = []
+    for index in range(field_count):
+        if pool and rng.random() >= unknown_ratio:
+            question, answer = pool[index % len(pool)]
+            cycle = index // len(pool)
+            if cycle:
+                question = f"{question} ({cycle + 1})"
+            required = rng.random() < required_ratio
+        else:
+            question, answer, required = f"Synthetic question {index}: describe item {rng.randint(1, 999)}", None, False
+        fields.append(make_field(index, question, answer, rng, required, answers))
+
+    fields_per_step = max(fields_per_step, math.ceil(field_count / MAX_QUESTION_STEPS))
+    step_count = max(1, math.ceil(field_count / fields_per_step))
+    steps = [{"heading": "Resume", "resume": True}]
+    for number in range(step_count):
+        chunk = fields[number * fields_per_step:(number + 1) * fields_per_step]
+        step = {"heading": f"Additional Questions ({number + 1}/{step_count})", "fields": chunk}
+        if error_step == number:
+            step["error"] = "Enter a whole number between 0 and 99"
+        steps.append(step)
+    steps.append({"heading": "Review your application", "review": True})
+
+    return {
+        "title": "Synthetic Software Engineer",
+        "company": "Fixture Co",
+        "job_id": str(4000000000 + seed),
+        "resumes": RESUMES,
+        "latency_ms": latency_ms,
+        "field_count": field_count,
+        "steps": steps,
+    }
+
+
+def render_page(spec):
+    """The fixture page for a spec, as one HTML string."""
+    spec_json = json.dumps(spec).replace("</", "<\\/")
+    html = PAGE_TEMPLATE
+    for name, value in (("__TITLE__", spec["title"]), ("__COMPANY__", spec["company"]),
+                        ("__JOB_ID__", spec["job_id"])):
+        html = html.replace(name, value)
+    return html.replace("__SPEC__", spec_json).replace("__SCRIPT__", PAGE_SCRIPT.strip())
+
+
+def write_fixture(spec, directory, name=None):
+    """Write the page for a spec and return its path (load it with path.as_uri())."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / (name or f"easy_apply_{spec['field_count']}.html")
+    path.write_text(render_page(spec))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write offline Easy Apply fixture pages")
+    parser.add_argument("--fields", type=int, nargs="+", default=[5, 20, 50, 100, 200])
+    parser.add_argument("--per-step", type=int, default=DEFAULT_FIELDS_PER_STEP, help="Questions per modal step")
+    parser.add_argument("--unknown-ratio", type=float, default=0.1, help="Share of questions not in memory")
+    parser.add_argument("--latency-ms", type=int, default=0, help="Delay before each step renders")
+    parser.add_argument("--error-step", type=int, help="Question step that always fails validation")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="fixtures")
+    args = parser.parse_args()
+
+    for count in args.fields:
+        spec = generate_form(count, args.seed, args.per_step, args.unknown_ratio,
+                             latency_ms=args.latency_ms, error_step=args.error_step)
+        path = write_fixture(spec, args.out)
+        print(f"[Fixture] {count:>4} fields, {len(spec['steps'])} steps -> {path.resolve().as_uri()}")
+
+
+if __name__ == "__main__":
+    main()
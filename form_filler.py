@@ -1,8 +1,12 @@
-import json
-from pathlib import Path
-from difflib import SequenceMatcher
+import time
 from resume_selector import ResumeSelector
-from config import get_resume_data
+from config import get_resume_data, MATCHER_BACKEND, ANSWER_RULES, ANSWER_RULES_PATH
+from storage import open_store
+from answer_rules import AnswerRules, load_rules
+from matcher import build_matcher
+from form_plan import AnswerPlanCache
+from metrics import ResolutionMetrics
+from questions import clean_question, question_key
 
 class FormFiller:
     """
@@ -10,14 +14,17 @@ class FormFiller:
     Learns from unknown fields and stores answers for reuse.
     """
 
-    def __init__(self, memory_path="field_memory.json"):
-        self.memory_path = Path(memory_path)
+    def __init__(self, store=None, matcher_backend=MATCHER_BACKEND):
+        self.store = store or open_store()
         self.resume = get_resume_data()  # Load from environment variables
-        self.memory = self._load_json(self.memory_path, {
-            "known_fields": {},
-            "unknown_fields": [],
-            "field_log": []
-        })
+        self.known_fields = self.store.known_fields()
+        # question_key -> stored question, for exact lookups on any spelling
+        self.question_keys = {question_key(q): q for q in self.known_fields}
+        self.matcher = build_matcher(matcher_backend, self.known_fields)
+        self._prefetched_matches = {}
+        self.plan_cache = AnswerPlanCache()
+        self.metrics = ResolutionMetrics()   # This run's answer sources (see save_metrics)
+        self.answer_rules = AnswerRules(self.resume, load_rules(ANSWER_RULES_PATH) + ANSWER_RULES)
         self.resume_selector = ResumeSelector()
         self.current_resume_type = "fullstack"
         
@@ -25,140 +32,158 @@ class FormFiller:
         if not self.resume.get("personal", {}).get("first_name"):
             print("[Warning] Personal info not found in .env file. Form filling may fail.")
 
-    def _load_json(self, path, default):
-        if path.exists():
-            with open(path, "r") as f:
-                return json.load(f)
-        return default
+    def flush(self):
+        """Persist pending memory changes (see storage.JsonStore)."""
+        self.store.flush()
 
-    def _save_memory(self):
-        with open(self.memory_path, "w") as f:
-            json.dump(self.memory, f, indent=2)
-
-    def _similarity(self, a, b):
-        """Calculate similarity ratio between two strings."""
-        return SequenceMatcher(None, a.lower(), b.lower()).ratio()
-
-    def find_best_match(self, question, threshold=0.7):
+    def sync_memory(self):
+        """
+        Apply answers another process (e.g. learn_fields.py) saved since the
+        last check. Only changed questions touch the matcher and plan cache.
+        Returns the number of changed questions.
+        """
+        known = self.store.refresh()
+        if known is None:
+            return 0
+
+        removed = [q for q in self.known_fields if q not in known]
+        changed = {q: a for q, a in known.items() if self.known_fields.get(q) != a}
+        for question in removed:
+            del self.known_fields[question]
+            if self.question_keys.get(question_key(question)) == question:
+                del self.question_keys[question_key(question)]
+            self.matcher.remove(question)
+            self.plan_cache.invalidate(question)
+        for question, answer in changed.items():
+            self.known_fields[question] = answer
+            self.question_keys[question_key(question)] = question
+            self.matcher.add(question)
+            self.plan_cache.invalidate(question)
+
+        if removed or changed:
+            self._prefetched_matches = {}
+            print(f"   [Memory] Picked up {len(changed)} new/changed and {len(removed)} removed answers from disk")
+        return len(removed) + len(changed)
+
+    def find_best_match(self, question, threshold=None):
         """
         Find the best matching known field for a question.
         Returns (answer, confidence) or (None, 0) if no match.
         """
-        best_match = None
-        best_score = 0
+        if threshold is None and question in self._prefetched_matches:
+            known_q, score = self._prefetched_matches[question]
+        else:
+            known_q, score = self.matcher.best_match(question, threshold)
+        if known_q is None:
+            return None, 0
+        return self.known_fields[known_q], score
+
+    def prefetch_matches(self, questions):
+        """
+        Score a whole form step's questions against memory in one batch.
+        find_best_match reuses these results until the next prefetch.
+        """
+        pending = [q for q in dict.fromkeys(questions) if question_key(q) not in self.question_keys]
+        self._prefetched_matches = {}
+        if not pending:
+            return
 
-        for known_q, answer in self.memory["known_fields"].items():
-            score = self._similarity(question, known_q)
-            if score > best_score and score >= threshold:
-                best_score = score
-                best_match = answer
+        threshold = self.matcher.default_threshold
+        for question, matches in zip(pending, self.matcher.top_k_batch(pending, k=1, threshold=threshold)):
+            self._prefetched_matches[question] = matches[0] if matches else (None, 0)
 
-        return best_match, best_score
+    def get_match_candidates(self, question, k=5):
+        """Return the top-k (known_question, score) candidates for debugging."""
+        return self.matcher.top_k(question, k)
 
-    def get_answer(self, question, field_type="text"):
+    def get_answer(self, question, field_type="text", prefilled=False):
         """
         Get answer for a form field question.
-        Returns (answer, source) where source is 'memory', 'resume', or 'unknown'
+        Returns (answer, source) where source is 'memory', 'memory_fuzzy', 'resume', or 'unknown'.
+        Each lookup is counted in self.metrics; lookups for fields the page
+        already filled (prefilled) only count as pre-filled.
         """
-        # 1. Check exact match in memory
-        if question in self.memory["known_fields"]:
-            return self.memory["known_fields"][question], "memory"
+        if prefilled:
+            self.metrics.record_prefilled(field_type)
+            answer, source, _ = self._lookup_answer(question)
+            return answer, source
+        started = time.perf_counter()
+        answer, source, score = self._lookup_answer(question)
+        self.metrics.record(source, field_type, time.perf_counter() - started, score)
+        return answer, source
+
+    def _lookup_answer(self, question):
+        """(answer, source, fuzzy score or None) for get_answer."""
+        # 1. Check exact match in memory (canonical key)
+        known_q = self.question_keys.get(question_key(question))
+        if known_q is not None:
+            return self.known_fields[known_q], "memory", None
 
         # 2. Check fuzzy match in memory
         fuzzy_answer, score = self.find_best_match(question)
         if fuzzy_answer:
-            return fuzzy_answer, "memory_fuzzy"
-
-        # 3. Try to infer from resume based on keywords
-        q_lower = question.lower()
-
-        # Personal info
-        if any(kw in q_lower for kw in ["first name"]):
-            return self.resume.get("personal", {}).get("first_name"), "resume"
-        if any(kw in q_lower for kw in ["last name"]):
-            return self.resume.get("personal", {}).get("last_name"), "resume"
-        if any(kw in q_lower for kw in ["email", "e-mail"]):
-            return self.resume.get("personal", {}).get("email"), "resume"
-        if any(kw in q_lower for kw in ["phone", "mobile", "contact number"]):
-            return self.resume.get("personal", {}).get("phone"), "resume"
-        if any(kw in q_lower for kw in ["linkedin"]):
-            return self.resume.get("personal", {}).get("linkedin"), "resume"
-        if any(kw in q_lower for kw in ["github"]):
-            return self.resume.get("personal", {}).get("github"), "resume"
-        if any(kw in q_lower for kw in ["portfolio", "website"]):
-            return self.resume.get("personal", {}).get("portfolio"), "resume"
-        if any(kw in q_lower for kw in ["city"]):
-            return self.resume.get("personal", {}).get("location", {}).get("city"), "resume"
-        if any(kw in q_lower for kw in ["state"]):
-            return self.resume.get("personal", {}).get("location", {}).get("state"), "resume"
-        if any(kw in q_lower for kw in ["zip", "postal"]):
-            return self.resume.get("personal", {}).get("location", {}).get("zip"), "resume"
-
-        # Work authorization
-        if any(kw in q_lower for kw in ["authorized to work", "legally authorized", "work authorization"]):
-            return "Yes" if self.resume.get("work_authorization", {}).get("authorized_us") else "No", "resume"
-        if any(kw in q_lower for kw in ["sponsorship", "visa sponsorship"]):
-            return "Yes" if self.resume.get("work_authorization", {}).get("sponsorship_required") else "No", "resume"
-
-        # Experience
-        if "years" in q_lower and "experience" in q_lower:
-            return self.resume.get("experience", {}).get("years_of_experience"), "resume"
-
-        # Common questions
-        if any(kw in q_lower for kw in ["relocate", "relocation"]):
-            return self.resume.get("common_answers", {}).get("willing_to_relocate"), "resume"
-        if any(kw in q_lower for kw in ["start date", "when can you start", "earliest start"]):
-            return self.resume.get("common_answers", {}).get("start_date"), "resume"
-        if any(kw in q_lower for kw in ["salary", "compensation", "pay"]):
-            return self.resume.get("common_answers", {}).get("salary_expectation"), "resume"
-        if any(kw in q_lower for kw in ["how did you hear", "how did you find", "where did you hear"]):
-            return self.resume.get("common_answers", {}).get("how_did_you_hear"), "resume"
+            return fuzzy_answer, "memory_fuzzy", score
+
+        # 3. Try to infer from resume via the compiled keyword rules
+        answer, rule = self.answer_rules.match(question)
+        if rule and answer:
+            return answer, "resume", None
 
         # No match found
-        return None, "unknown"
+        return None, "unknown", None
+
+    def save_metrics(self):
+        """Merge this run's metrics into the store's cumulative copy. Returns the cumulative metrics."""
+        run = self.metrics
+        data = self.store.update_metrics(
+            lambda stored: ResolutionMetrics.from_dict(stored).merge(run).to_dict()
+        )
+        return ResolutionMetrics.from_dict(data)
 
-    def log_unknown_field(self, question, field_type, job_title="", company="", options=None):
-        """Log an unknown field for later review."""
+    def log_unknown_field(self, question, field_type, job_title="", company="", options=None, job_id=None):
+        """Log an unknown field for later review. Questions with no text are never stored."""
+        if not clean_question(question):
+            return
         entry = {
             "question": question,
             "field_type": field_type,
             "job_title": job_title,
             "company": company,
+            "job_id": job_id,          # Job the question was first seen on
             "options": options or [],  # Store dropdown/radio options
             "answer": None
         }
 
-        # Avoid duplicates
-        existing_questions = [f["question"] for f in self.memory["unknown_fields"]]
-        if question not in existing_questions:
-            self.memory["unknown_fields"].append(entry)
-            self._save_memory()
+        # Store skips duplicates
+        if self.store.add_unknown_field(entry):
             print(f"   [Memory] Logged unknown field: '{question[:50]}...'")
 
     def remove_unknown_field(self, question):
         """Remove a field from unknown list."""
-        self.memory["unknown_fields"] = [
-            f for f in self.memory["unknown_fields"] 
-            if f["question"] != question
-        ]
-        self._save_memory()
+        self.store.remove_unknown_field(question)
 
     def learn_field(self, question, answer):
         """Add a new question-answer pair to memory."""
-        self.memory["known_fields"][question] = answer
-        
-        # Remove from unknown if it was there
-        self.memory["unknown_fields"] = [
-            f for f in self.memory["unknown_fields"] 
-            if f["question"] != question
-        ]
+        question = clean_question(question)
+        key = question_key(question)
+        previous = self.question_keys.get(key)
+        if previous is not None and previous != question:
+            # Another spelling of the same question: keep one entry
+            del self.known_fields[previous]
+            self.matcher.remove(previous)
+        self.known_fields[question] = answer
+        self.question_keys[key] = question
+        self.matcher.add(question)
+        self._prefetched_matches = {}
+        self.plan_cache.invalidate(question)
         
-        self._save_memory()
+        # Also removes it from the unknown list
+        self.store.set_known_field(question, answer)
         print(f"   [Memory] Learned: '{question[:40]}...' -> '{answer[:20]}...'")
 
     def get_unknown_fields(self):
         """Return list of unknown fields that need answers."""
-        return self.memory["unknown_fields"]
+        return self.store.unknown_fields()
 
     def set_job_context(self, job_title, job_description=""):
         """Set the current job context to determine which resume PDF to use."""
@@ -175,7 +200,7 @@ class FormFiller:
 
     def fill_unknown_fields_interactive(self):
         """Interactive CLI to fill in unknown fields."""
-        unknowns = self.memory["unknown_fields"]
+        unknowns = self.get_unknown_fields()
         
         if not unknowns:
             print("No unknown fields to fill!")
@@ -185,7 +210,7 @@ class FormFiller:
         print(f"Found {len(unknowns)} unknown fields. Let's fill them in.")
         print(f"{'='*60}\n")
 
-        for i, field in enumerate(unknowns[:], 1):
+        for i, field in enumerate(unknowns, 1):
             print(f"[{i}/{len(unknowns)}] {field['question']}")
             if field.get('job_title'):
                 print(f"    (From: {field['job_title']} at {field.get('company', 'Unknown')})")
@@ -0,0 +1,343 @@
+"""
+Answer planning for Easy Apply form steps.
+Turns a page_probes snapshot into a list of browser writes without
+touching the page, so the sync and async agents share one resolver.
+"""
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from config import PREFERRED_EMAIL, PLAN_CACHE_SIZE
+from page_probes import snapshot_question, is_answered
+from questions import question_key
+
+IGNORED_FIELDS = [
+    "search by title",
+    "search by skill",
+    "search by company",
+    "search",
+    "city, state, or zip code",
+    "location"
+]
+
+
+def is_ignored(question):
+    return any(ignored in question.lower() for ignored in IGNORED_FIELDS)
+
+
+def clean_options(options):
+    """Drop placeholder and 'Required' entries from option texts."""
+    return [
+        opt for opt in options
+        if opt and opt != "Select an option" and opt.lower() != "required"
+    ]
+
+
+def normalize_option(text):
+    return " ".join((text or "").lower().split())
+
+
+def has_words(text, words):
+    """True if words appear in text as whole words (same rule as APPLY_PLAN_JS)."""
+    return re.search(rf"(^|\W){re.escape(words)}($|\W)", text, re.ASCII) is not None
+
+
+def pick_option(texts, answer, values=None):
+    """
+    Index of the option an answer selects, or None. Mirrors pickOption in
+    APPLY_PLAN_JS: exact text, exact value, then the single option that
+    contains the answer (or is contained in it) as whole words, so a
+    stored "No" never picks "None of the above".
+    """
+    want = normalize_option(answer)
+    usable = [(i, normalize_option(t)) for i, t in enumerate(texts)
+              if normalize_option(t) and normalize_option(t) != "select an option"]
+    for i, text in usable:
+        if text == want:
+            return i
+    for i, _ in usable:
+        if values and values[i] is not None and normalize_option(values[i]) == want:
+            return i
+    if not want:
+        return None
+    partial = [i for i, text in usable if has_words(text, want) or has_words(want, text)]
+    return partial[0] if len(partial) == 1 else None
+
+
+def option_rejected(result):
+    """True if the page found no option matching the answer; a per-field retry won't help."""
+    return bool(result) and result.get("error") == "no matching option"
+
+
+def step_fingerprint(snapshot, progress=None, heading=""):
+    """
+    Identify a form step by its set of question labels and progress value
+    (plus the step heading, for steps without questions or a progress bar).
+    Seeing the same fingerprint twice means the modal did not advance.
+    """
+    questions = sorted({
+        question_key(question)
+        for field_type, fields in snapshot.items()
+        for question in (snapshot_question(field_type, field) for field in fields)
+        if question
+    })
+    payload = json.dumps([questions, progress, heading])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def has_required_unknown(unknowns):
+    """True if a required field has no answer, so the step cannot be submitted."""
+    return any(unknown.get("required") for unknown in unknowns)
+
+
+def plan_fingerprint(snapshot):
+    """
+    Cache key for a step's answer plan: its normalized questions, in order,
+    with their option sets. Values already on the page are not part of it.
+    """
+    fields = []
+    for field_type in ("text", "select", "radio", "textarea"):
+        for field in snapshot[field_type]:
+            question = snapshot_question(field_type, field) or ""
+            if field_type == "radio":
+                options = [option["label"] for option in field["options"]]
+            else:
+                options = field.get("options") or []
+            fields.append([field_type, question_key(question), options])
+    payload = json.dumps(fields)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class AnswerPlanCache:
+    """
+    LRU cache of resolved answer plans keyed by plan_fingerprint().
+
+    A plan remembers the keys of the known questions it used exactly.
+    learn_field() invalidates plans that used the changed question, and plans with any
+    fuzzy, rule-based or unknown answer, since a new memory entry can
+    change those.
+    """
+
+    def __init__(self, max_entries=PLAN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.plans = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, fingerprint):
+        plan = self.plans.get(fingerprint)
+        if plan is None:
+            self.misses += 1
+            return None
+        self.plans.move_to_end(fingerprint)
+        self.hits += 1
+        return plan["resolutions"]
+
+    def put(self, fingerprint, resolutions):
+        exact = set()
+        closed = True
+        for resolution in resolutions:
+            if resolution["source"] == "memory":
+                exact.add(question_key(resolution["question"]))
+            elif resolution["source"] != "config":
+                closed = False
+        self.plans[fingerprint] = {"resolutions": resolutions, "exact": exact, "closed": closed}
+        self.plans.move_to_end(fingerprint)
+        while len(self.plans) > self.max_entries:
+            self.plans.popitem(last=False)
+
+    def invalidate(self, question=None):
+        """Drop plans that depend on a changed answer (all plans if question is None)."""
+        key = question_key(question) if question is not None else None
+        stale = [
+            fingerprint for fingerprint, plan in self.plans.items()
+            if key is None or not plan["closed"] or key in plan["exact"]
+        ]
+        for fingerprint in stale:
+            del self.plans[fingerprint]
+        self.invalidations += len(stale)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "size": len(self.plans),
+        }
+
+
+def resolve_step(snapshot, form_filler):
+    """
+    Resolve every field of a step, filled in or not, against memory and rules.
+    Lookups for fields the page already filled are counted apart in the
+    metrics, since no answer was needed for them.
+    Returns resolutions that point at fields by (field_type, index), so a
+    cached list can be applied to a later snapshot of the same step.
+    """
+    resolutions = []
+
+    def add(field_type, index, action, question, answer, source, options=None, required=False,
+            option=None, plan_type=None, always=False):
+        resolutions.append({
+            "field_type": field_type,
+            "index": index,
+            "action": action,               # None when there is no usable answer
+            "plan_type": plan_type or field_type,
+            "question": question,
+            "answer": answer,
+            "source": source,
+            "options": options or [],
+            "required": bool(required),
+            "option": option,               # radio: index of the option to click
+            "always": always,               # write even if the field has a value
+        })
+
+    questions = [
+        question for field_type in ("text", "select", "radio", "textarea")
+        for question in (snapshot_question(field_type, field) for field in snapshot[field_type])
+        if question and not is_ignored(question)
+    ]
+    form_filler.prefetch_matches(questions)
+
+    # Text inputs
+    for index, field in enumerate(snapshot["text"]):
+        question = snapshot_question("text", field)
+        if is_ignored(question):
+            continue
+        answer, source = form_filler.get_answer(question, "text", is_answered("text", field))
+        add("text", index, "fill" if answer else None, question, answer, source, required=field.get("required"))
+
+    # Select dropdowns
+    for index, field in enumerate(snapshot["select"]):
+        question = snapshot_question("select", field)
+
+        # Email dropdowns pick the preferred address
+        if "email" in question.lower():
+            if PREFERRED_EMAIL:
+                add("select", index, "select", question, PREFERRED_EMAIL, "config", plan_type="email", always=True)
+            continue
+
+        if is_ignored(question):
+            continue
+        options = clean_options(field["options"])
+        answer, source = form_filler.get_answer(question, "select", is_answered("select", field))
+        add("select", index, "select" if answer else None, question, answer, source, options, field.get("required"))
+
+    # Radio buttons
+    for index, fieldset in enumerate(snapshot["radio"]):
+        question = snapshot_question("radio", fieldset)
+        if not question or is_ignored(question):
+            continue
+
+        options = clean_options([option["label"] for option in fieldset["options"]])
+        if not options and 'yes' in fieldset["text"] and 'no' in fieldset["text"]:
+            options = ['Yes', 'No']
+
+        required = fieldset.get("required")
+        answer, source = form_filler.get_answer(question, "radio", is_answered("radio", fieldset))
+        match = pick_option([option["label"] for option in fieldset["options"]], answer) if answer else None
+        add("radio", index, "click" if match is not None else None, question, answer, source, options,
+            required, option=match)
+
+    # Textareas
+    for index, field in enumerate(snapshot["textarea"]):
+        question = snapshot_question("textarea", field)
+        answer, source = form_filler.get_answer(question, "textarea", is_answered("textarea", field))
+        add("textarea", index, "fill" if answer else None, question, answer, source, required=field.get("required"))
+
+    return resolutions
+
+
+def materialize_plan(snapshot, resolutions):
+    """Turn resolutions into (actions, unknowns) for the fields as they are now."""
+    actions = []
+    unknowns = []
+    for resolution in resolutions:
+        field = snapshot[resolution["field_type"]][resolution["index"]]
+        if not resolution["always"] and is_answered(resolution["field_type"], field):
+            continue
+
+        if resolution["action"] is None:
+            unknowns.append({
+                "question": resolution["question"],
+                "field_type": resolution["plan_type"],
+                "options": resolution["options"],
+                "required": resolution["required"],
+            })
+            continue
+
+        key = field["key"]
+        group_key = None
+        if resolution["option"] is not None:
+            key = field["options"][resolution["option"]]["key"]
+            group_key = field["key"]
+        actions.append({
+            "action": resolution["action"],
+            "key": key,
+            "group_key": group_key,
+            "field_type": resolution["plan_type"],
+            "question": resolution["question"],
+            "answer": resolution["answer"],
+            "source": resolution["source"],
+            "options": resolution["options"],
+            "required": resolution["required"],
+        })
+    return actions, unknowns
+
+
+def build_answer_plan(snapshot, form_filler):
+    """
+    Resolve every unanswered field in a snapshot. Steps seen before are
+    served from form_filler.plan_cache without re-resolving any question.
+
+    Returns (actions, unknowns):
+      actions  - writes for the browser: {"action": "fill"|"select"|"click",
+                 "key", "group_key" (radio fieldset), "field_type", "question",
+                 "answer", "source", "options", "required"}
+      unknowns - fields with no usable answer: {"question", "field_type", "options", "required"}
+    """
+    cache = form_filler.plan_cache
+    fingerprint = plan_fingerprint(snapshot)
+    resolutions = cache.get(fingerprint)
+    if resolutions is None:
+        resolutions = resolve_step(snapshot, form_filler)
+        cache.put(fingerprint, resolutions)
+    else:
+        record_cached_sources(form_filler.metrics, snapshot, resolutions)
+    return materialize_plan(snapshot, resolutions)
+
+
+def record_cached_sources(metrics, snapshot, resolutions):
+    """Count a cached plan's answer sources as resolve_step would have, so warm runs aren't skewed."""
+    for resolution in resolutions:
+        if resolution["source"] == "config":
+            continue  # Not a lookup (preferred email)
+        field_type = resolution["field_type"]
+        if is_answered(field_type, snapshot[field_type][resolution["index"]]):
+            metrics.record_prefilled(field_type)
+        else:
+            metrics.record_cached(resolution["source"], field_type)
+
+
+def failed_action_unknown(action):
+    """
+    Unknown-field entry for a planned write the page rejected, or None.
+    Only dropdowns and radio groups are logged: a rejected option means the
+    stored answer doesn't fit this form's choices.
+    """
+    if action["field_type"] not in ("select", "radio"):
+        return None
+    return {
+        "question": action["question"], "field_type": action["field_type"],
+        "options": action["options"], "required": action["required"]
+    }
+
+
+def log_unknowns(form_filler, unknowns, job_title="", company="", job_id=None):
+    for unknown in unknowns:
+        form_filler.log_unknown_field(
+            unknown["question"], unknown["field_type"], job_title, company, unknown["options"] or None, job_id
+        )
@@ -0,0 +1,90 @@
+"""
+Append-only application history for ApplyPilot Agent.
+Each application is one JSON line in application_log.jsonl, so logging
+never rewrites earlier records and a crash can at most lose the last line.
+"""
+import json
+import os
+from pathlib import Path
+from config import APPLICATION_LOG_PATH, APPLICATION_LOG_FSYNC
+
+
+def migrate_legacy_log(path=APPLICATION_LOG_PATH):
+    """
+    One-time migration from the old JSON array log (same name, .json) to
+    JSON Lines. The old file is kept as <name>.json.migrated.
+    Returns the number of records migrated.
+
+    The migrated log is staged in <name>.migrating first. Renaming the
+    legacy file is the commit point: a crash before it redoes the
+    migration from scratch, a crash after it is finished by the next call,
+    so records are never added twice.
+    """
+    path = Path(path)
+    legacy_path = path.with_suffix(".json")
+    staged_path = path.with_name(path.name + ".migrating")
+    if legacy_path == path:
+        return 0
+    if not legacy_path.exists():
+        if staged_path.exists():
+            os.replace(staged_path, path)
+        return 0
+
+    try:
+        with open(legacy_path, "r") as f:
+            records = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[History] Could not read legacy log {legacy_path}: {e}")
+        return 0
+
+    # Legacy records are older, so they go ahead of anything already logged
+    with open(staged_path, "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+        if path.exists():
+            with open(path, "r") as current:
+                f.write(current.read())
+        f.flush()
+        os.fsync(f.fileno())
+
+    legacy_path.rename(legacy_path.with_name(legacy_path.name + ".migrated"))
+    os.replace(staged_path, path)
+    print(f"[History] Migrated {len(records)} records from {legacy_path} to {path}")
+    return len(records)
+
+
+def append_record(record, path=APPLICATION_LOG_PATH, fsync=APPLICATION_LOG_FSYNC):
+    """Append one record to the log. With fsync, it is on disk before returning."""
+    migrate_legacy_log(path)
+    line = json.dumps(record) + "\n"
+    with open(path, "a+b") as f:
+        # Don't glue the record onto a line left truncated by a crash
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                line = "\n" + line
+        f.write(line.encode("utf-8"))
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def iter_applications(path=APPLICATION_LOG_PATH):
+    """
+    Stream application records one at a time, oldest first.
+    A truncated last line (crash mid-write) is skipped.
+    """
+    migrate_legacy_log(path)
+    path = Path(path)
+    if not path.exists():
+        return
+
+    with open(path, "r") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                print(f"[History] Skipping malformed record at {path}:{line_no}")
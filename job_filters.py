@@ -0,0 +1,66 @@
+"""
+Pre-click job filters.
+Runs over harvested card data so jobs we would always skip never cost a
+detail-pane load. Each rejection is counted per filter for the run stats.
+"""
+import re
+from collections import Counter
+from datetime import datetime, timedelta
+from config import (
+    RESUME_KEYWORDS, TITLE_INCLUDE_RESUME_KEYWORDS, TITLE_INCLUDE_PATTERNS,
+    TITLE_EXCLUDE_PATTERNS, COMPANY_BLOCKLIST, COMPANY_COOLDOWN_DAYS,
+    REQUIRE_EASY_APPLY_CARD
+)
+from job_index import normalize_company
+
+
+class JobFilter:
+    """
+    Ordered filter pipeline over card records (see page_probes.harvest_job_cards).
+    Empty card values (cards not fully rendered) always pass.
+    """
+
+    def __init__(self, job_index):
+        self.job_index = job_index
+        self.rejections = Counter()
+
+        include = [re.escape(kw) for kw in sum(RESUME_KEYWORDS.values(), [])] if TITLE_INCLUDE_RESUME_KEYWORDS else []
+        include += TITLE_INCLUDE_PATTERNS
+        self.title_include = re.compile("|".join(include), re.IGNORECASE) if include else None
+        self.title_exclude = re.compile("|".join(TITLE_EXCLUDE_PATTERNS), re.IGNORECASE) if TITLE_EXCLUDE_PATTERNS else None
+        self.blocklist = {normalize_company(c) for c in COMPANY_BLOCKLIST}
+        self.cooldown = timedelta(days=COMPANY_COOLDOWN_DAYS)
+
+        self.filters = [
+            ("not_easy_apply", self._not_easy_apply),
+            ("company_blocklist", self._blocked_company),
+            ("title_excluded", self._title_excluded),
+            ("title_no_keyword", self._title_not_included),
+            ("company_cooldown", self._company_cooldown),
+        ]
+
+    def _not_easy_apply(self, card):
+        return REQUIRE_EASY_APPLY_CARD and card.get("easy_apply") is False
+
+    def _blocked_company(self, card):
+        return bool(card.get("company")) and normalize_company(card["company"]) in self.blocklist
+
+    def _title_excluded(self, card):
+        return bool(self.title_exclude and card.get("title") and self.title_exclude.search(card["title"]))
+
+    def _title_not_included(self, card):
+        return bool(self.title_include and card.get("title") and not self.title_include.search(card["title"]))
+
+    def _company_cooldown(self, card):
+        if COMPANY_COOLDOWN_DAYS <= 0 or not card.get("company"):
+            return False
+        last = self.job_index.last_applied_at(card["company"])
+        return last is not None and datetime.now() - last < self.cooldown
+
+    def rejection_reason(self, card):
+        """Return the name of the first filter rejecting this card, or None."""
+        for name, rejects in self.filters:
+            if rejects(card):
+                self.rejections[name] += 1
+                return name
+        return None
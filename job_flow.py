@@ -0,0 +1,264 @@
+"""
+The agent loop's decisions, without the browser.
+agent.py and agent_async.py do the page work (probes, clicks, waits) and
+call these for the rest: run limits, which cards to open, job outcomes
+and their stats, the modal's next move, and the session records.
+"""
+import json
+import time
+from collections import Counter
+from datetime import datetime
+from form_plan import failed_action_unknown, has_required_unknown, step_fingerprint
+from metrics import print_metrics
+from tracing import tracer
+from config import MAX_APPLICATIONS_PER_RUN, MAX_JOBS_TO_PROCESS, RUN_STATS_PATH
+
+MAX_MODAL_STEPS = 10
+
+# Job outcome -> (stats counter, message)
+OUTCOMES = {
+    "submitted": ("applied", "   [Apply] SUCCESS: Application submitted."),
+    "skipped": ("skipped", "   [Apply] SKIPPED: Could not complete form ({reason})."),
+    "already_applied": ("already_applied", "   [Skip] Already applied to this job."),
+    "external": ("external", "   [Skip] External application."),
+    "no_button": ("no_button", "   [Skip] No apply button found."),
+}
+
+
+def new_stats():
+    return {
+        "processed": 0,
+        "applied": 0,
+        "skipped": 0,
+        "already_applied": 0,
+        "external": 0,
+        "no_button": 0,
+        "seen_before": 0,
+        "filtered": 0,
+        "skip_reasons": Counter(),
+        "wasted_seconds": 0.0
+    }
+
+
+def log_application(store, job_title, company, status, resume_type, job_id=None, reason=None):
+    """Record an application in the history store."""
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "job_id": job_id,
+        "job_title": job_title,
+        "company": company,
+        "status": status,
+        "resume_type": resume_type
+    }
+    if reason:
+        record["reason"] = reason
+    with tracer.span("log_application"):
+        store.log_application(record)
+
+
+def outcome_recorder(job_index, log):
+    """
+    record(job_title, company, status, resume_type, job_id, reason=None):
+    updates the seen-job index at once and hands the history record to log,
+    which takes log_application's arguments after the store.
+    """
+    def record(job_title, company, status, resume_type, job_id, reason=None):
+        job_index.record(job_id, status, company)
+        log(job_title, company, status, resume_type, job_id, reason)
+    return record
+
+
+def reached_run_limit(stats):
+    """True once this run has applied or processed as many jobs as allowed."""
+    if stats["applied"] >= MAX_APPLICATIONS_PER_RUN:
+        print(f"\n[ApplyPilot] Reached max applications ({MAX_APPLICATIONS_PER_RUN}). Stopping.")
+        return True
+    if stats["processed"] >= MAX_JOBS_TO_PROCESS:
+        print(f"\n[ApplyPilot] Reached max jobs to process ({MAX_JOBS_TO_PROCESS}). Stopping.")
+        return True
+    return False
+
+
+def triage_card(card, stats, job_index, job_filter, seen_on_page, record):
+    """
+    Decide from a harvested card alone whether its detail pane is worth
+    loading. Cards skipped here are counted, and the ones already showing
+    Applied are recorded. Returns True to open the card.
+    """
+    job_id = card["job_id"]
+    if job_id:
+        if job_id in seen_on_page:
+            return False
+        seen_on_page.add(job_id)
+
+    if job_index.should_skip(job_id):
+        stats["seen_before"] += 1
+        return False
+    if card["applied"]:
+        print(f"\n[ApplyPilot] {card['title'] or job_id}: card shows Applied. Skipping.")
+        stats["already_applied"] += 1
+        if job_id:
+            record(card["title"], card["company"], "already_applied", None, job_id)
+        return False
+
+    reason = job_filter.rejection_reason(card)
+    if reason:
+        print(f"   [Filter] {card['title'] or job_id} at {card['company'] or '?'}: {reason}")
+        stats["filtered"] += 1
+        return False
+    return True
+
+
+def start_job(stats):
+    stats["processed"] += 1
+    print(f"\n[ApplyPilot] Processing Job #{stats['processed']}...")
+
+
+def finish_job(stats, record, job_title, company, status, resume_type, job_id, reason=None, started=None):
+    """
+    Count and record a job's outcome (see OUTCOMES). started is when the
+    Easy Apply modal was opened; a skipped form adds its time to the stats.
+    Jobs without an apply button are counted but not recorded.
+    """
+    counter, message = OUTCOMES[status]
+    print(message.format(reason=reason))
+    stats[counter] += 1
+    if status == "skipped":
+        stats["skip_reasons"][reason] += 1
+        if started is not None:
+            stats["wasted_seconds"] += time.monotonic() - started
+    if status != "no_button":
+        record(job_title, company, status, resume_type, job_id, reason)
+
+
+def record_write(action, ok, unknowns):
+    """Report one planned write; a rejected dropdown or radio answer joins unknowns."""
+    if ok:
+        print(f"   [Fill] '{action['question'][:30]}...' -> '{action['answer'][:30]}' ({action['source']})")
+        return
+    unknown = failed_action_unknown(action)
+    if unknown:
+        unknowns.append(unknown)
+
+
+class ModalRun:
+    """
+    One pass through the Easy Apply modal: which step it is on, whether the
+    resume was selected, the steps already seen and why it stopped (reason).
+    The caller reads and clicks the page; each check prints its decision.
+    """
+
+    def __init__(self, resume_dropdown_name="", max_steps=MAX_MODAL_STEPS):
+        self.resume_dropdown_name = resume_dropdown_name
+        self.max_steps = max_steps
+        self.resume_selected = False
+        self.seen_steps = set()
+        self.reason = "max_steps"
+
+    def step_open(self, step, state):
+        if not state.open:
+            print(f"   [Form] Step {step+1}: Modal is not open.")
+            self.reason = "modal_closed"
+            return False
+        print(f"   [Form] Step {step+1}: {state.describe()}")
+        return True
+
+    def wants_resume(self, step, state):
+        """Try to select the resume on the first 3 steps, until it is done."""
+        if step < 3 and self.resume_dropdown_name and not self.resume_selected and state.resume_section:
+            print(f"   [Resume] Resume section detected on step {step + 1}")
+            return True
+        return False
+
+    def is_stuck(self, step, snapshot, state):
+        """Same questions at the same progress as an earlier step: the modal is stuck."""
+        fingerprint = step_fingerprint(snapshot, state.progress, state.heading)
+        if fingerprint in self.seen_steps:
+            print(f"   [Form] Step {step+1}: Same step again with no progress. Aborting.")
+            self.reason = "stuck_step"
+            return True
+        self.seen_steps.add(fingerprint)
+        return False
+
+    def is_blocked(self, step, unknowns, metrics):
+        if has_required_unknown(unknowns):
+            print(f"   [Form] Step {step+1}: Required field has no answer. Aborting.")
+            self.reason = "required_unknown"
+            metrics.record_blocked(unknowns)
+            return True
+        return False
+
+    def next_move(self, step, state):
+        """The button to click for a filled step ('submit', 'next' or 'review'), or None to stop."""
+        action = state.next_action()
+        if action == "error":
+            for error in state.errors:
+                print(f"   [Form] Step {step+1}: Validation error on '{error['field'][:40]}': {error['message'][:60]}")
+            self.reason = "validation_error"
+            return None
+        if action == "submit":
+            print("   [Form] Clicking SUBMIT!")
+            return action
+        if action in ("next", "review"):
+            print(f"   [Form] Step {step+1}: Clicking {action.title()}...")
+            return action
+        print(f"   [Form] Step {step+1}: No navigation button found.")
+        self.reason = "no_navigation"
+        return None
+
+
+def save_run_metrics(form_filler):
+    """Add this run's answer-source metrics to the stored totals. None if that fails."""
+    try:
+        return form_filler.save_metrics()
+    except Exception as e:
+        print(f"[Warning] Could not save resolution metrics: {e}")
+        return None
+
+
+def save_run_stats(stats, watchdog, path=RUN_STATS_PATH):
+    """Append the session stats and page memory samples to RUN_STATS_PATH."""
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "stats": {key: dict(value) if isinstance(value, Counter) else value for key, value in stats.items()},
+        "page_memory": watchdog.to_dict(),
+    }
+    try:
+        with open(path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        print(f"[Warning] Could not save run stats: {e}")
+
+
+def print_session_summary(stats, form_filler, job_filter, cumulative_metrics=None):
+    print(f"\n{'='*50}")
+    print("[ApplyPilot] Session Complete")
+    print(f"{'='*50}")
+    print(f"   Jobs Processed:   {stats['processed']}")
+    print(f"   Applied:          {stats['applied']}")
+    print(f"   Skipped (fields): {stats['skipped']}")
+    for reason, count in stats["skip_reasons"].most_common():
+        print(f"     - {reason}: {count}")
+    if stats["skipped"]:
+        print(f"   Time on skipped forms: {stats['wasted_seconds']:.0f}s")
+    print(f"   Already Applied:  {stats['already_applied']}")
+    print(f"   External Links:   {stats['external']}")
+    print(f"   No Button:        {stats['no_button']}")
+    print(f"   Seen Before:      {stats['seen_before']}")
+    print(f"   Filtered:         {stats['filtered']}")
+    for reason, count in job_filter.rejections.most_common():
+        print(f"     - {reason}: {count}")
+    avoided = stats["seen_before"] + stats["filtered"]
+    if avoided:
+        print(f"   Detail loads avoided: {avoided}")
+
+    cache = form_filler.plan_cache.stats()
+    if cache["hits"] or cache["misses"]:
+        print(f"   Answer plans:     {cache['hits']} cached / {cache['misses']} resolved "
+              f"({cache['hit_rate']:.0%} hit rate, {cache['invalidations']} invalidated)")
+    print_metrics(form_filler.metrics, cumulative_metrics)
+
+    unknowns = form_filler.get_unknown_fields()
+    if unknowns:
+        print(f"\n[ApplyPilot] {len(unknowns)} unknown fields logged.")
+        print("   Run 'python learn_fields.py' to fill them in.")
@@ -0,0 +1,56 @@
+"""
+In-memory index of LinkedIn job ids the agent has already handled.
+Built once from the application history so previously seen jobs can be
+skipped before their card is even clicked.
+"""
+from datetime import datetime
+from config import SKIP_SEEN_STATUSES
+
+
+def normalize_company(company):
+    return " ".join((company or "").split()).lower()
+
+
+class JobIndex:
+    """
+    Maps job id -> last logged status, and company -> last submission time.
+    Lookups are dict gets, so they are safe to call for every card.
+    """
+
+    def __init__(self, store, skip_statuses=SKIP_SEEN_STATUSES):
+        self.skip_statuses = set(skip_statuses)
+        self.statuses = {}
+        self.last_applied = {}
+        for record in store.iter_applications():
+            job_id = record.get("job_id")
+            if job_id:
+                self.statuses[str(job_id)] = record.get("status")
+            if record.get("status") == "submitted" and record.get("company"):
+                try:
+                    self._note_submission(record["company"], datetime.fromisoformat(record["timestamp"]))
+                except (KeyError, TypeError, ValueError):
+                    pass
+
+    def __len__(self):
+        return len(self.statuses)
+
+    def _note_submission(self, company, when):
+        key = normalize_company(company)
+        if key not in self.last_applied or when > self.last_applied[key]:
+            self.last_applied[key] = when
+
+    def should_skip(self, job_id):
+        """True if this job was already handled with a status we never retry."""
+        if not job_id:
+            return False
+        return self.statuses.get(str(job_id)) in self.skip_statuses
+
+    def last_applied_at(self, company):
+        """When we last submitted an application to this company, or None."""
+        return self.last_applied.get(normalize_company(company))
+
+    def record(self, job_id, status, company=None):
+        if job_id:
+            self.statuses[str(job_id)] = status
+        if status == "submitted" and company:
+            self._note_submission(company, datetime.now())
@@ -5,17 +5,7 @@ Run this after the agent encounters fields it doesn't know.
 """
 
 from form_filler import FormFiller
-
-
-def clean_question(question):
-    """Remove duplicate lines from question text."""
-    lines = question.split('\n')
-    seen = []
-    for line in lines:
-        line = line.strip()
-        if line and line not in seen and line.lower() != 'required':
-            seen.append(line)
-    return ' '.join(seen)
+from questions import clean_question
 
 
 def main():
@@ -72,6 +62,7 @@ def main():
         answer = input().strip()
 
         if answer.lower() == 'quit':
+            filler.flush()
             print("\nExiting. Progress saved.")
             break
         elif answer.lower() == 'skip' or answer == '':
@@ -99,6 +90,8 @@ def main():
         filled += 1
         print(f"    → Saved: {answer}")
 
+    filler.flush()
+
     print(f"\n{'='*60}")
     print(f"  Done! Filled {filled} field(s).")
     print(f"  Remaining unknown: {len(filler.get_unknown_fields())}")
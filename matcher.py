@@ -0,0 +1,326 @@
+"""
+Similarity indexes over known form questions.
+Used by FormFiller to find the closest known question without running
+SequenceMatcher against every entry in field memory.
+"""
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+try:
+    import numpy as np
+except ImportError:  # TF-IDF backend is optional
+    np = None
+
+MATCHER_BACKENDS = ("difflib", "index", "tfidf")
+
+
+def char_ngrams(text, n=3):
+    """Return the set of character n-grams of a padded string."""
+    padded = f" {text} "
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+class LinearMatcher:
+    """
+    Original matcher: SequenceMatcher ratio against every known question.
+    Kept as the baseline for benchmarks.
+    """
+
+    default_threshold = 0.7
+
+    def __init__(self, questions=()):
+        self._questions = dict.fromkeys(questions)
+
+    def __len__(self):
+        return len(self._questions)
+
+    def __contains__(self, question):
+        return question in self._questions
+
+    def add(self, question):
+        self._questions[question] = None
+
+    def remove(self, question):
+        self._questions.pop(question, None)
+
+    def top_k(self, question, k=5, threshold=0.0):
+        """Return up to k (known_question, score) pairs, best first."""
+        scored = []
+        for known_q in self._questions:
+            score = SequenceMatcher(None, question.lower(), known_q.lower()).ratio()
+            if score >= threshold:
+                scored.append((known_q, score))
+        scored.sort(key=lambda pair: pair[1], reverse=True)
+        return scored[:k]
+
+    def top_k_batch(self, questions, k=5, threshold=0.0):
+        return [self.top_k(question, k, threshold) for question in questions]
+
+    def best_match(self, question, threshold=None):
+        """Return (known_question, score) or (None, 0)."""
+        threshold = self.default_threshold if threshold is None else threshold
+        matches = self.top_k(question, k=1, threshold=threshold)
+        if matches:
+            return matches[0]
+        return None, 0
+
+
+class FuzzyIndex:
+    """
+    Character n-gram inverted index with length bucketing.
+
+    Candidates are gathered from the n-gram postings, filtered by length
+    (real_quick_ratio can never reach the threshold outside the window),
+    ranked by shared n-grams and only the top few get the full
+    SequenceMatcher ratio.
+    """
+
+    default_threshold = 0.7
+
+    def __init__(self, questions=(), n=3, max_candidates=20):
+        self.n = n
+        self.max_candidates = max_candidates
+        self._postings = defaultdict(set)
+        self._lengths = {}
+        self._grams = {}
+        for question in questions:
+            self.add(question)
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def __contains__(self, question):
+        return question in self._lengths
+
+    def add(self, question):
+        """Index a known question (no-op if already indexed)."""
+        if question in self._lengths:
+            return
+        grams = char_ngrams(question.lower(), self.n)
+        self._grams[question] = grams
+        self._lengths[question] = len(question)
+        for gram in grams:
+            self._postings[gram].add(question)
+
+    def remove(self, question):
+        """Drop a question from the index."""
+        grams = self._grams.pop(question, None)
+        if grams is None:
+            return
+        del self._lengths[question]
+        for gram in grams:
+            bucket = self._postings.get(gram)
+            if bucket is not None:
+                bucket.discard(question)
+                if not bucket:
+                    del self._postings[gram]
+
+    def candidates(self, question, threshold=0.7):
+        """Return indexed questions worth a full ratio check, best first."""
+        length = len(question)
+        if length == 0:
+            return []
+
+        # ratio <= 2 * min(a, b) / (a + b), so lengths outside this window
+        # can never reach the threshold.
+        min_len = length * threshold / (2 - threshold)
+        max_len = length * (2 - threshold) / threshold if threshold > 0 else float("inf")
+
+        shared = defaultdict(int)
+        for gram in char_ngrams(question.lower(), self.n):
+            for known_q in self._postings.get(gram, ()):
+                shared[known_q] += 1
+
+        ranked = [
+            known_q for known_q in shared
+            if min_len <= self._lengths[known_q] <= max_len
+        ]
+        ranked.sort(key=lambda known_q: shared[known_q], reverse=True)
+        return ranked[:self.max_candidates]
+
+    def top_k(self, question, k=5, threshold=0.0):
+        """Return up to k (known_question, score) pairs, best first."""
+        matcher = SequenceMatcher(None)
+        # SequenceMatcher caches details about seq2, so keep the query there.
+        matcher.set_seq2(question.lower())
+
+        scored = []
+        for known_q in self.candidates(question, threshold):
+            matcher.set_seq1(known_q.lower())
+            if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+                continue
+            score = matcher.ratio()
+            if score >= threshold:
+                scored.append((known_q, score))
+
+        scored.sort(key=lambda pair: pair[1], reverse=True)
+        return scored[:k]
+
+    def top_k_batch(self, questions, k=5, threshold=0.0):
+        return [self.top_k(question, k, threshold) for question in questions]
+
+    def best_match(self, question, threshold=None):
+        """Return (known_question, score) or (None, 0)."""
+        threshold = self.default_threshold if threshold is None else threshold
+        matches = self.top_k(question, k=1, threshold=threshold)
+        if matches:
+            return matches[0]
+        return None, 0
+
+
+class TfidfMatcher:
+    """
+    Character n-gram TF-IDF matcher backed by NumPy.
+
+    Known questions are encoded once into a column-major sparse matrix
+    (binary term frequency, smoothed idf, L2-normalised rows). A batch of
+    questions is scored against every known question with one bincount,
+    so a whole form step costs a single vectorised pass. Scores are cosine
+    similarities, not SequenceMatcher ratios, hence the separate threshold.
+    """
+
+    default_threshold = 0.6
+
+    def __init__(self, questions=(), n=3):
+        if np is None:
+            raise ImportError("TfidfMatcher requires numpy (pip install numpy)")
+        self.n = n
+        self._questions = list(dict.fromkeys(questions))
+        self._positions = {q: i for i, q in enumerate(self._questions)}
+        self._dirty = True
+        self._build()
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, question):
+        return question in self._positions
+
+    def add(self, question):
+        """Queue a question; the matrix is rebuilt lazily on the next query."""
+        if question in self._positions:
+            return
+        self._positions[question] = len(self._questions)
+        self._questions.append(question)
+        self._dirty = True
+
+    def remove(self, question):
+        if question not in self._positions:
+            return
+        self._questions.remove(question)
+        self._positions = {q: i for i, q in enumerate(self._questions)}
+        self._dirty = True
+
+    def _build(self):
+        vocab = {}
+        rows, cols = [], []
+        for row, question in enumerate(self._questions):
+            for gram in char_ngrams(question.lower(), self.n):
+                rows.append(row)
+                cols.append(vocab.setdefault(gram, len(vocab)))
+
+        n_docs = len(self._questions)
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+
+        df = np.bincount(cols, minlength=len(vocab))
+        idf = np.log((1 + n_docs) / (1 + df)) + 1.0
+        weights = idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=n_docs))
+        if len(weights):
+            weights = weights / norms[rows]
+
+        # Column-major layout: postings of term t are doc_ids[ptr[t]:ptr[t+1]]
+        order = np.argsort(cols, kind="stable")
+        self._vocab = vocab
+        self._idf = idf
+        self._doc_ids = rows[order]
+        self._weights = weights[order]
+        self._col_ptr = np.concatenate(([0], np.cumsum(df)))
+        self._dirty = False
+
+    def score_batch(self, questions):
+        """Return a (len(questions), len(known)) matrix of cosine similarities."""
+        if self._dirty:
+            self._build()
+
+        n_docs = len(self._questions)
+        # An n-gram no known question contains gets the largest possible idf
+        unseen_idf = np.log(1 + n_docs) + 1.0
+
+        # Flatten every (question, term, weight) triple of the batch
+        query_rows, terms, term_weights = [], [], []
+        for qi, question in enumerate(questions):
+            grams = char_ngrams(question.lower(), self.n)
+            q_terms = [self._vocab[g] for g in grams if g in self._vocab]
+            if not q_terms:
+                continue
+            q_weights = self._idf[q_terms]
+            unseen = len(grams) - len(q_terms)
+            q_norm = np.sqrt(np.sum(q_weights ** 2) + unseen * unseen_idf ** 2)
+            query_rows.extend([qi] * len(q_terms))
+            terms.extend(q_terms)
+            term_weights.append(q_weights / q_norm)
+
+        if not terms:
+            return np.zeros((len(questions), n_docs))
+
+        # Gather all posting ranges at once instead of slicing term by term
+        terms = np.asarray(terms)
+        starts = self._col_ptr[terms]
+        lengths = self._col_ptr[terms + 1] - starts
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        postings = np.arange(lengths.sum()) + offsets
+
+        flat = np.bincount(
+            self._doc_ids[postings] + np.repeat(np.asarray(query_rows) * n_docs, lengths),
+            weights=self._weights[postings] * np.repeat(np.concatenate(term_weights), lengths),
+            minlength=len(questions) * n_docs,
+        )
+        return flat.reshape(len(questions), n_docs)
+
+    def top_k_batch(self, questions, k=5, threshold=0.0):
+        """Return, per question, up to k (known_question, score) pairs."""
+        if not questions:
+            return []
+        if not self._questions:
+            return [[] for _ in questions]
+
+        scores = self.score_batch(questions)
+        k = min(k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        return [
+            [(self._questions[i], float(score)) for i, score in zip(row, row_scores) if score >= threshold]
+            for row, row_scores in zip(top, top_scores)
+        ]
+
+    def top_k(self, question, k=5, threshold=0.0):
+        return self.top_k_batch([question], k, threshold)[0]
+
+    def best_match(self, question, threshold=None):
+        """Return (known_question, score) or (None, 0)."""
+        threshold = self.default_threshold if threshold is None else threshold
+        matches = self.top_k(question, k=1, threshold=threshold)
+        if matches:
+            return matches[0]
+        return None, 0
+
+
+def build_matcher(backend, questions=()):
+    """Create the matcher selected by MATCHER_BACKEND."""
+    if backend == "difflib":
+        return LinearMatcher(questions)
+    if backend == "tfidf":
+        if np is not None:
+            return TfidfMatcher(questions)
+        print("[Warning] numpy not installed; falling back to the 'index' matcher.")
+    elif backend != "index":
+        print(f"[Warning] Unknown matcher backend '{backend}'; using 'index'.")
+    return FuzzyIndex(questions)
@@ -0,0 +1,174 @@
+"""
+Where form answers come from, per run and across runs.
+
+FormFiller.get_answer records every lookup here: its source (memory,
+memory_fuzzy, resume, unknown) by field type, how long it took, and the
+score of accepted fuzzy matches. Fields the page had already filled are
+only counted as pre-filled, so they don't skew the source rates. Steps
+served from a cached answer plan count each question's cached source
+again (record_cached, no latency), so counts are per field shown. The
+agent adds the required questions that made it abandon an application.
+
+At session end the run's metrics are merged into the store's cumulative
+copy (store.update_metrics) and printed with the session stats.
+"""
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from questions import clean_question
+
+# Upper bounds (ms) of the latency buckets; one more bucket holds anything slower
+LATENCY_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100)
+SCORE_BUCKETS = 10          # Fuzzy scores in 0.1-wide buckets
+
+
+def empty_histogram():
+    return [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+
+def add_lists(a, b):
+    return [x + y for x, y in zip(a, b)]
+
+
+class ResolutionMetrics:
+    """Counters and histograms for answer lookups. Plain dicts/lists, so it round-trips through JSON."""
+
+    def __init__(self):
+        self.sources = defaultdict(Counter)          # source -> field_type -> lookups
+        self.latency = defaultdict(empty_histogram)  # source -> bucket counts
+        self.fuzzy_scores = [0] * SCORE_BUCKETS
+        self.prefilled = Counter()                    # field_type -> lookups for already-filled fields
+        self.cached = 0                               # Lookups answered from cached plans (in sources)
+        self.blocking = Counter()                     # question -> applications abandoned on it
+        self.blocked_applications = 0
+
+    def record(self, source, field_type, seconds, score=None):
+        self.sources[source][field_type] += 1
+        self.latency[source][bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+        if score is not None:
+            self.fuzzy_scores[min(int(score * SCORE_BUCKETS), SCORE_BUCKETS - 1)] += 1
+
+    def record_cached(self, source, field_type):
+        """A question answered from a cached plan: counted in sources, not in latency."""
+        self.sources[source][field_type] += 1
+        self.cached += 1
+
+    def record_prefilled(self, field_type):
+        self.prefilled[field_type] += 1
+
+    def record_blocked(self, unknowns):
+        """An application was abandoned on these unknown fields; count the required ones."""
+        questions = {clean_question(u["question"]) for u in unknowns if u.get("required")}
+        if questions:
+            self.blocked_applications += 1
+            self.blocking.update(questions)
+
+    # -- Aggregates -------------------------------------------------------------
+
+    def lookups(self):
+        return sum(sum(types.values()) for types in self.sources.values())
+
+    def by_source(self):
+        return Counter({source: sum(types.values()) for source, types in self.sources.items()})
+
+    def latency_percentile(self, pct, source=None):
+        """Upper bound (ms) of the bucket holding the pct-th lookup; None if slower than every bucket."""
+        histograms = [self.latency[source]] if source else list(self.latency.values())
+        counts = empty_histogram()
+        for histogram in histograms:
+            counts = add_lists(counts, histogram)
+        total = sum(counts)
+        if not total:
+            return 0.0
+        target = pct / 100 * total
+        seen = 0
+        for index, count in enumerate(counts):
+            seen += count
+            if seen >= target:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else None
+        return None
+
+    # -- Persistence ------------------------------------------------------------
+
+    def merge(self, other):
+        for source, types in other.sources.items():
+            self.sources[source].update(types)
+        for source, histogram in other.latency.items():
+            self.latency[source] = add_lists(self.latency[source], histogram)
+        self.fuzzy_scores = add_lists(self.fuzzy_scores, other.fuzzy_scores)
+        self.prefilled.update(other.prefilled)
+        self.cached += other.cached
+        self.blocking.update(other.blocking)
+        self.blocked_applications += other.blocked_applications
+        return self
+
+    def to_dict(self):
+        return {
+            "sources": {source: dict(types) for source, types in self.sources.items()},
+            "latency_buckets_ms": list(LATENCY_BUCKETS_MS),
+            "latency": dict(self.latency),
+            "fuzzy_scores": self.fuzzy_scores,
+            "prefilled": dict(self.prefilled),
+            "cached": self.cached,
+            "blocking": dict(self.blocking),
+            "blocked_applications": self.blocked_applications,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        metrics = cls()
+        if not data:
+            return metrics
+        for source, types in data.get("sources", {}).items():
+            metrics.sources[source].update(types)
+        # Histograms written with other bucket bounds can't be merged; start those afresh
+        if data.get("latency_buckets_ms") == list(LATENCY_BUCKETS_MS):
+            for source, histogram in data.get("latency", {}).items():
+                metrics.latency[source] = list(histogram)
+        if len(data.get("fuzzy_scores", [])) == SCORE_BUCKETS:
+            metrics.fuzzy_scores = list(data["fuzzy_scores"])
+        metrics.prefilled.update(data.get("prefilled", {}))
+        metrics.cached = data.get("cached", 0)
+        metrics.blocking.update(data.get("blocking", {}))
+        metrics.blocked_applications = data.get("blocked_applications", 0)
+        return metrics
+
+
+def format_ms(value):
+    return f">{LATENCY_BUCKETS_MS[-1]}ms" if value is None else f"<={value}ms"
+
+
+def print_metrics(run, cumulative=None, top=5):
+    """Session-summary block: sources by field type, latency, fuzzy scores and blocking questions."""
+    total = run.lookups()
+    if not total:
+        return
+    all_time = cumulative.by_source() if cumulative else Counter()
+    all_total = sum(all_time.values())
+
+    notes = [f"{all_total} all-time"] if cumulative else []
+    if run.cached:
+        notes.append(f"{run.cached} from cached plans")
+    print(f"   Answer lookups:   {total}" + (f" ({', '.join(notes)})" if notes else ""))
+    for source, count in run.by_source().most_common():
+        types = ", ".join(f"{t} {n}" for t, n in run.sources[source].most_common())
+        line = f"     - {source}: {count} ({count / total:.0%})"
+        if all_total:
+            line += f" | all-time {all_time[source] / all_total:.0%}"
+        print(f"{line}  [{types}]")
+    print(f"   Lookup latency:   p50 {format_ms(run.latency_percentile(50))}, "
+          f"p95 {format_ms(run.latency_percentile(95))}")
+
+    if run.prefilled:
+        types = ", ".join(f"{t} {n}" for t, n in run.prefilled.most_common())
+        print(f"   Pre-filled:       {sum(run.prefilled.values())} (not counted above)  [{types}]")
+
+    if any(run.fuzzy_scores):
+        buckets = " ".join(f"{i / SCORE_BUCKETS:.1f}:{n}" for i, n in enumerate(run.fuzzy_scores) if n)
+        print(f"   Fuzzy scores:     {buckets}")
+
+    blocking = (cumulative or run).blocking
+    if blocking:
+        label = "all-time" if cumulative else "this run"
+        print(f"   Top blocking questions ({label}, applications abandoned):")
+        for question, count in blocking.most_common(top):
+            print(f"     - {count}x {question[:70]}")
@@ -0,0 +1,453 @@
+"""
+In-page probes for ApplyPilot Agent.
+Each probe is a single page.evaluate() call that reads everything a step
+needs from the DOM at once, instead of one Playwright round trip per element.
+"""
+from dataclasses import dataclass, field
+from typing import Optional
+from questions import clean_question
+
+MODAL_ROOT_SELECTOR = "div.jobs-easy-apply-modal"
+FIELD_KEY_ATTR = "data-applypilot-key"
+ERROR_SELECTOR = "div.artdeco-inline-feedback--error"
+
+# Modal navigation buttons, in the order they are acted on
+NAV_BUTTON_SELECTORS = {
+    "submit": "button[aria-label='Submit application']",
+    "next": "button[aria-label='Continue to next step']",
+    "review": "button[aria-label='Review your application']",
+}
+
+# Tags every visible field in the modal with a data-applypilot-key attribute
+# so Python can write back to it later without re-resolving labels.
+SNAPSHOT_FORM_JS = """
+([rootSelector, keyAttr]) => {
+    document.querySelectorAll(`[${keyAttr}]`).forEach(el => el.removeAttribute(keyAttr));
+
+    const root = document.querySelector(rootSelector) || document;
+    let counter = 0;
+
+    const isVisible = el => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== 'hidden';
+    };
+    const textOf = el => (el ? (el.innerText || el.textContent || '') : '').trim();
+    const tag = el => {
+        const key = String(counter++);
+        el.setAttribute(keyAttr, key);
+        return key;
+    };
+    const labelFor = el => {
+        if (!el.id) return null;
+        const label = document.querySelector(`label[for="${CSS.escape(el.id)}"]`);
+        return label ? textOf(label) : null;
+    };
+    // required attribute, aria-required, or a '*' / 'Required' marker in the label
+    const isRequired = (el, label) => el.required
+        || el.getAttribute('aria-required') === 'true'
+        || !!el.querySelector("[required], [aria-required='true']")
+        || /\\*|\\brequired\\b/i.test(label || '');
+
+    const snapshot = { text: [], select: [], radio: [], textarea: [] };
+
+    root.querySelectorAll("input[type='text'], input:not([type])").forEach(el => {
+        if (!isVisible(el)) return;
+        snapshot.text.push({
+            key: tag(el),
+            label: labelFor(el),
+            placeholder: el.getAttribute('placeholder'),
+            aria_label: el.getAttribute('aria-label'),
+            value: el.value,
+            required: isRequired(el, labelFor(el)),
+        });
+    });
+
+    root.querySelectorAll('select').forEach(el => {
+        if (!isVisible(el)) return;
+        snapshot.select.push({
+            key: tag(el),
+            label: labelFor(el),
+            aria_label: el.getAttribute('aria-label'),
+            value: el.value,
+            options: Array.from(el.options).map(opt => textOf(opt)),
+            required: isRequired(el, labelFor(el)),
+        });
+    });
+
+    root.querySelectorAll('fieldset').forEach(el => {
+        if (!isVisible(el)) return;
+        const legend = el.querySelector('legend');
+        snapshot.radio.push({
+            key: tag(el),
+            label: legend ? textOf(legend) : null,
+            checked: !!el.querySelector("input[type='radio']:checked"),
+            required: isRequired(el, legend ? textOf(legend) : null),
+            text: textOf(el).toLowerCase(),
+            options: Array.from(el.querySelectorAll('label')).map(label => ({
+                key: tag(label),
+                label: textOf(label),
+            })),
+        });
+    });
+
+    root.querySelectorAll('textarea').forEach(el => {
+        if (!isVisible(el)) return;
+        snapshot.textarea.push({
+            key: tag(el),
+            label: labelFor(el),
+            placeholder: el.getAttribute('placeholder'),
+            value: el.value,
+            required: isRequired(el, labelFor(el)),
+        });
+    });
+
+    return snapshot;
+}
+"""
+
+
+# Step headers, progress value and field count of the modal. '' while a step
+# is still loading, 'closed' when there is no modal.
+MODAL_SIGNATURE_JS = """
+rootSelector => {
+    const root = document.querySelector(rootSelector);
+    if (!root) return 'closed';
+    const headers = Array.from(root.querySelectorAll('h3')).map(h => (h.innerText || '').trim()).join('/');
+    const progress = root.querySelector('progress, [role="progressbar"]');
+    const value = progress ? (progress.getAttribute('value') || progress.getAttribute('aria-valuenow') || '') : '';
+    const fields = root.querySelectorAll('input, select, textarea').length;
+    const buttons = root.querySelectorAll('footer button, button[aria-label]').length;
+    if (!headers && !fields && !buttons) return '';
+    return [headers, value, fields].join('|');
+}
+"""
+
+# Everything handle_application_modal decides on, read in one call
+MODAL_STATE_JS = """
+([rootSelector, errorSelector, buttons]) => {
+    const signature = (__SIGNATURE__)(rootSelector);
+    const root = document.querySelector(rootSelector);
+    if (!root) return { open: false, signature };
+
+    const isVisible = el => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== 'hidden';
+    };
+    const textOf = el => (el ? (el.innerText || el.textContent || '') : '').trim();
+    const firstLine = text => text.split('\\n')[0].trim();
+    const anyVisible = (scope, selector) => Array.from(scope.querySelectorAll(selector)).some(isVisible);
+
+    const button = (buttons.find(([name, selector]) => anyVisible(document, selector)) || [null])[0];
+
+    const errors = Array.from(root.querySelectorAll(errorSelector)).filter(isVisible).map(el => {
+        const container = el.closest(
+            '.jobs-easy-apply-form-element, .fb-dash-form-element, [data-test-form-element], fieldset'
+        );
+        const label = container && container.querySelector('legend, label');
+        return { field: label ? firstLine(textOf(label)) : '', message: textOf(el) };
+    });
+
+    const headings = Array.from(root.querySelectorAll('h3')).filter(isVisible).map(textOf);
+    const resumeSection = anyVisible(root, "input[type='radio'][id^='jobsDocumentCardToggle']")
+        || headings.some(text => /resume/i.test(text))
+        || Array.from(root.querySelectorAll('button')).some(b => isVisible(b) && /upload resume/i.test(textOf(b)));
+
+    let progress = null;
+    const bar = root.querySelector('progress, [role="progressbar"]');
+    if (bar) {
+        const value = parseFloat(bar.getAttribute('value') || bar.getAttribute('aria-valuenow'));
+        const max = parseFloat(bar.getAttribute('max') || bar.getAttribute('aria-valuemax') || '100');
+        if (!isNaN(value) && max > 0) progress = Math.round(value * 100 / max);
+    }
+    if (progress === null) {
+        const match = textOf(root.querySelector("[class*='progress']")).match(/(\\d+)\\s*%/);
+        if (match) progress = parseInt(match[1], 10);
+    }
+
+    return {
+        open: true,
+        button,
+        errors,
+        resume_section: resumeSection,
+        progress,
+        heading: headings[0] || '',
+        signature,
+    };
+}
+""".replace("__SIGNATURE__", MODAL_SIGNATURE_JS.strip())
+
+
+@dataclass
+class ModalState:
+    """One read of the Easy Apply modal (see MODAL_STATE_JS)."""
+    open: bool = False
+    button: Optional[str] = None        # "submit", "next", "review" or None
+    errors: list = field(default_factory=list)   # [{"field": label, "message": text}]
+    resume_section: bool = False
+    progress: Optional[int] = None      # percent complete, if the modal shows it
+    heading: str = ""
+    signature: str = "closed"           # compared by waits.modal_step_changed
+
+    @classmethod
+    def from_probe(cls, data):
+        data = data or {}
+        return cls(**{name: data[name] for name in cls.__dataclass_fields__ if data.get(name) is not None})
+
+    def next_action(self):
+        """What to do with a filled step: 'closed', 'error', 'submit', 'next', 'review' or 'stuck'."""
+        if not self.open:
+            return "closed"
+        if self.errors:
+            return "error"
+        return self.button or "stuck"
+
+    def describe(self):
+        progress = f" ({self.progress}%)" if self.progress is not None else ""
+        return f"{self.heading or 'Untitled step'}{progress}"
+
+
+# Applies a whole answer plan in one call. Values go through the native
+# value setter plus input/change events so React-controlled fields see
+# them; select and radio options are matched by normalized text.
+# Returns one {ok, error} per action, in order.
+APPLY_PLAN_JS = """
+([keyAttr, actions]) => {
+    const norm = s => (s || '').toLowerCase().replace(/\\s+/g, ' ').trim();
+    const byKey = key => key == null ? null : document.querySelector(`[${keyAttr}="${key}"]`);
+    const textOf = el => (el ? (el.innerText || el.textContent || '') : '').trim();
+
+    const setNative = (el, value) => {
+        const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype
+            : el instanceof HTMLSelectElement ? HTMLSelectElement.prototype
+            : HTMLInputElement.prototype;
+        const setter = Object.getOwnPropertyDescriptor(proto, 'value').set;
+        el.focus();
+        setter.call(el, value);
+        el.dispatchEvent(new Event('input', { bubbles: true }));
+        el.dispatchEvent(new Event('change', { bubbles: true }));
+        el.blur();
+    };
+
+    // exact text, exact value, then the single option that contains the answer
+    // (or is contained in it) as whole words, so "No" never picks "None"
+    const escapeRe = s => s.replace(/[.*+?^${}()|[\\]\\\\]/g, '\\\\$&');
+    const hasWords = (text, words) => new RegExp(`(^|\\\\W)${escapeRe(words)}($|\\\\W)`).test(text);
+    const pickOption = (options, answer, textFn) => {
+        const want = norm(answer);
+        const usable = options.filter(o => norm(textFn(o)) && norm(textFn(o)) !== 'select an option');
+        const exact = usable.find(o => norm(textFn(o)) === want)
+            || usable.find(o => o.value !== undefined && norm(o.value) === want);
+        if (exact || !want) return exact;
+        const partial = usable.filter(o => hasWords(norm(textFn(o)), want) || hasWords(want, norm(textFn(o))));
+        return partial.length === 1 ? partial[0] : undefined;
+    };
+
+    const radioInput = label => label.control
+        || label.querySelector("input[type='radio']")
+        || (label.htmlFor ? document.getElementById(label.htmlFor) : null);
+
+    const apply = action => {
+        if (action.action === 'fill') {
+            const el = byKey(action.key);
+            if (!el) return 'field not found';
+            setNative(el, action.answer);
+            return el.value === action.answer ? null : 'value not kept';
+        }
+        if (action.action === 'select') {
+            const el = byKey(action.key);
+            if (!el) return 'field not found';
+            const option = pickOption(Array.from(el.options), action.answer, textOf);
+            if (!option) return 'no matching option';
+            setNative(el, option.value);
+            return el.value === option.value ? null : 'option not kept';
+        }
+        if (action.action === 'click') {
+            const group = byKey(action.group_key);
+            if (!group) return 'field not found';
+            const label = pickOption(Array.from(group.querySelectorAll('label')), action.answer, textOf);
+            if (!label) return 'no matching option';
+            const input = radioInput(label);
+            if (input && input.checked) return null;
+            (input || label).click();
+            return !input || input.checked ? null : 'radio not checked';
+        }
+        return `unknown action ${action.action}`;
+    };
+
+    return actions.map(action => {
+        try {
+            const error = apply(action);
+            return { ok: !error, error };
+        } catch (e) {
+            return { ok: false, error: String(e) };
+        }
+    });
+}
+"""
+
+
+JOB_CARD_SELECTOR = "div.job-card-container"
+
+# Compact record per rendered job card: id from data attributes or the
+# /jobs/view/<id>/ link, display fields, Easy Apply flag and Applied state.
+HARVEST_CARDS_JS = """
+cardSelector => {
+    const textOf = el => (el ? (el.innerText || el.textContent || '') : '').trim();
+    const firstLine = text => text.split('\\n')[0].trim();
+    const jobIdOf = card => {
+        const holder = card.closest('[data-occludable-job-id]');
+        let jobId = card.getAttribute('data-job-id')
+            || (holder && holder.getAttribute('data-occludable-job-id'));
+        if (!jobId) {
+            const link = card.querySelector("a[href*='/jobs/view/']");
+            const match = link && link.href.match(/\\/jobs\\/view\\/(\\d+)/);
+            jobId = match ? match[1] : null;
+        }
+        const digits = jobId ? String(jobId).match(/\\d+/) : null;
+        return digits ? digits[0] : null;
+    };
+
+    return Array.from(document.querySelectorAll(cardSelector)).map((card, index) => {
+        const footer = Array.from(card.querySelectorAll(
+            '.job-card-container__footer-item, .job-card-container__footer-job-state, .job-card-container__apply-method'
+        )).map(textOf).join(' ');
+        const title = card.querySelector('.job-card-list__title, .job-card-container__link strong, a.job-card-container__link');
+        const company = card.querySelector('.job-card-container__primary-description, .artdeco-entity-lockup__subtitle');
+        const location = card.querySelector('.job-card-container__metadata-item, .artdeco-entity-lockup__caption');
+        return {
+            index,
+            job_id: jobIdOf(card),
+            title: title ? firstLine(textOf(title)) : '',
+            company: company ? firstLine(textOf(company)) : '',
+            location: location ? firstLine(textOf(location)) : '',
+            // null when the footer isn't rendered yet, so filters don't reject on missing data
+            easy_apply: /easy apply/i.test(footer) || !!card.querySelector("li-icon[type='linkedin-bug']")
+                ? true : (footer ? false : null),
+            applied: /\\bapplied\\b/i.test(footer),
+        };
+    });
+}
+"""
+
+
+def harvest_job_cards(page, card_selector=JOB_CARD_SELECTOR):
+    """Read every rendered job card into a list of compact dicts in one call."""
+    try:
+        return page.evaluate(HARVEST_CARDS_JS, card_selector) or []
+    except Exception as e:
+        print(f"[ApplyPilot] Card harvest error: {e}")
+        return []
+
+
+def job_card_locator(page, card, card_selector=JOB_CARD_SELECTOR):
+    """Locator for a harvested card: by job id when known, else by DOM index."""
+    job_id = card.get("job_id")
+    if job_id:
+        return page.locator(
+            f"{card_selector}[data-job-id='{job_id}'], "
+            f"[data-occludable-job-id='{job_id}'] {card_selector}"
+        ).first
+    return page.locator(card_selector).nth(card["index"])
+
+
+def empty_snapshot():
+    """Return a snapshot with no fields."""
+    return {"text": [], "select": [], "radio": [], "textarea": []}
+
+
+def read_modal_state(page, root_selector=MODAL_ROOT_SELECTOR):
+    """Read the modal's navigation, errors, resume section and progress in one call."""
+    try:
+        data = page.evaluate(MODAL_STATE_JS, [root_selector, ERROR_SELECTOR, list(NAV_BUTTON_SELECTORS.items())])
+    except Exception as e:
+        print(f"   [Form] Modal probe error: {e}")
+        return ModalState()
+    return ModalState.from_probe(data)
+
+
+def snapshot_form(page, root_selector=MODAL_ROOT_SELECTOR):
+    """
+    Read every visible text input, select, fieldset and textarea in the
+    Easy Apply modal with one page.evaluate() call.
+    Returns a dict of field lists keyed by field type.
+    """
+    try:
+        snapshot = page.evaluate(SNAPSHOT_FORM_JS, [root_selector, FIELD_KEY_ATTR])
+    except Exception as e:
+        print(f"   [Form] Snapshot error: {e}")
+        return empty_snapshot()
+    return snapshot or empty_snapshot()
+
+
+# Where a field's question comes from, in order, and the text used when all are empty
+QUESTION_SOURCES = {
+    "text": (("label", "placeholder", "aria_label"), "Unknown field"),
+    "select": (("label", "aria_label"), "Unknown dropdown"),
+    "textarea": (("label", "placeholder"), "Unknown textarea"),
+    "radio": (("label",), None),
+}
+
+
+def snapshot_question(field_type, field):
+    """
+    Canonical question text for a snapshot field (see questions.clean_question),
+    with the same fallbacks as the old locator path. A source that cleans to
+    nothing (a lone "*" or "Required" label) falls through to the next one.
+    """
+    sources, default = QUESTION_SOURCES[field_type]
+    for source in sources:
+        question = clean_question(field.get(source))
+        if question:
+            return question
+    return default
+
+
+def is_answered(field_type, field):
+    """True if the field already holds a value in the snapshot."""
+    if field_type == "radio":
+        return field["checked"]
+    if field_type == "select":
+        return bool(field["value"]) and field["value"] != "Select an option"
+    return bool(field["value"])
+
+
+def snapshot_questions(snapshot):
+    """Question texts of the unanswered fields in a snapshot."""
+    questions = []
+    for field_type in ("text", "select", "radio", "textarea"):
+        for field in snapshot[field_type]:
+            if is_answered(field_type, field):
+                continue
+            question = snapshot_question(field_type, field)
+            if question:
+                questions.append(question)
+    return questions
+
+
+def apply_plan_args(actions):
+    """Argument for APPLY_PLAN_JS: just the fields the page needs."""
+    payload = [
+        {"key": a["key"], "group_key": a.get("group_key"), "action": a["action"], "answer": a["answer"]}
+        for a in actions
+    ]
+    return [FIELD_KEY_ATTR, payload]
+
+
+def apply_plan(page, actions):
+    """
+    Write every planned action with one page.evaluate() call.
+    Returns a list of {"ok", "error"} aligned with actions, or None if the
+    call itself failed (callers then use the per-locator path).
+    """
+    if not actions:
+        return []
+    try:
+        return page.evaluate(APPLY_PLAN_JS, apply_plan_args(actions))
+    except Exception as e:
+        print(f"   [Form] Batch write error: {e}")
+        return None
+
+
+def field_locator(page, key):
+    """Locator for an element tagged by the last snapshot."""
+    return page.locator(f"[{FIELD_KEY_ATTR}='{key}']")
@@ -0,0 +1,115 @@
+"""
+Page memory watchdog for long runs.
+
+Every WATCHDOG_SAMPLE_EVERY_JOBS processed jobs the agent samples the
+search page's JS heap and DOM node count (CDP Performance.getMetrics).
+A sample past WATCHDOG_MAX_HEAP_MB or WATCHDOG_MAX_DOM_NODES sets
+recycle_reason. The agent then reopens the same search results page in
+a fresh tab and carries on with the next job it hasn't handled.
+
+The samples are kept for the run (memory over time). They go into the
+run stats record, and into the Chrome trace as counters when --trace is on.
+"""
+import time
+from browser import page_memory, page_memory_async
+from tracing import tracer
+from config import WATCHDOG_SAMPLE_EVERY_JOBS, WATCHDOG_MAX_HEAP_MB, WATCHDOG_MAX_DOM_NODES
+
+
+class PageWatchdog:
+    """Memory samples and recycle decisions for one run."""
+
+    def __init__(self, every_jobs=WATCHDOG_SAMPLE_EVERY_JOBS, max_heap_mb=WATCHDOG_MAX_HEAP_MB,
+                 max_dom_nodes=WATCHDOG_MAX_DOM_NODES):
+        self.every_jobs = every_jobs
+        self.max_heap_mb = max_heap_mb
+        self.max_dom_nodes = max_dom_nodes
+        self.samples = []
+        self.recycles = []
+        self.recycle_reason = None     # Set when the last sample crossed a limit
+        self.last_sampled_at = None    # Processed-job count of the last sample
+        self.page_generation = 1       # Bumped on every recycle
+        self._started = time.monotonic()
+
+    def due(self, processed):
+        """True for a baseline sample, then every every_jobs processed jobs."""
+        if not self.every_jobs:
+            return False
+        if self.last_sampled_at is None:
+            return True
+        return processed != self.last_sampled_at and processed % self.every_jobs == 0
+
+    def over_limit(self, memory):
+        if self.max_heap_mb and memory["js_heap_mb"] > self.max_heap_mb:
+            return f"JS heap {memory['js_heap_mb']} MB > {self.max_heap_mb} MB"
+        if self.max_dom_nodes and memory["dom_nodes"] > self.max_dom_nodes:
+            return f"{memory['dom_nodes']} DOM nodes > {self.max_dom_nodes}"
+        return None
+
+    def record(self, memory, processed):
+        """Store a sample and decide whether the page needs recycling."""
+        self.last_sampled_at = processed
+        self.samples.append({
+            "elapsed_s": round(time.monotonic() - self._started, 1),
+            "jobs": processed,
+            "page_generation": self.page_generation,
+            **memory,
+        })
+        tracer.counter("page_memory", js_heap_mb=memory["js_heap_mb"], dom_nodes=memory["dom_nodes"])
+        self.recycle_reason = self.over_limit(memory)
+        return self.recycle_reason
+
+    def sample(self, page, processed):
+        """Sample the page; returns the recycle reason, if any."""
+        try:
+            memory = page_memory(page)
+        except Exception as e:
+            print(f"   [Watchdog] Could not sample page memory: {e}")
+            self.last_sampled_at = processed
+            return None
+        return self.record(memory, processed)
+
+    async def sample_async(self, page, processed):
+        try:
+            memory = await page_memory_async(page)
+        except Exception as e:
+            print(f"   [Watchdog] Could not sample page memory: {e}")
+            self.last_sampled_at = processed
+            return None
+        return self.record(memory, processed)
+
+    def record_recycle(self, processed, search_page, ok=True):
+        self.recycles.append({
+            "elapsed_s": round(time.monotonic() - self._started, 1),
+            "jobs": processed,
+            "search_page": search_page,
+            "reason": self.recycle_reason,
+            "ok": ok,
+        })
+        if ok:
+            self.page_generation += 1
+        self.recycle_reason = None
+
+    # -- Reporting --------------------------------------------------------------
+
+    def to_dict(self):
+        return {
+            "sample_every_jobs": self.every_jobs,
+            "max_heap_mb": self.max_heap_mb,
+            "max_dom_nodes": self.max_dom_nodes,
+            "samples": self.samples,
+            "recycles": self.recycles,
+        }
+
+    def print_summary(self):
+        if not self.samples:
+            return
+        first, last = self.samples[0], self.samples[-1]
+        peak_heap = max(s["js_heap_mb"] for s in self.samples)
+        peak_nodes = max(s["dom_nodes"] for s in self.samples)
+        print(f"   Page memory:      JS heap {first['js_heap_mb']} -> {last['js_heap_mb']} MB "
+              f"(peak {peak_heap}), DOM nodes {first['dom_nodes']} -> {last['dom_nodes']} "
+              f"(peak {peak_nodes}) over {len(self.samples)} samples")
+        if self.recycles:
+            print(f"   Page recycles:    {sum(r['ok'] for r in self.recycles)} "
+                  f"(last: {self.recycles[-1]['reason']})")
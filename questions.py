@@ -0,0 +1,28 @@
+"""
+Canonical form of application questions.
+
+LinkedIn renders many labels twice ("X\nX") and appends "Required", so the
+same question arrives in several spellings. Every read and write path goes
+through these two functions so they all agree on one spelling:
+
+- clean_question: the text stored and shown (duplicates and markers removed)
+- question_key:   the exact-lookup key (clean text, lowercased)
+"""
+import re
+
+TRAILING_MARKERS = re.compile(r"\s*(\*|\(required\))\s*$", re.IGNORECASE)
+
+
+def clean_question(question):
+    """Drop repeated lines, 'Required' lines and '*' markers; collapse whitespace."""
+    lines = []
+    for line in (question or "").split("\n"):
+        line = " ".join(line.split())
+        if line and line not in lines and line.lower() != "required":
+            lines.append(line)
+    return TRAILING_MARKERS.sub("", " ".join(lines))
+
+
+def question_key(question):
+    """Lookup key: the clean question, lowercased, without trailing punctuation."""
+    return clean_question(question).lower().rstrip(" ?:.")
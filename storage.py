@@ -0,0 +1,675 @@
+"""
+Storage backends for ApplyPilot Agent state.
+
+Known fields, unknown fields and application history go through a store
+object so FormFiller and the agent don't care where they live:
+
+- JsonStore:   field_memory.json + application_log.jsonl (the default)
+- SqliteStore: one SQLite database with indexed tables, in WAL mode so the
+               agent and learn_fields.py can use it at the same time
+
+Import existing JSON state into SQLite with:
+    python storage.py import
+
+Merge duplicate spellings of questions and drop the unused field_log with:
+    python storage.py compact
+"""
+import argparse
+import atexit
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import fcntl
+    msvcrt = None
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import history
+from questions import clean_question, question_key
+from config import (
+    STORAGE_BACKEND, SQLITE_DB_PATH, FIELD_MEMORY_PATH, APPLICATION_LOG_PATH, METRICS_PATH,
+    MEMORY_FLUSH_INTERVAL_SECONDS
+)
+
+APPLICATION_COLUMNS = ("job_id", "company", "job_title", "status", "resume_type", "timestamp")
+
+
+def atomic_write_json(path, data):
+    """
+    Write JSON to a temp file in the same directory, fsync it, then
+    os.replace() it over the target so readers never see a half-written file.
+    """
+    atomic_write_text(path, json.dumps(data, indent=2))
+
+
+def atomic_write_text(path, text):
+    """Atomic replace of a file's contents (see atomic_write_json)."""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent or ".", prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive advisory lock on a sidecar file, held for the with-block."""
+    with open(path, "a+") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        elif msvcrt:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            elif msvcrt:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def index_memory(memory):
+    """Canonical-key maps over a memory dict: known key -> question, unknown keys."""
+    known_keys = {question_key(q): q for q in memory["known_fields"]}
+    unknown_keys = {question_key(f["question"]) for f in memory["unknown_fields"]}
+    return known_keys, unknown_keys
+
+
+def apply_memory_op(memory, known_keys, unknown_keys, op):
+    """
+    Apply one field-memory change to a memory dict and its key maps.
+    Returns True if anything changed. Used for local changes and to replay
+    them onto the file's current contents.
+    """
+    kind = op[0]
+    if kind == "set_known":
+        _, question, answer = op
+        key = question_key(question)
+        previous = known_keys.get(key)
+        if previous == question and memory["known_fields"][question] == answer and key not in unknown_keys:
+            return False
+        if previous is not None and previous != question:
+            del memory["known_fields"][previous]
+        memory["known_fields"][question] = answer
+        known_keys[key] = question
+        apply_memory_op(memory, known_keys, unknown_keys, ("remove_unknown", question))
+        return True
+
+    if kind == "add_unknown":
+        entry = op[1]
+        key = question_key(entry["question"])
+        if key in unknown_keys or key in known_keys:
+            return False
+        memory["unknown_fields"].append(entry)
+        unknown_keys.add(key)
+        return True
+
+    if kind == "remove_unknown":
+        key = question_key(op[1])
+        if key not in unknown_keys:
+            return False
+        memory["unknown_fields"] = [f for f in memory["unknown_fields"] if question_key(f["question"]) != key]
+        unknown_keys.discard(key)
+        return True
+
+    raise ValueError(f"Unknown memory operation: {kind}")
+
+
+class JsonStore:
+    """
+    Field memory in a JSON file plus the JSONL application log.
+
+    Memory changes mark the store dirty and are written behind: at most
+    once per flush interval, on flush() (end of each job) and at exit.
+
+    Several processes (the agent and learn_fields.py) may share the file.
+    Local changes are kept as a list of operations. flush() takes a file
+    lock, replays them onto whatever is on disk and writes the result
+    (merge-on-write), and refresh() picks up other processes' writes by
+    checking the file's mtime/inode/size. flush() may run on a worker thread.
+    """
+
+    def __init__(self, memory_path=FIELD_MEMORY_PATH, log_path=APPLICATION_LOG_PATH,
+                 flush_interval=MEMORY_FLUSH_INTERVAL_SECONDS, metrics_path=METRICS_PATH):
+        self.memory_path = Path(memory_path)
+        self.lock_path = self.memory_path.with_name(self.memory_path.name + ".lock")
+        self.log_path = Path(log_path)
+        self.metrics_path = Path(metrics_path)
+        self.flush_interval = flush_interval
+
+        self._lock = threading.RLock()
+        self._pending = []
+        self._stamp = self._file_stamp()
+        self._merged_unseen = False   # flush() merged other writes that refresh() hasn't returned yet
+        self.memory = self._read_disk()
+        self._known_keys, self._unknown_keys = index_memory(self.memory)
+
+        self._dirty = False
+        self._last_flush = time.monotonic()
+        atexit.register(self.flush)
+
+    # -- Persistence ---------------------------------------------------------
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.memory_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_ino, stat.st_size)
+
+    def _read_disk(self):
+        memory = {"known_fields": {}, "unknown_fields": []}
+        if self.memory_path.exists():
+            with open(self.memory_path, "r") as f:
+                memory.update(json.load(f))
+        return memory
+
+    def _sync_from_disk(self):
+        """Reload the file and replay local changes that aren't on disk yet."""
+        stamp = self._file_stamp()
+        memory = self._read_disk()
+        known_keys, unknown_keys = index_memory(memory)
+        for op in self._pending:
+            apply_memory_op(memory, known_keys, unknown_keys, op)
+        self.memory = memory
+        self._known_keys, self._unknown_keys = known_keys, unknown_keys
+        self._stamp = stamp
+
+    def _change(self, op):
+        """Apply one change locally and queue it for the next merge-on-write."""
+        with self._lock:
+            changed = apply_memory_op(self.memory, self._known_keys, self._unknown_keys, op)
+            if changed:
+                self._pending.append(op)
+        if changed:
+            self._mark_dirty()
+        return changed
+
+    def _mark_dirty(self):
+        self._dirty = True
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def refresh(self):
+        """
+        Pick up another process's writes. A stat() when nothing changed.
+        Returns the merged known fields if the file changed (or flush()
+        merged changes since the last refresh), else None.
+        """
+        if self._file_stamp() == self._stamp and not self._merged_unseen:
+            return None
+        with self._lock:
+            if self._file_stamp() != self._stamp:
+                self._sync_from_disk()
+            self._merged_unseen = False
+            return dict(self.memory["known_fields"])
+
+    def flush(self):
+        """Merge pending memory changes into the file and write it atomically."""
+        with self._lock:
+            if not self._dirty:
+                return
+            with file_lock(self.lock_path):
+                if self._file_stamp() != self._stamp:
+                    self._sync_from_disk()
+                    self._merged_unseen = True
+                atomic_write_text(self.memory_path, json.dumps(self.memory, indent=2))
+                self._stamp = self._file_stamp()
+            self._pending = []
+            self._dirty = False
+            self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+
+    # -- Field memory --------------------------------------------------------
+
+    def known_fields(self):
+        return dict(self.memory["known_fields"])
+
+    def set_known_field(self, question, answer):
+        """Store an answer and drop the question from the unknown list."""
+        self._change(("set_known", question, answer))
+
+    def unknown_fields(self):
+        return list(self.memory["unknown_fields"])
+
+    def add_unknown_field(self, entry):
+        """Add an unknown field. Returns False if it was already logged or answered."""
+        return self._change(("add_unknown", entry))
+
+    def remove_unknown_field(self, question):
+        self._change(("remove_unknown", question))
+
+    def compact(self):
+        """
+        Rewrite field memory with canonical questions: merge duplicate
+        spellings (the later answer wins), drop unknowns that are already
+        answered or repeated, and drop the unused field_log.
+        """
+        with self._lock, file_lock(self.lock_path):
+            self._sync_from_disk()
+            known, conflicts = merge_known_fields(self.memory["known_fields"].items())
+            unknown = merge_unknown_fields(self.memory["unknown_fields"], known)
+            report = {
+                "known_before": len(self.memory["known_fields"]),
+                "known_after": len(known),
+                "unknown_before": len(self.memory["unknown_fields"]),
+                "unknown_after": len(unknown),
+                "field_log_dropped": len(self.memory.get("field_log") or []),
+                "conflicts": conflicts,
+            }
+            self.memory = {"known_fields": known, "unknown_fields": unknown}
+            self._known_keys, self._unknown_keys = index_memory(self.memory)
+            atomic_write_text(self.memory_path, json.dumps(self.memory, indent=2))
+            self._stamp = self._file_stamp()
+            self._pending = []
+            self._dirty = False
+        return report
+
+    # -- Resolution metrics --------------------------------------------------
+
+    def load_metrics(self):
+        if not self.metrics_path.exists():
+            return {}
+        with open(self.metrics_path, "r") as f:
+            return json.load(f)
+
+    def update_metrics(self, update):
+        """Replace the cumulative metrics with update(current), under a file lock. Returns the result."""
+        lock_path = self.metrics_path.with_name(self.metrics_path.name + ".lock")
+        with file_lock(lock_path):
+            data = update(self.load_metrics())
+            atomic_write_json(self.metrics_path, data)
+        return data
+
+    # -- Application history -------------------------------------------------
+
+    def log_application(self, record):
+        history.append_record(record, self.log_path)
+
+    def iter_applications(self, company=None, job_id=None):
+        """Stream application records, optionally filtered (full scan)."""
+        for record in history.iter_applications(self.log_path):
+            if company is not None and record.get("company") != company:
+                continue
+            if job_id is not None and record.get("job_id") != job_id:
+                continue
+            yield record
+
+
+class SqliteStore:
+    """
+    All agent state in one SQLite database.
+
+    Tables are indexed by normalized question, job id and company. WAL mode
+    lets the agent and the field trainer read and write concurrently;
+    every change is committed immediately (row-level upserts, so writers
+    never clobber each other), so flush() has nothing to do.
+    The connection may be shared with worker threads; a lock serializes it.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS known_fields (
+            question_key TEXT PRIMARY KEY,
+            question     TEXT NOT NULL,
+            answer       TEXT NOT NULL,
+            updated_at   TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS unknown_fields (
+            question_key TEXT PRIMARY KEY,
+            question     TEXT NOT NULL,
+            field_type   TEXT,
+            options      TEXT,
+            job_title    TEXT,
+            company      TEXT,
+            job_id       TEXT,
+            created_at   TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS applications (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id      TEXT,
+            company     TEXT,
+            job_title   TEXT,
+            status      TEXT,
+            resume_type TEXT,
+            timestamp   TEXT NOT NULL,
+            extra       TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_applications_job_id ON applications(job_id);
+        CREATE INDEX IF NOT EXISTS idx_applications_company ON applications(company, timestamp);
+        CREATE TABLE IF NOT EXISTS metrics (
+            name       TEXT PRIMARY KEY,
+            data       TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, db_path=SQLITE_DB_PATH):
+        self.db_path = Path(db_path)
+        self.conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self._data_version = self._read_data_version()
+
+    def _read_data_version(self):
+        with self._lock:
+            return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def refresh(self):
+        """
+        Pick up commits from other connections (PRAGMA data_version).
+        Returns the known fields if the database changed, else None.
+        """
+        version = self._read_data_version()
+        if version == self._data_version:
+            return None
+        self._data_version = version
+        return self.known_fields()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # -- Field memory --------------------------------------------------------
+
+    def known_fields(self):
+        with self._lock:
+            rows = self.conn.execute("SELECT question, answer FROM known_fields ORDER BY rowid").fetchall()
+        return {row["question"]: row["answer"] for row in rows}
+
+    def set_known_field(self, question, answer):
+        key = question_key(question)
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO known_fields (question_key, question, answer, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(question_key) DO UPDATE SET "
+                "question = excluded.question, answer = excluded.answer, updated_at = excluded.updated_at",
+                (key, question, answer, datetime.now().isoformat()),
+            )
+            self.conn.execute("DELETE FROM unknown_fields WHERE question_key = ?", (key,))
+
+    def unknown_fields(self):
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM unknown_fields ORDER BY created_at, rowid").fetchall()
+        return [{
+            "question": row["question"],
+            "field_type": row["field_type"],
+            "job_title": row["job_title"],
+            "company": row["company"],
+            "job_id": row["job_id"],
+            "options": json.loads(row["options"] or "[]"),
+            "answer": None,
+        } for row in rows]
+
+    def add_unknown_field(self, entry):
+        """Add an unknown field. Returns False if it was already logged or answered."""
+        key = question_key(entry["question"])
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO unknown_fields "
+                "(question_key, question, field_type, options, job_title, company, job_id, created_at) "
+                "SELECT ?, ?, ?, ?, ?, ?, ?, ? "
+                "WHERE NOT EXISTS (SELECT 1 FROM known_fields WHERE question_key = ?)",
+                (
+                    key, entry["question"], entry.get("field_type"),
+                    json.dumps(entry.get("options") or []), entry.get("job_title"), entry.get("company"),
+                    entry.get("job_id"), datetime.now().isoformat(), key,
+                ),
+            )
+        return cursor.rowcount > 0
+
+    def remove_unknown_field(self, question):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "DELETE FROM unknown_fields WHERE question_key = ?", (question_key(question),)
+            )
+
+    def compact(self):
+        """Re-key both field tables with canonical questions (see JsonStore.compact)."""
+        with self._lock, self.conn:
+            known_rows = self.conn.execute(
+                "SELECT question, answer, updated_at FROM known_fields ORDER BY updated_at, rowid"
+            ).fetchall()
+            unknown_rows = self.conn.execute("SELECT * FROM unknown_fields ORDER BY created_at, rowid").fetchall()
+
+            known, conflicts = merge_known_fields((row["question"], row["answer"]) for row in known_rows)
+            updated_at = {question_key(row["question"]): row["updated_at"] for row in known_rows}
+            unknown = merge_unknown_fields([dict(row) for row in unknown_rows], known)
+
+            self.conn.execute("DELETE FROM known_fields")
+            self.conn.execute("DELETE FROM unknown_fields")
+            self.conn.executemany(
+                "INSERT INTO known_fields (question_key, question, answer, updated_at) VALUES (?, ?, ?, ?)",
+                [(question_key(q), q, a, updated_at[question_key(q)]) for q, a in known.items()],
+            )
+            self.conn.executemany(
+                "INSERT INTO unknown_fields "
+                "(question_key, question, field_type, options, job_title, company, job_id, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (question_key(e["question"]), e["question"], e["field_type"], e["options"],
+                     e["job_title"], e["company"], e["job_id"], e["created_at"])
+                    for e in unknown
+                ],
+            )
+        return {
+            "known_before": len(known_rows),
+            "known_after": len(known),
+            "unknown_before": len(unknown_rows),
+            "unknown_after": len(unknown),
+            "field_log_dropped": 0,
+            "conflicts": conflicts,
+        }
+
+    # -- Resolution metrics --------------------------------------------------
+
+    def load_metrics(self, name="resolution"):
+        with self._lock:
+            row = self.conn.execute("SELECT data FROM metrics WHERE name = ?", (name,)).fetchone()
+        return json.loads(row["data"]) if row else {}
+
+    def update_metrics(self, update, name="resolution"):
+        """Replace the cumulative metrics with update(current) in one write transaction."""
+        with self._lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            row = self.conn.execute("SELECT data FROM metrics WHERE name = ?", (name,)).fetchone()
+            data = update(json.loads(row["data"]) if row else {})
+            self.conn.execute(
+                "INSERT INTO metrics (name, data, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                (name, json.dumps(data), datetime.now().isoformat()),
+            )
+        return data
+
+    # -- Application history -------------------------------------------------
+
+    def log_application(self, record):
+        extra = {k: v for k, v in record.items() if k not in APPLICATION_COLUMNS}
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO applications (job_id, company, job_title, status, resume_type, timestamp, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record.get("job_id"), record.get("company"), record.get("job_title"),
+                    record.get("status"), record.get("resume_type"),
+                    record.get("timestamp") or datetime.now().isoformat(),
+                    json.dumps(extra) if extra else None,
+                ),
+            )
+
+    def iter_applications(self, company=None, job_id=None):
+        """Stream application records, optionally filtered via the indexes."""
+        query = "SELECT * FROM applications"
+        clauses, params = [], []
+        if company is not None:
+            clauses.append("company = ?")
+            params.append(company)
+        if job_id is not None:
+            clauses.append("job_id = ?")
+            params.append(job_id)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY id"
+
+        with self._lock:
+            cursor = self.conn.execute(query, params)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(500)
+            if not rows:
+                break
+            for row in rows:
+                record = {col: row[col] for col in APPLICATION_COLUMNS if row[col] is not None}
+                if row["extra"]:
+                    record.update(json.loads(row["extra"]))
+                yield record
+
+
+def merge_known_fields(items):
+    """
+    Canonicalize (question, answer) pairs, oldest first. Returns the merged
+    dict and a list of (question, dropped_answer, kept_answer) conflicts.
+    """
+    known = {}
+    keys = {}
+    conflicts = []
+    for question, answer in items:
+        question = clean_question(question)
+        key = question_key(question)
+        previous = keys.get(key)
+        if previous is not None:
+            if known[previous] != answer:
+                conflicts.append((question, known[previous], answer))
+            del known[previous]
+        known[question] = answer
+        keys[key] = question
+    return known, conflicts
+
+
+def merge_unknown_fields(entries, known):
+    """Canonicalize unknown entries, dropping repeats and answered questions."""
+    seen = {question_key(q) for q in known}
+    unknown = []
+    for entry in entries:
+        key = question_key(entry["question"])
+        if key in seen:
+            continue
+        seen.add(key)
+        unknown.append(dict(entry, question=clean_question(entry["question"])))
+    return unknown
+
+
+def open_store(backend=STORAGE_BACKEND, flush_interval=MEMORY_FLUSH_INTERVAL_SECONDS):
+    """Create the store selected by STORAGE_BACKEND ('json' or 'sqlite')."""
+    if backend == "sqlite":
+        return SqliteStore()
+    if backend != "json":
+        print(f"[Warning] Unknown storage backend '{backend}'; using 'json'.")
+    return JsonStore(flush_interval=flush_interval)
+
+
+def scratch_store(directory, backend=STORAGE_BACKEND, flush_interval=MEMORY_FLUSH_INTERVAL_SECONDS):
+    """
+    A JsonStore in directory seeded with the configured store's known fields,
+    for HAR replays and benchmarks that must not touch real memory or history.
+    """
+    source = open_store(backend)
+    known = source.known_fields()
+    source.close()
+
+    directory = Path(directory)
+    atomic_write_json(directory / "field_memory.json", {"known_fields": known, "unknown_fields": []})
+    return JsonStore(directory / "field_memory.json", directory / "application_log.jsonl",
+                     flush_interval, metrics_path=directory / "resolution_metrics.json")
+
+
+def import_json_to_sqlite(memory_path=FIELD_MEMORY_PATH, log_path=APPLICATION_LOG_PATH, db_path=SQLITE_DB_PATH):
+    """Copy field memory and application history from the JSON files into SQLite."""
+    source = JsonStore(memory_path, log_path)
+    target = SqliteStore(db_path)
+
+    known = source.known_fields()
+    for question, answer in known.items():
+        target.set_known_field(question, answer)
+
+    unknown = 0
+    for entry in source.unknown_fields():
+        unknown += target.add_unknown_field(entry)
+
+    applications = 0
+    if target.conn.execute("SELECT 1 FROM applications LIMIT 1").fetchone():
+        print("[Storage] Database already has application history; skipping log import.")
+    else:
+        for record in source.iter_applications():
+            target.log_application(record)
+            applications += 1
+
+    target.close()
+    print(f"[Storage] Imported {len(known)} known fields, {unknown} unknown fields "
+          f"and {applications} applications into {db_path}")
+
+
+def compact_memory(backend=STORAGE_BACKEND):
+    """Merge duplicate question spellings in the configured store and report what changed."""
+    store = open_store(backend)
+    report = store.compact()
+    store.close()
+
+    for question, dropped, kept in report["conflicts"]:
+        print(f"[Storage] Conflict for '{question[:60]}': kept '{kept}', dropped '{dropped}'")
+    print(f"[Storage] Known fields: {report['known_before']} -> {report['known_after']}")
+    print(f"[Storage] Unknown fields: {report['unknown_before']} -> {report['unknown_after']}")
+    if report["field_log_dropped"]:
+        print(f"[Storage] Dropped {report['field_log_dropped']} field_log entries")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ApplyPilot storage tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    compact_parser = subparsers.add_parser("compact", help="Merge duplicate questions in field memory")
+    compact_parser.add_argument("--backend", default=STORAGE_BACKEND, choices=["json", "sqlite"],
+                                help="Store to compact")
+
+    import_parser = subparsers.add_parser("import", help="Import JSON state into SQLite")
+    import_parser.add_argument("--memory", default=FIELD_MEMORY_PATH, help="field_memory.json path")
+    import_parser.add_argument("--log", default=APPLICATION_LOG_PATH, help="application_log.jsonl path")
+    import_parser.add_argument("--db", default=SQLITE_DB_PATH, help="SQLite database path")
+
+    args = parser.parse_args()
+    if args.command == "import":
+        import_json_to_sqlite(args.memory, args.log, args.db)
+    elif args.command == "compact":
+        compact_memory(args.backend)
+
+
+if __name__ == "__main__":
+    main()
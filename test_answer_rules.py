@@ -0,0 +1,25 @@
+"""Resume-based answer rules (python -m pytest)."""
+from answer_rules import AnswerRules
+from config import ANSWER_RULES
+
+RESUME = {
+    "personal": {"location": {"city": "Boston", "state": "Massachusetts", "zip": "02115"}},
+    "work_authorization": {"authorized_us": True, "sponsorship_required": False},
+}
+
+
+def test_authorization_beats_state():
+    rules = AnswerRules(RESUME, ANSWER_RULES)
+    assert rules.match("Are you legally authorized to work in the United States?") == ("Yes", "authorized")
+
+
+def test_sponsorship_beats_state():
+    rules = AnswerRules(RESUME, ANSWER_RULES)
+    question = "Will you now or in the future require visa sponsorship to work in the United States?"
+    assert rules.match(question) == ("No", "sponsorship")
+
+
+def test_state_keyword_has_no_plural():
+    rules = AnswerRules(RESUME, ANSWER_RULES)
+    assert rules.match("State") == ("Massachusetts", "state")
+    assert rules.match("Which United States office do you prefer?") == (None, None)
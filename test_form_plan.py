@@ -0,0 +1,51 @@
+"""Answer planning for form steps (python -m pytest)."""
+from form_filler import FormFiller
+from form_plan import build_answer_plan, pick_option, resolve_step
+from storage import JsonStore
+
+
+def make_form_filler(tmp_path, known):
+    store = JsonStore(memory_path=tmp_path / "field_memory.json", log_path=tmp_path / "application_log.jsonl",
+                      flush_interval=float("inf"), metrics_path=tmp_path / "resolution_metrics.json")
+    form_filler = FormFiller(store=store)
+    for question, answer in known.items():
+        form_filler.learn_field(question, answer)
+    return form_filler
+
+
+def radio_step(question, labels):
+    return {"text": [], "select": [], "textarea": [], "radio": [{
+        "key": "0", "label": question, "checked": False, "required": True, "text": question.lower(),
+        "options": [{"key": str(i + 1), "label": label} for i, label in enumerate(labels)],
+    }]}
+
+
+def test_no_does_not_pick_none_of_the_above(tmp_path):
+    form_filler = make_form_filler(tmp_path, {"Do you have a security clearance?": "No"})
+    step = radio_step("Do you have a security clearance?", ["None of the above", "Yes", "No"])
+    [resolution] = resolve_step(step, form_filler)
+    assert (resolution["action"], resolution["option"]) == ("click", 2)
+
+
+def test_radio_without_a_matching_option_is_unknown(tmp_path):
+    form_filler = make_form_filler(tmp_path, {"Do you have a security clearance?": "No"})
+    step = radio_step("Do you have a security clearance?", ["None of the above", "Unknown"])
+    [resolution] = resolve_step(step, form_filler)
+    assert resolution["action"] is None
+
+
+def test_pick_option_whole_words_only():
+    assert pick_option(["Yes, I am authorized", "No, I am not"], "Yes") == 0
+    assert pick_option(["None", "Unknown", "Yes"], "No") is None
+    assert pick_option(["No", "No preference"], "no") == 0
+    assert pick_option(["No, thanks", "No preference"], "No") is None
+
+
+def test_cached_plans_still_count_answer_sources(tmp_path):
+    form_filler = make_form_filler(tmp_path, {"Do you have a security clearance?": "No"})
+    step = radio_step("Do you have a security clearance?", ["Yes", "No"])
+    build_answer_plan(step, form_filler)
+    build_answer_plan(step, form_filler)
+    assert form_filler.plan_cache.stats()["hits"] == 1
+    assert form_filler.metrics.by_source() == {"memory": 2}
+    assert form_filler.metrics.cached == 1
@@ -0,0 +1,40 @@
+"""Application history log (python -m pytest)."""
+import json
+
+import history
+
+
+def write_legacy(tmp_path, records):
+    (tmp_path / "application_log.json").write_text(json.dumps(records))
+
+
+def job_ids(path):
+    return [record["job_id"] for record in history.iter_applications(path)]
+
+
+def test_migration_keeps_legacy_records_first(tmp_path):
+    path = tmp_path / "application_log.jsonl"
+    path.write_text(json.dumps({"job_id": "3"}) + "\n")
+    write_legacy(tmp_path, [{"job_id": "1"}, {"job_id": "2"}])
+
+    assert history.migrate_legacy_log(path) == 2
+    assert job_ids(path) == ["1", "2", "3"]
+    assert (tmp_path / "application_log.json.migrated").exists()
+    assert history.migrate_legacy_log(path) == 0
+
+
+def test_crash_after_commit_point_does_not_duplicate(tmp_path, monkeypatch):
+    path = tmp_path / "application_log.jsonl"
+    write_legacy(tmp_path, [{"job_id": "1"}])
+
+    def crash(*args):
+        raise OSError("simulated crash")
+    monkeypatch.setattr(history.os, "replace", crash)
+    try:
+        history.migrate_legacy_log(path)
+    except OSError:
+        pass
+    monkeypatch.undo()
+
+    history.append_record({"job_id": "2"}, path, fsync=False)
+    assert job_ids(path) == ["1", "2"]
@@ -0,0 +1,58 @@
+"""Agent loop decisions shared by the sync and async agents (python -m pytest)."""
+from job_flow import ModalRun, finish_job, new_stats, triage_card
+from page_probes import ModalState, empty_snapshot
+
+
+class FakeIndex:
+    def __init__(self, skip=()):
+        self.skip = set(skip)
+
+    def should_skip(self, job_id):
+        return job_id in self.skip
+
+
+class FakeFilter:
+    def rejection_reason(self, card):
+        return "title" if "senior" in card["title"].lower() else None
+
+
+def card(job_id, title="Engineer", applied=False):
+    return {"job_id": job_id, "title": title, "company": "Acme", "applied": applied, "index": 0}
+
+
+def test_triage_card_counts_each_skip_and_records_applied_cards():
+    stats, seen, recorded = new_stats(), set(), []
+    record = lambda *args: recorded.append(args)
+    opened = [
+        triage_card(c, stats, FakeIndex(skip={"2"}), FakeFilter(), seen, record)
+        for c in (card("1"), card("1"), card("2"), card("3", applied=True), card("4", "Senior Engineer"))
+    ]
+    assert opened == [True, False, False, False, False]
+    assert (stats["seen_before"], stats["already_applied"], stats["filtered"]) == (1, 1, 1)
+    assert recorded == [("Engineer", "Acme", "already_applied", None, "3")]
+
+
+def test_finish_job_counts_skip_reasons_and_does_not_record_missing_buttons():
+    stats, recorded = new_stats(), []
+    record = lambda *args: recorded.append(args)
+    finish_job(stats, record, "Engineer", "Acme", "skipped", "swe", "1", "stuck_step")
+    finish_job(stats, record, "Engineer", "Acme", "no_button", "swe", "2")
+    assert stats["skipped"] == 1 and stats["skip_reasons"]["stuck_step"] == 1
+    assert stats["no_button"] == 1
+    assert [args[2] for args in recorded] == ["skipped"]
+
+
+def test_modal_run_stops_on_a_repeated_step():
+    run = ModalRun()
+    state = ModalState(open=True, button="next", progress=50, heading="Contact info")
+    assert not run.is_stuck(0, empty_snapshot(), state)
+    assert run.next_move(0, state) == "next"
+    assert run.is_stuck(1, empty_snapshot(), state)
+    assert run.reason == "stuck_step"
+
+
+def test_modal_run_stops_on_validation_errors():
+    run = ModalRun()
+    state = ModalState(open=True, button="next", errors=[{"field": "Phone", "message": "Enter a valid number"}])
+    assert run.next_move(0, state) is None
+    assert run.reason == "validation_error"
@@ -0,0 +1,31 @@
+"""Field memory shared between the agent and learn_fields.py (python -m pytest)."""
+from form_filler import FormFiller
+from storage import JsonStore, SqliteStore
+
+
+def make_store(tmp_path):
+    return JsonStore(memory_path=tmp_path / "field_memory.json", log_path=tmp_path / "application_log.jsonl",
+                     flush_interval=float("inf"), metrics_path=tmp_path / "resolution_metrics.json")
+
+
+def test_trainer_answers_survive_flush_before_sync(tmp_path):
+    agent = FormFiller(store=make_store(tmp_path))
+    trainer = FormFiller(store=make_store(tmp_path))
+
+    agent.log_unknown_field("What is your favourite colour?", "text")
+    trainer.learn_field("How many years of Rust experience do you have?", "3")
+    trainer.flush()
+
+    # End-of-job flush merges the trainer's write before the next job syncs
+    agent.flush()
+    assert agent.sync_memory() == 1
+    assert agent.get_answer("How many years of Rust experience do you have?") == ("3", "memory")
+    assert agent.sync_memory() == 0
+
+
+def test_sqlite_skips_unknowns_that_are_already_answered(tmp_path):
+    store = SqliteStore(tmp_path / "applypilot.db")
+    store.set_known_field("Do you have a driver's license?", "Yes")
+    assert not store.add_unknown_field({"question": "Do you have a driver's license", "field_type": "radio"})
+    assert store.add_unknown_field({"question": "Are you over 18?", "field_type": "radio"})
+    assert [entry["question"] for entry in store.unknown_fields()] == ["Are you over 18?"]
@@ -0,0 +1,197 @@
+"""
+Lightweight span tracing for ApplyPilot Agent.
+
+Wrap a phase in `with tracer.span("name"):` to record its wall-clock
+duration and how many Playwright calls it made. Calls are counted at the
+protocol level (one per message sent to the Playwright driver), so a
+locator.count() and a page.evaluate() each count as one.
+
+At the end of a run the spans can be exported as Chrome trace-event JSON
+(open in chrome://tracing or https://ui.perfetto.dev) and printed as a
+p50/p95 table per phase. Tracing is off unless enabled (agent.py --trace).
+
+Calls are counted per thread: Playwright runs on the agent's thread, so a
+span on the async agent's writer thread doesn't pick up browser calls made
+meanwhile.
+"""
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from datetime import datetime
+from config import TRACE_DIR
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Tracer:
+    """Collects spans for one run. Safe to use from the writer thread too."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.spans = []
+        self.counters = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def calls(self):
+        """Playwright calls made so far on the current thread."""
+        return getattr(self._local, "calls", 0)
+
+    def count_call(self):
+        self._local.calls = self.calls + 1
+
+    @contextmanager
+    def span(self, name, **args):
+        """Record the duration and Playwright call count of the with-block."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        calls = self.calls
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            span = {
+                "name": name,
+                "start": start - self._origin,
+                "duration": end - start,
+                "calls": self.calls - calls,
+                "thread": threading.get_ident(),
+                "args": args,
+            }
+            with self._lock:
+                self.spans.append(span)
+
+    def counter(self, name, **values):
+        """Record a sample of values over time (drawn as a counter track in the trace)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters.append({"name": name, "time": time.perf_counter() - self._origin, "values": values})
+
+    def wrap(self, name, func):
+        """func wrapped in a span, for work handed to another thread."""
+        def traced(*args, **kwargs):
+            with self.span(name):
+                return func(*args, **kwargs)
+        return traced
+
+    # -- Export ---------------------------------------------------------------
+
+    def chrome_trace(self):
+        """Spans and counters as Chrome trace-event JSON ('X' and 'C' events, microseconds)."""
+        threads = {}
+        events = []
+        for span in self.spans:
+            tid = threads.setdefault(span["thread"], len(threads) + 1)
+            events.append({
+                "name": span["name"],
+                "cat": "applypilot",
+                "ph": "X",
+                "ts": round(span["start"] * 1e6),
+                "dur": round(span["duration"] * 1e6),
+                "pid": 1,
+                "tid": tid,
+                "args": dict(span["args"], playwright_calls=span["calls"]),
+            })
+        for counter in self.counters:
+            events.append({
+                "name": counter["name"],
+                "ph": "C",
+                "ts": round(counter["time"] * 1e6),
+                "pid": 1,
+                "args": counter["values"],
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+    def summary(self):
+        """Per-phase count, total, p50 and p95 seconds and mean Playwright calls."""
+        by_name = defaultdict(list)
+        for span in self.spans:
+            by_name[span["name"]].append(span)
+
+        rows = []
+        for name, spans in by_name.items():
+            durations = sorted(s["duration"] for s in spans)
+            rows.append({
+                "phase": name,
+                "count": len(spans),
+                "total": sum(durations),
+                "p50": percentile(durations, 50),
+                "p95": percentile(durations, 95),
+                "calls": sum(s["calls"] for s in spans) / len(spans),
+            })
+        rows.sort(key=lambda row: row["total"], reverse=True)
+        return rows
+
+    def print_summary(self):
+        rows = self.summary()
+        if not rows:
+            return
+        print(f"\n[Trace] {'Phase':<22} {'Count':>6} {'Total s':>9} {'p50 ms':>9} {'p95 ms':>9} {'Calls':>7}")
+        for row in rows:
+            print(f"[Trace] {row['phase']:<22} {row['count']:>6} {row['total']:>9.2f} "
+                  f"{row['p50'] * 1000:>9.1f} {row['p95'] * 1000:>9.1f} {row['calls']:>7.1f}")
+
+
+tracer = Tracer()
+
+
+def install_playwright_call_counter(target=tracer):
+    """
+    Count every message the Playwright client sends to its driver.
+    Hooks a private Playwright method; returns False (and counts nothing)
+    if this Playwright version doesn't have it.
+    """
+    try:
+        from playwright._impl._connection import Connection
+    except ImportError:
+        return False
+    send = getattr(Connection, "_send_message_to_server", None)
+    if send is None:
+        return False
+    if getattr(send, "_applypilot_counted", False):
+        return True
+
+    def counted_send(self, *args, **kwargs):
+        target.count_call()
+        return send(self, *args, **kwargs)
+
+    counted_send._applypilot_counted = True
+    Connection._send_message_to_server = counted_send
+    return True
+
+
+def start_tracing():
+    tracer.enabled = True
+    if not install_playwright_call_counter():
+        print("[Trace] Playwright call counting unavailable in this version; timing only.")
+
+
+def finish_tracing(directory=TRACE_DIR):
+    """Print the per-phase summary and write the Chrome trace. No-op if tracing is off."""
+    if not tracer.enabled or not tracer.spans:
+        return None
+    tracer.print_summary()
+    path = tracer.export_chrome_trace(Path(directory) / f"trace-{datetime.now():%Y%m%d-%H%M%S}.json")
+    print(f"[Trace] Chrome trace written to {path} (open in chrome://tracing or ui.perfetto.dev)")
+    return path
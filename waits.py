@@ -0,0 +1,134 @@
+"""
+Condition waits for LinkedIn UI transitions.
+
+Instead of sleeping a fixed random time after a click, the agent waits for
+the DOM to show the state it needs next (the detail pane for the clicked
+job, a new Easy Apply step, a re-rendered card list). Each wait gives up
+after a timeout and the agent carries on, as it did after a fixed sleep.
+
+Human-like pacing between applications is a separate policy: pacing_delay()
+(MIN_DELAY_SECONDS..MAX_DELAY_SECONDS) is slept once per opened job.
+HAR replays turn it off with set_pacing(0, 0).
+
+A condition is a (label, js, arg) tuple for page.wait_for_function, so the
+sync agent and agent_async share the same conditions.
+"""
+import random
+from page_probes import MODAL_ROOT_SELECTOR, JOB_CARD_SELECTOR, ERROR_SELECTOR, MODAL_SIGNATURE_JS
+from config import MIN_DELAY_SECONDS, MAX_DELAY_SECONDS, WAIT_TIMEOUT_MS
+from playwright.sync_api import TimeoutError
+
+DISCARD_CONFIRM_SELECTOR = "button[data-control-name='discard_application_confirm_btn']"
+
+MODAL_STEP_CHANGED_JS = """
+([rootSelector, previous, errorSelector]) => {
+    const signature = (__SIGNATURE__)(rootSelector);
+    if (signature && signature !== previous) return true;
+    // A validation error means the step won't change; stop waiting
+    const error = document.querySelector(errorSelector);
+    return !!(error && error.getBoundingClientRect().height > 0);
+}
+""".replace("__SIGNATURE__", MODAL_SIGNATURE_JS.strip())
+
+# Detail pane shows the clicked job: heading matches the card title (or the
+# URL carries the job id) and the apply area has rendered.
+DETAIL_PANE_READY_JS = """
+([jobId, title]) => {
+    const norm = s => (s || '').toLowerCase().replace(/\\s+/g, ' ').trim();
+    const heading = document.querySelector('h1.t-24, h2.t-24');
+    const text = norm(heading && heading.innerText);
+    if (!text) return false;
+    if (!document.querySelector(
+        'button.jobs-apply-button, .jobs-s-apply__application-link, .artdeco-inline-feedback__message'
+    )) return false;
+    if (title) return text.includes(norm(title)) || norm(title).includes(text);
+    if (jobId) return location.href.includes(jobId);
+    return true;
+}
+"""
+
+# First card's job id (or text) identifies which result page is rendered
+CARD_LIST_SIGNATURE_JS = """
+cardSelector => {
+    const card = document.querySelector(cardSelector);
+    if (!card) return '';
+    const holder = card.closest('[data-occludable-job-id]');
+    return card.getAttribute('data-job-id')
+        || (holder && holder.getAttribute('data-occludable-job-id'))
+        || (card.innerText || '').trim().slice(0, 120);
+}
+"""
+
+CARD_LIST_CHANGED_JS = """
+([cardSelector, previous]) => {
+    const signature = (__SIGNATURE__)(cardSelector);
+    return !!signature && signature !== previous;
+}
+""".replace("__SIGNATURE__", CARD_LIST_SIGNATURE_JS.strip())
+
+DISCARD_PROMPT_JS = """
+([rootSelector, confirmSelector]) => !document.querySelector(rootSelector) || !!document.querySelector(confirmSelector)
+"""
+
+CARD_COUNT_ABOVE_JS = """
+([cardSelector, count]) => document.querySelectorAll(cardSelector).length > count
+"""
+
+
+PACING = {"min": MIN_DELAY_SECONDS, "max": MAX_DELAY_SECONDS}
+
+
+def set_pacing(min_sec, max_sec):
+    PACING.update(min=min_sec, max=max_sec)
+
+
+def pacing_delay():
+    """Seconds to pause between applications (the explicit pacing policy)."""
+    return random.uniform(PACING["min"], PACING["max"])
+
+
+# -- Conditions ---------------------------------------------------------------
+
+def detail_pane_ready(job_id, title):
+    return ("detail pane", DETAIL_PANE_READY_JS, [job_id, title])
+
+
+def modal_step_changed(previous):
+    """New modal step (or modal closed). Use previous='closed' to wait for the modal to open."""
+    return ("modal step", MODAL_STEP_CHANGED_JS, [MODAL_ROOT_SELECTOR, previous, ERROR_SELECTOR])
+
+
+def discard_prompt():
+    """Discard confirmation shown, or the modal closed without one."""
+    return ("discard prompt", DISCARD_PROMPT_JS, [MODAL_ROOT_SELECTOR, DISCARD_CONFIRM_SELECTOR])
+
+
+def card_list_changed(previous):
+    return ("card list", CARD_LIST_CHANGED_JS, [JOB_CARD_SELECTOR, previous])
+
+
+def card_count_above(count):
+    return ("more cards", CARD_COUNT_ABOVE_JS, [JOB_CARD_SELECTOR, count])
+
+
+# -- Sync helpers --------------------------------------------------------------
+
+def wait_for(page, condition, timeout_ms=WAIT_TIMEOUT_MS, quiet=False):
+    """Wait until a condition holds. Returns False on timeout (and carries on)."""
+    label, js, arg = condition
+    try:
+        page.wait_for_function(js, arg=arg, timeout=timeout_ms)
+        return True
+    except TimeoutError:
+        if not quiet:
+            print(f"   [Wait] No {label} after {timeout_ms / 1000:.0f}s; continuing.")
+    except Exception as e:
+        print(f"   [Wait] {label} wait failed: {e}")
+    return False
+
+
+def card_list_signature(page):
+    try:
+        return page.evaluate(CARD_LIST_SIGNATURE_JS, JOB_CARD_SELECTOR)
+    except Exception:
+        return ""